@@ -1,14 +1,21 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
-from .models import User, UserProfile
+from karpithal.pagination import EstimatedCountPaginator
+from .models import OutboxEmail, User, UserProfile
 
 
 class UserAdmin(BaseUserAdmin):
     # Use email instead of username
     ordering = ["email"]
-    list_display = ["email", "role", "is_active", "is_staff", "is_superuser"]
-    list_filter = ["role", "is_active", "is_staff", "is_superuser"]
+    list_display = ["email", "role", "is_approved", "is_active", "is_staff", "is_superuser", "profile_bio"]
+    list_filter = ["role", "is_approved", "is_active", "is_staff", "is_superuser"]
+    list_select_related = ["profile"]
+
+    # Large tables: estimated totals for the unfiltered list, and no second
+    # COUNT(*) for the "N total" link on filtered pages.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         (None, {"fields": ("email", "password")}),
@@ -28,8 +35,21 @@ class UserAdmin(BaseUserAdmin):
         ),
     )
 
+    # icontains lookups; backed by pg_trgm GIN indexes (migration 0006).
     search_fields = ("email", "first_name", "last_name")
 
+    @admin.display(description=_("Bio"))
+    def profile_bio(self, obj):
+        profile = getattr(obj, "profile", None)
+        return (profile.bio[:60] if profile and profile.bio else "")
+
+
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ["subject", "status", "attempts", "next_attempt_at", "created_at", "sent_at"]
+    list_filter = ["status"]
+    search_fields = ["subject"]
+
 
 admin.site.register(User, UserAdmin)
 admin.site.register(UserProfile)
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
@@ -0,0 +1,59 @@
+"""
+Admin approval queue.
+
+Pending accounts are active users that have not been approved yet; the
+queue is served by a partial index on ``date_joined`` covering only those
+rows, so it stays small however large the user table grows. Approving or
+rejecting a batch is one locked SELECT of the affected ids plus one
+``UPDATE ... WHERE id IN (...)``; the claims and OAuth caches that
+``User.save`` signals would normally refresh are updated in bulk after
+commit.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+
+from .authentication import claims_cache
+from .oauth import invalidate_oauth_users
+
+User = get_user_model()
+
+APPROVE = "approve"
+REJECT = "reject"
+APPROVAL_ACTIONS = (APPROVE, REJECT)
+
+# Must match the condition of the ``user_pending_approval_idx`` partial index.
+PENDING_APPROVAL = Q(is_approved=False, is_active=True)
+
+
+def pending_approval_queryset():
+    return User.objects.filter(PENDING_APPROVAL).order_by("date_joined", "id")
+
+
+def apply_approval(user_ids, action):
+    """
+    Approve or reject the pending users among ``user_ids``.
+    Approval activates and approves them; rejection deactivates them,
+    which takes them out of the queue and invalidates their tokens.
+    Returns the ids that were changed.
+    """
+    if action == APPROVE:
+        values = {"is_approved": True, "is_active": True}
+        eligible = User.objects.filter(pk__in=user_ids, is_approved=False)
+    else:
+        values = {"is_active": False}
+        eligible = User.objects.filter(PENDING_APPROVAL, pk__in=user_ids)
+
+    with transaction.atomic(savepoint=False):
+        changed = dict(eligible.select_for_update().values_list("pk", "role"))
+        if changed:
+            User.objects.filter(pk__in=changed).update(**values)
+
+            def refresh_caches():
+                claims_cache.publish_many(
+                    {str(pk): {"role": role, "is_approved": False, "is_active": True, **values} for pk, role in changed.items()}
+                )
+                invalidate_oauth_users(changed)
+
+            transaction.on_commit(refresh_caches)
+    return list(changed)
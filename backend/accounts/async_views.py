@@ -0,0 +1,219 @@
+"""
+Async variants of the password-hashing auth endpoints.
+
+Served by Django's ASGI handler (``karpithal/asgi.py``): validation and
+database access run through ``sync_to_async`` while PBKDF2 runs on the
+bounded hashing pool, so the event loop keeps serving cheap requests.
+"""
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException, Throttled
+from rest_framework.settings import api_settings
+
+from .authentication import ClaimsJWTAuthentication
+from .hashing import HashingPoolBusy, get_hashing_pool
+from .serializers import (
+    ChangePasswordSerializer,
+    PasswordResetConfirmSerializer,
+    UserRegistrationSerializer,
+    UserReadSerializer,
+)
+from .views import get_tokens_for_user
+
+User = get_user_model()
+
+
+# ---------------------------
+# Base async view
+# ---------------------------
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncPasswordView(View):
+    """
+    JSON-in/JSON-out async view that turns a saturated hashing pool
+    into ``503 Service Unavailable``.
+
+    Plain Django views skip DRF's request cycle, so the bearer token is
+    authenticated and ``DEFAULT_THROTTLE_CLASSES`` (with the view's
+    ``throttle_scope``) are applied here, before any hashing.
+    """
+
+    http_method_names = ["post"]
+    throttle_scope = None
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            self.data = json.loads(request.body or b"{}")
+        except ValueError:
+            return JsonResponse({"success": False, "message": "Request body must be JSON."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            await self.authenticate(request)
+            await self.check_throttles(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except HashingPoolBusy:
+            response = JsonResponse(
+                {"success": False, "message": "Server is busy, please retry shortly."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+            response["Retry-After"] = "1"
+            return response
+        except APIException as e:
+            detail = e.detail if isinstance(e.detail, dict) else {"detail": e.detail}
+            response = JsonResponse(detail, status=e.status_code)
+            if getattr(e, "wait", None):
+                response["Retry-After"] = str(math.ceil(e.wait))
+            return response
+
+    async def authenticate(self, request):
+        """
+        Authenticate the bearer token and set ``request.user`` to the claims
+        user, or to an anonymous user when no token was sent.
+        """
+        result = await sync_to_async(ClaimsJWTAuthentication().authenticate)(request)
+        request.user = AnonymousUser() if result is None else result[0]
+        return request.user
+
+    def get_throttles(self):
+        return [throttle_class() for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES]
+
+    async def check_throttles(self, request):
+        # The throttle stores are thread-safe; keep their I/O off the loop.
+        waits = []
+        for throttle in self.get_throttles():
+            if not await sync_to_async(throttle.allow_request, thread_sensitive=False)(request, self):
+                waits.append(throttle.wait())
+        if waits:
+            raise Throttled(max((wait for wait in waits if wait is not None), default=None))
+
+
+# ---------------------------
+# Login
+# ---------------------------
+class AsyncLoginView(AsyncPasswordView):
+    async def post(self, request):
+        email = self.data.get(User.USERNAME_FIELD)
+        password = self.data.get("password")
+        if not email or not password:
+            return JsonResponse({"detail": "Email and password are required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        pool = get_hashing_pool()
+        try:
+            user = await User.objects.aget(**{User.USERNAME_FIELD: email})
+        except User.DoesNotExist:
+            user = None
+
+        # Hash on every path, inactive users included, so the response time
+        # does not tell which accounts exist or are disabled.
+        if user is None or not user.has_usable_password():
+            await pool.make_password(password)
+            valid = False
+        else:
+            valid, must_update = await pool.verify_password(password, user.password)
+            if valid and must_update:
+                # What ModelBackend does through check_password's setter.
+                user.password = await pool.make_password(password)
+                await user.asave(update_fields=["password"])
+
+        if not valid or not ModelBackend().user_can_authenticate(user):
+            return JsonResponse(
+                {"detail": "No active account found with the given credentials"},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        return JsonResponse(get_tokens_for_user(user), status=status.HTTP_200_OK)
+
+
+# ---------------------------
+# Registration
+# ---------------------------
+class AsyncUserRegistrationView(AsyncPasswordView):
+    throttle_scope = "register"
+
+    async def post(self, request):
+        # Optional: admins registering instructors/admins send their token.
+        serializer = UserRegistrationSerializer(data=self.data, context={"request": request})
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        password = serializer.validated_data.get("password")
+        password_hash = None
+        if password and not serializer.validated_data.get("oauth_provider"):
+            password_hash = await get_hashing_pool().make_password(password)
+
+        user = await sync_to_async(self.create_user)(serializer, password_hash)
+        tokens = get_tokens_for_user(user) if user.is_active else None
+        user_data = await sync_to_async(UserReadSerializer().from_instance)(user)
+
+        return JsonResponse(
+            {
+                "success": True,
+                "data": {"user": user_data, "tokens": tokens},
+                "message": (
+                    "User registered successfully. Please verify your email."
+                    if not user.is_active
+                    else "User registered successfully."
+                ),
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @staticmethod
+    def create_user(serializer, password_hash):
+        with transaction.atomic():
+            return serializer.save(password_hash=password_hash)
+
+
+# ---------------------------
+# Change Password
+# ---------------------------
+class AsyncChangePasswordView(AsyncPasswordView):
+    async def post(self, request):
+        if not request.user.is_authenticated:
+            return JsonResponse(
+                {"detail": "Authentication credentials were not provided."},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+        user = await User.objects.aget(pk=request.user.pk)
+
+        serializer = ChangePasswordSerializer(
+            data=self.data,
+            context={"request": request, "user": user, "defer_password_check": True},
+        )
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        pool = get_hashing_pool()
+        if not await pool.check_password(serializer.validated_data["old_password"], user.password):
+            return JsonResponse({"old_password": ["Old password is incorrect."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        password_hash = await pool.make_password(serializer.validated_data["new_password"])
+        await sync_to_async(serializer.save)(password_hash=password_hash)
+        return JsonResponse({"success": True, "message": "Password changed successfully."}, status=status.HTTP_200_OK)
+
+
+# ---------------------------
+# Password Reset Confirm
+# ---------------------------
+class AsyncPasswordResetConfirmView(AsyncPasswordView):
+    throttle_scope = "password-reset"
+
+    async def post(self, request, uidb64, token):
+        data = dict(self.data, uidb64=uidb64, token=token)
+        serializer = PasswordResetConfirmSerializer(data=data)
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        password_hash = await get_hashing_pool().make_password(serializer.validated_data["new_password"])
+        await sync_to_async(serializer.save)(password_hash=password_hash)
+        return JsonResponse({"success": True, "message": "Password reset successfully."}, status=status.HTTP_200_OK)
@@ -0,0 +1,187 @@
+import time
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import (
+    JWTAuthentication,
+    JWTStatelessUserAuthentication,
+)
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Claims copied from the User row into every token we issue.
+USER_CLAIMS = ("role", "is_approved", "is_active")
+
+CLAIMS_CACHE_KEY = "accounts:user-claims:{}"
+
+
+def get_user_claims(user):
+    """
+    Return the authorization-relevant state of a user as a claims dict.
+    """
+    return {claim: getattr(user, claim) for claim in USER_CLAIMS}
+
+
+# ---------------------------
+# Token carrying user claims
+# ---------------------------
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token that embeds role, approval and active state.
+    The access token derived from it inherits the same claims.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim, value in get_user_claims(user).items():
+            token[claim] = value
+        return token
+
+
+# ---------------------------
+# Per-process claims override cache
+# ---------------------------
+class ClaimsOverrideCache:
+    """
+    Small TTL cache in front of the shared Django cache.
+
+    ``User.save`` publishes the latest claims for a user to the shared cache;
+    workers look them up at most once per ``ttl`` seconds per user, so a role
+    change or deactivation reaches every worker that shares ``CACHES``
+    within that window without any database access on the request path.
+    At most ``max_entries`` users are kept locally.
+    """
+
+    def __init__(self, ttl, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        claims = cache.get(CLAIMS_CACHE_KEY.format(user_id))
+        with self._lock:
+            self._store(user_id, now + self.ttl, claims, now)
+        return claims
+
+    def _store(self, user_id, expires, claims, now):
+        # Caller holds the lock.
+        if user_id not in self._entries and len(self._entries) >= self.max_entries:
+            self._entries = {key: entry for key, entry in self._entries.items() if entry[0] > now}
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+        self._entries[user_id] = (expires, claims)
+
+    def publish(self, user_id, claims):
+        """
+        Record new claims for a user, locally and in the shared cache.
+        Entries outlive every refresh token issued before the change.
+        """
+        timeout = int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+        cache.set(CLAIMS_CACHE_KEY.format(user_id), claims, timeout)
+        now = time.monotonic()
+        with self._lock:
+            self._store(user_id, now + self.ttl, claims, now)
+
+    def publish_many(self, claims_by_user):
+        """
+        Same as ``publish`` for several users at once (bulk updates skip ``User.save``).
+        """
+        timeout = int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+        cache.set_many({CLAIMS_CACHE_KEY.format(user_id): claims for user_id, claims in claims_by_user.items()}, timeout)
+        now = time.monotonic()
+        with self._lock:
+            for user_id, claims in claims_by_user.items():
+                self._store(user_id, now + self.ttl, claims, now)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+claims_cache = ClaimsOverrideCache(ttl=getattr(settings, "CLAIMS_AUTH_CACHE_TTL", 30))
+
+
+# ---------------------------
+# Lightweight user backed by claims
+# ---------------------------
+class ClaimsUser(TokenUser):
+    """
+    Stateless user built from token claims, overridden by any newer claims
+    published since the token was issued.
+    Use ``User.objects.get(pk=request.user.pk)`` when the model row is needed.
+    """
+
+    def __init__(self, token, overrides=None):
+        super().__init__(token)
+        self.claims = {claim: token.get(claim) for claim in USER_CLAIMS}
+        if overrides:
+            self.claims.update(overrides)
+
+    @cached_property
+    def id(self):
+        # simplejwt stores the id claim as a string; compare like the model's pk.
+        from django.contrib.auth import get_user_model
+
+        field = get_user_model()._meta.get_field(api_settings.USER_ID_FIELD)
+        return field.to_python(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @property
+    def role(self):
+        return self.claims["role"]
+
+    @property
+    def is_approved(self):
+        return bool(self.claims["is_approved"])
+
+    @property
+    def is_active(self):
+        return bool(self.claims["is_active"])
+
+    def __str__(self):
+        return f"ClaimsUser {self.id} ({self.role})"
+
+
+# ---------------------------
+# Authentication class
+# ---------------------------
+class ClaimsJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT authentication that trusts the role/approval/active claims in the
+    access token instead of loading the User row on every request.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        from .revocation import revocation_set
+
+        if revocation_set.is_revoked(validated_token):
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+
+        if "role" not in validated_token:
+            # Tokens issued before claims were embedded; fall back to the DB.
+            return JWTAuthentication.get_user(self, validated_token)
+
+        user = ClaimsUser(validated_token, claims_cache.get(str(user_id)))
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from karpithal.pagination import KeysetPagination, check_keyset_ordering
+
+PER_PROCESS_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Claims overrides, OAuth snapshots, the catalog version and replica pins
+    must be visible to every worker.
+    """
+    if settings.CACHES["default"]["BACKEND"] in PER_PROCESS_CACHES:
+        return [
+            Warning(
+                "The default cache is per-process, so role changes, deactivations and "
+                "cache invalidations do not reach other workers.",
+                hint="Set CACHE_URL to a cache shared by all workers, e.g. redis://host:6379/0.",
+                id="accounts.W001",
+            )
+        ]
+    return []
+
+
+def _routed_views(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _routed_views(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, "view_class", None)
+            if view_class is not None:
+                yield view_class
+
+
+@register(Tags.urls)
+def check_keyset_pagination(app_configs, **kwargs):
+    """
+    Views paginated by keyset must order by non-null fields of their model,
+    ending with a unique one; otherwise their pages fail at request time.
+    """
+    errors = []
+    for view_class in set(_routed_views(get_resolver().url_patterns)):
+        pagination_class = getattr(view_class, "pagination_class", None)
+        if not (isinstance(pagination_class, type) and issubclass(pagination_class, KeysetPagination)):
+            continue
+        queryset = getattr(view_class, "queryset", None)
+        serializer_class = getattr(view_class, "serializer_class", None)
+        model = queryset.model if queryset is not None else getattr(getattr(serializer_class, "Meta", None), "model", None)
+        if model is None:
+            continue
+        for problem in check_keyset_ordering(model, getattr(view_class, "ordering", None)):
+            errors.append(
+                Error(
+                    f"{view_class.__module__}.{view_class.__qualname__} {problem}",
+                    hint="Set `ordering` to non-null fields of the model ending with a unique one, e.g. ('-created_at', '-id').",
+                    obj=view_class,
+                    id="accounts.E001",
+                )
+            )
+    return errors
@@ -0,0 +1,209 @@
+"""
+Password hashing helpers that can run outside the calling thread.
+
+This module deliberately avoids importing models so that worker processes
+only need a configured Django settings module to use it.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+def _init_worker(settings_module):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+
+    django.setup()
+
+
+def hash_password(raw_password):
+    """
+    Hash a raw password with the configured hasher.
+    ``None`` produces an unusable password, like ``set_unusable_password``.
+    """
+    from django.contrib.auth.hashers import make_password
+
+    return make_password(raw_password)
+
+
+def check_password(raw_password, encoded):
+    """
+    Verify a raw password against an encoded hash without rehashing.
+    """
+    from django.contrib.auth.hashers import check_password as django_check_password
+
+    return django_check_password(raw_password, encoded)
+
+
+def verify_password(raw_password, encoded):
+    """
+    Verify a raw password and report whether a valid hash should be
+    upgraded to the current hasher settings: ``(valid, must_update)``.
+    """
+    from django.contrib.auth.hashers import check_password as django_check_password
+
+    outdated = []
+    valid = django_check_password(raw_password, encoded, setter=outdated.append)
+    return valid, bool(outdated)
+
+
+def _timed_call(fn, *args):
+    # Report when the worker actually started so callers can measure queue wait.
+    return time.time(), fn(*args)
+
+
+def create_process_pool(workers):
+    """
+    Process pool whose workers have Django configured (also under "spawn").
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "karpithal.settings"),),
+    )
+
+
+def hash_passwords(raw_passwords, pool=None, chunksize=16):
+    """
+    Hash a list of raw passwords, fanning out across ``pool`` when given.
+    Results keep the input order.
+    """
+    if pool is None:
+        return [hash_password(raw) for raw in raw_passwords]
+    return list(pool.map(hash_password, raw_passwords, chunksize=chunksize))
+
+
+_import_pool = None
+_import_pool_lock = threading.Lock()
+
+
+def get_import_hashing_pool():
+    """
+    Long-lived executor the admin import endpoint hashes on, sized by
+    ``USER_IMPORT_REQUEST_HASH_WORKERS`` and shared by concurrent imports.
+    Threads rather than processes: PBKDF2 releases the GIL, and forking a
+    web worker per request is what this replaces.
+    """
+    global _import_pool
+    if _import_pool is None:
+        from django.conf import settings
+
+        with _import_pool_lock:
+            if _import_pool is None:
+                _import_pool = ThreadPoolExecutor(
+                    max_workers=settings.USER_IMPORT_REQUEST_HASH_WORKERS,
+                    thread_name_prefix="user-import-hashing",
+                )
+    return _import_pool
+
+
+# ---------------------------
+# Bounded executor for request-path hashing
+# ---------------------------
+class HashingPoolBusy(Exception):
+    """
+    Raised when the hashing pool already has ``max_pending`` jobs queued.
+    """
+
+
+class PasswordHashingPool:
+    """
+    Runs password hashing/checking outside the event loop on a bounded
+    thread or process pool, and keeps queue depth and wait time counters.
+
+    PBKDF2 releases the GIL inside hashlib, so a thread pool already hashes
+    in parallel; a process pool isolates hashing from the web worker fully.
+    """
+
+    def __init__(self, kind="thread", workers=1, max_pending=256):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown hashing executor '{kind}'. Use 'thread' or 'process'.")
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        self._executor = create_process_pool(self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix="password-hashing"
+                        )
+        return self._executor
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingPoolBusy("Password hashing pool is saturated.")
+            self.pending += 1
+
+        submitted = time.time()
+        try:
+            loop = asyncio.get_running_loop()
+            started, result = await loop.run_in_executor(self.executor, _timed_call, fn, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+        wait = max(0.0, started - submitted)
+        with self._lock:
+            self.completed += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        return result
+
+    async def make_password(self, raw_password):
+        return await self.run(hash_password, raw_password)
+
+    async def check_password(self, raw_password, encoded):
+        return await self.run(check_password, raw_password, encoded)
+
+    async def verify_password(self, raw_password, encoded):
+        return await self.run(verify_password, raw_password, encoded)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "executor": self.kind,
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "queued": max(0, self.pending - self.workers),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_seconds": self.total_wait / self.completed if self.completed else 0.0,
+                "max_wait_seconds": self.max_wait,
+            }
+
+
+_hashing_pool = None
+
+
+def get_hashing_pool():
+    """
+    Process-wide hashing pool configured from the PASSWORD_HASHING_* settings.
+    """
+    global _hashing_pool
+    if _hashing_pool is None:
+        from django.conf import settings
+
+        _hashing_pool = PasswordHashingPool(
+            kind=settings.PASSWORD_HASHING_EXECUTOR,
+            workers=settings.PASSWORD_HASHING_WORKERS,
+            max_pending=settings.PASSWORD_HASHING_MAX_PENDING,
+        )
+    return _hashing_pool
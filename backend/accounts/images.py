@@ -0,0 +1,173 @@
+"""
+Profile picture validation and resizing.
+
+Uploads are validated from their size attribute and image header only
+(``Image.open`` does not decode pixel data). After the profile is saved,
+``schedule_profile_picture_processing`` re-encodes the original without
+EXIF metadata and writes fixed-size WebP/JPEG variants next to it on a
+background thread, so avatar renders fetch a few KB instead of the upload.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_FORMATS = {"JPEG": ("jpg", "jpeg"), "PNG": ("png",)}
+VARIANT_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+MAX_PROFILE_PICTURE_SIZE = 5 * 1024 * 1024  # 5MB
+MAX_PROFILE_PICTURE_PIXELS = 40_000_000
+
+
+def validate_profile_picture_upload(file):
+    """
+    Validate an uploaded profile picture by size and image header.
+    The file position is restored, nothing past the header is read.
+    """
+    if file.size > MAX_PROFILE_PICTURE_SIZE:
+        raise ValidationError(f"Profile picture size must be less than {MAX_PROFILE_PICTURE_SIZE // (1024 * 1024)}MB.")
+
+    position = file.tell() if hasattr(file, "tell") else 0
+    try:
+        with Image.open(file) as image:
+            image_format, (width, height) = image.format, image.size
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise ValidationError("Upload a valid JPG, JPEG or PNG image.")
+    finally:
+        file.seek(position)
+
+    ext = file.name.split(".")[-1].lower()
+    if image_format not in ALLOWED_FORMATS or ext not in ALLOWED_FORMATS[image_format]:
+        raise ValidationError("Only PNG, JPG, or JPEG files are allowed.")
+    if width * height > MAX_PROFILE_PICTURE_PIXELS:
+        raise ValidationError("Profile picture dimensions are too large.")
+
+
+# ---------------------------
+# Variant generation
+# ---------------------------
+def _encode(image, image_format, **options):
+    if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    elif image_format == "WEBP" and image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def process_profile_picture(profile_id):
+    """
+    Strip EXIF from the stored original and (re)build its size variants.
+    """
+    from .models import UserProfile
+
+    profile = UserProfile.objects.filter(pk=profile_id).first()
+    if profile is None:
+        return
+    picture = profile.profile_picture
+    old_variants = profile.picture_variants or {}
+
+    variants = {}
+    written = []
+    if picture:
+        storage = picture.storage
+        name = picture.name
+        with picture.open("rb") as fh:
+            with Image.open(fh) as original:
+                image_format = original.format
+                image = ImageOps.exif_transpose(original)
+                image.load()
+
+        # Re-encoding without the exif/info arguments drops all metadata. The
+        # copy is saved before the original is removed, under whatever name
+        # the storage picks (it will not overwrite ``name``).
+        options = {"quality": 90} if image_format == "JPEG" else {}
+        source = storage.save(name, _encode(image, image_format, **options))
+        written.append(source)
+
+        base = os.path.splitext(source)[0]
+        sizes = {}
+        for size in settings.PROFILE_PICTURE_SIZES:
+            thumb = ImageOps.fit(image, (size, size), Image.LANCZOS)
+            sizes[str(size)] = {}
+            for ext, fmt in VARIANT_FORMATS.items():
+                sizes[str(size)][ext] = storage.save(f"{base}_{size}.{ext}", _encode(thumb, fmt, quality=80))
+                written.append(sizes[str(size)][ext])
+        variants = {"source": source, "sizes": sizes}
+
+    with transaction.atomic():
+        current = (
+            UserProfile.objects.select_for_update().filter(pk=profile_id).values_list("profile_picture", flat=True).first()
+        )
+        replaced = current != (picture.name or "")
+        if not replaced:
+            if written:
+                profile.profile_picture.name = variants["source"]
+            profile.picture_variants = variants
+            profile.save(update_fields=["profile_picture", "picture_variants"])
+
+    if replaced:
+        # A new upload (or a deletion) won the race; its own job takes over.
+        obsolete = written
+    else:
+        obsolete = [name] if written else []
+        kept = set(written)
+        obsolete += [
+            variant_name
+            for formats in old_variants.get("sizes", {}).values()
+            for variant_name in formats.values()
+            if variant_name not in kept
+        ]
+    for obsolete_name in obsolete:
+        picture.storage.delete(obsolete_name)
+
+
+_executor = None
+
+
+def _run(profile_id):
+    try:
+        process_profile_picture(profile_id)
+    except Exception:
+        logger.exception("Failed to process profile picture for profile %s", profile_id)
+
+
+def schedule_profile_picture_processing(profile):
+    """
+    Process the profile's picture once the current transaction commits,
+    on a background thread (or inline when PROFILE_PICTURE_ASYNC is off).
+    """
+    def submit():
+        global _executor
+        if not settings.PROFILE_PICTURE_ASYNC:
+            _run(profile.pk)
+            return
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PROFILE_PICTURE_WORKERS, thread_name_prefix="profile-pictures"
+            )
+        _executor.submit(_run, profile.pk)
+
+    transaction.on_commit(submit)
+
+
+def is_processed_picture(name, variants):
+    """
+    Whether ``name`` is the EXIF-stripped copy written by processing. Until it
+    is, the stored file is the upload as received (GPS tags included), so its
+    URL is not handed out.
+    """
+    return bool(name) and name == (variants or {}).get("source")
+
+
+def profile_picture_needs_processing(profile):
+    variants = profile.picture_variants or {}
+    return (profile.profile_picture.name or None) != variants.get("source")
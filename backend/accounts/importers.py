@@ -0,0 +1,215 @@
+import csv
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import DataError, IntegrityError, transaction
+
+from .hashing import create_process_pool, hash_passwords
+from .models import DEFAULT_BIO, UserProfile
+
+User = get_user_model()
+
+IMPORT_FORMATS = ("csv", "ndjson")
+ROLE_VALUES = {value for value, _ in User.ROLE_CHOICES}
+TEXT_COLUMNS = ("email", "password", "role", "first_name", "last_name")
+# Model fields filled from each row, keyed by the row column reported on error.
+# The email is also stored as the username, whose limit (150) is the tighter one.
+LENGTH_CHECKED_FIELDS = {
+    "email": ("email", "username"),
+    "first_name": ("first_name",),
+    "last_name": ("last_name",),
+}
+
+
+# ---------------------------
+# Row readers
+# ---------------------------
+def read_csv_rows(lines):
+    """
+    Yield (row_number, data) pairs from an iterable of CSV text lines.
+    The first line is the header (email, password, role, first_name, last_name).
+    """
+    reader = csv.DictReader(lines)
+    for row_number, row in enumerate(reader, start=1):
+        yield row_number, row
+
+
+def read_ndjson_rows(lines):
+    """
+    Yield (row_number, data) pairs from newline-delimited JSON text lines.
+    Unparseable lines are yielded with ``None`` data so they get reported.
+    """
+    row_number = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        row_number += 1
+        try:
+            data = json.loads(line)
+        except ValueError:
+            data = None
+        yield row_number, data if isinstance(data, dict) else None
+
+
+def read_rows(lines, fmt):
+    if fmt == "csv":
+        return read_csv_rows(lines)
+    if fmt == "ndjson":
+        return read_ndjson_rows(lines)
+    raise ValueError(f"Unsupported import format '{fmt}'. Use one of: {', '.join(IMPORT_FORMATS)}.")
+
+
+# ---------------------------
+# Bulk importer
+# ---------------------------
+class UserImporter:
+    """
+    Streams user rows into the database in batches.
+
+    Each batch is validated in Python, its passwords are hashed on the
+    given ``pool`` (or a process pool started for the run), and users plus their profiles are written with two
+    ``bulk_create`` calls. Signals are bypassed, so ``User.save`` defaults
+    (student auto-approval) are applied here.
+    """
+
+    def __init__(self, batch_size=None, workers=None, pool=None):
+        self.batch_size = batch_size or settings.USER_IMPORT_BATCH_SIZE
+        self.workers = settings.USER_IMPORT_HASH_WORKERS if workers is None else workers
+        self.pool = pool  # shared executor owned by the caller; else one per run
+        self.created = 0
+        self.errors = []
+        self._seen_emails = set()
+
+    def run(self, rows):
+        """
+        Import an iterable of (row_number, data) pairs and return the report.
+        """
+        pool = self.pool
+        owned = pool is None and self.workers > 1
+        if owned:
+            pool = create_process_pool(self.workers)
+        try:
+            rows = iter(rows)
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                self._import_batch(batch, pool)
+        finally:
+            if owned:
+                pool.shutdown()
+        return self.report()
+
+    def report(self):
+        return {"created": self.created, "failed": len(self.errors), "errors": self.errors}
+
+    def _add_error(self, row_number, email, errors):
+        self.errors.append({"row": row_number, "email": email, "errors": errors})
+
+    def _build_user(self, row_number, data):
+        """
+        Validate a row and return an unsaved User plus its raw password,
+        or record the row's errors and return None.
+        """
+        if data is None:
+            self._add_error(row_number, None, {"row": ["Row is not a valid JSON object."]})
+            return None
+
+        # NDJSON values can be any JSON type; CSV values are always strings.
+        wrong_type = [c for c in TEXT_COLUMNS if data.get(c) is not None and not isinstance(data[c], str)]
+        if wrong_type:
+            email = data.get("email") if isinstance(data.get("email"), str) else None
+            self._add_error(row_number, email, {column: ["Must be a string."] for column in wrong_type})
+            return None
+
+        email = User.objects.normalize_email((data.get("email") or "").strip())
+        role = (data.get("role") or User.STUDENT).strip()
+        password = data.get("password") or None
+        errors = {}
+
+        try:
+            validate_email(email)
+        except ValidationError as e:
+            errors["email"] = e.messages
+        else:
+            if email.lower() in self._seen_emails:
+                errors["email"] = ["Duplicate email in import."]
+
+        if role not in ROLE_VALUES:
+            errors["role"] = [f"'{role}' is not a valid role."]
+
+        user = User(
+            email=email,
+            username=email,
+            role=role,
+            first_name=(data.get("first_name") or "").strip(),
+            last_name=(data.get("last_name") or "").strip(),
+        )
+        user.is_approved = role == User.STUDENT
+        for column, field_names in LENGTH_CHECKED_FIELDS.items():
+            if column in errors:
+                continue
+            limit = min(User._meta.get_field(name).max_length for name in field_names)
+            if len(getattr(user, field_names[0])) > limit:
+                errors[column] = [f"Ensure this field has no more than {limit} characters."]
+        if password:
+            try:
+                validate_password(password, user)
+            except ValidationError as e:
+                errors["password"] = e.messages
+
+        if errors:
+            self._add_error(row_number, email, errors)
+            return None
+
+        self._seen_emails.add(email.lower())
+        return row_number, user, password
+
+    def _import_batch(self, batch, pool):
+        candidates = [c for c in (self._build_user(n, data) for n, data in batch) if c]
+        if not candidates:
+            return
+
+        existing = set(
+            User.objects.filter(email__in=[user.email for _, user, _ in candidates])
+            .values_list("email", flat=True)
+        )
+        pending = []
+        for row_number, user, password in candidates:
+            if user.email in existing:
+                self._add_error(row_number, user.email, {"email": ["A user with that email already exists."]})
+            else:
+                pending.append((row_number, user, password))
+        if not pending:
+            return
+
+        hashes = hash_passwords([password for _, _, password in pending], pool)
+        for (_, user, _), encoded in zip(pending, hashes):
+            user.password = encoded
+
+        try:
+            with transaction.atomic():
+                users = User.objects.bulk_create([user for _, user, _ in pending])
+                UserProfile.objects.bulk_create([UserProfile(user=user, bio=DEFAULT_BIO) for user in users])
+            self.created += len(users)
+        except (IntegrityError, DataError):
+            # A concurrent writer took some of these emails (or a value does not
+            # fit its column); retry row by row so only the failing rows are reported.
+            for row_number, user, _ in pending:
+                self._import_one(row_number, user)
+
+    def _import_one(self, row_number, user):
+        try:
+            with transaction.atomic():
+                user.pk = None
+                User.objects.bulk_create([user])
+                UserProfile.objects.create(user=user, bio=DEFAULT_BIO)
+            self.created += 1
+        except (IntegrityError, DataError) as e:
+            self._add_error(row_number, user.email, {"non_field_errors": [str(e)]})
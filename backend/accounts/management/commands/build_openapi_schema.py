@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from drf_spectacular.drainage import GENERATOR_STATS
+
+from karpithal.openapi import build_schema
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema and write it (YAML and JSON) for /api/schema/ to serve."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output-dir", help="Directory to write to (default: OPENAPI_SCHEMA_DIR).")
+
+    def handle(self, *args, **options):
+        paths = build_schema(options["output_dir"])
+        GENERATOR_STATS.emit_summary()
+        for path in paths:
+            self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
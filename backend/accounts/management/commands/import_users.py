@@ -0,0 +1,46 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.importers import IMPORT_FORMATS, UserImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk import users from a CSV or NDJSON file (use '-' for stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV/NDJSON file to import, or '-' for stdin.")
+        parser.add_argument("--format", choices=IMPORT_FORMATS, help="Input format (default: from file extension).")
+        parser.add_argument("--batch-size", type=int, help="Rows per bulk insert (default: USER_IMPORT_BATCH_SIZE).")
+        parser.add_argument("--workers", type=int, help="Password hashing processes (default: USER_IMPORT_HASH_WORKERS).")
+        parser.add_argument("--report", help="Write per-row errors to this file as NDJSON.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv")
+
+        try:
+            stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8-sig")
+        except OSError as e:
+            raise CommandError(f"Cannot open '{path}': {e}")
+
+        importer = UserImporter(batch_size=options["batch_size"], workers=options["workers"])
+        with stream:
+            try:
+                report = importer.run(read_rows(stream, fmt))
+            except UnicodeDecodeError as e:
+                created = importer.report()["created"]
+                raise CommandError(f"'{path}' is not valid UTF-8 ({e}); {created} users were imported before it.")
+
+        if options["report"]:
+            with open(options["report"], "w", encoding="utf-8") as fh:
+                for error in report["errors"]:
+                    fh.write(json.dumps(error) + "\n")
+        else:
+            for error in report["errors"]:
+                self.stderr.write(json.dumps(error))
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Imported {report['created']} users, {report['failed']} rows failed.")
+        )
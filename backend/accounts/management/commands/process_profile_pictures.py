@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from accounts.images import process_profile_picture, profile_picture_needs_processing
+from accounts.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = "Strip EXIF and build size variants for profile pictures that lack them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Reprocess every profile picture.")
+
+    def handle(self, *args, **options):
+        processed = 0
+        profiles = UserProfile.objects.exclude(profile_picture="").exclude(profile_picture__isnull=True)
+        for profile in profiles.only("id", "profile_picture", "picture_variants").iterator():
+            if options["all"] or profile_picture_needs_processing(profile):
+                process_profile_picture(profile.pk)
+                processed += 1
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} profile pictures."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from accounts.revocation import prune_revoked_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete revoked tokens that have expired and token cutoffs older than the refresh token lifetime."
+
+    def handle(self, *args, **options):
+        tokens, cutoffs = prune_revoked_tokens()
+        self.stdout.write(self.style.SUCCESS(f"Pruned {tokens} revoked tokens and {cutoffs} token cutoffs."))
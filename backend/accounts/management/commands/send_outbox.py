@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.outbox import deliver_batch
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails in batches (run with --loop as a worker)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, help="Messages claimed per batch (default: OUTBOX_BATCH_SIZE).")
+        parser.add_argument("--loop", action="store_true", help="Keep polling instead of exiting when the queue is empty.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds to sleep between polls with --loop.")
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = deliver_batch(options["batch_size"])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f"Batch: {sent} sent, {failed} failed.")
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Outbox drained: {total_sent} sent, {total_failed} failed."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_userprofile_picture_variants'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_approved', False)), fields=['date_joined', 'id'], name='user_pending_approval_idx'),
+        ),
+    ]
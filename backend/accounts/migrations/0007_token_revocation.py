@@ -0,0 +1,41 @@
+# Generated by Django 5.0 on 2026-10-18 09:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_user_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(max_length=255, unique=True)),
+                ('user_id', models.BigIntegerField(db_index=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('revoked_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'revoked token',
+                'verbose_name_plural': 'revoked tokens',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserTokenCutoff',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='token_cutoff', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('revoked_before', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'user token cutoff',
+                'verbose_name_plural': 'user token cutoffs',
+            },
+        ),
+    ]
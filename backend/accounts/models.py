@@ -4,10 +4,13 @@ from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
 from django.core.validators import EmailValidator, FileExtensionValidator
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from .images import validate_profile_picture_upload
+
 # Helper functions
 def user_profile_picture_path(instance, filename):
     """
@@ -104,10 +107,33 @@ class User(AbstractUser):
     class Meta:
         verbose_name = _("user")
         verbose_name_plural = _("users")
-        indexes = [models.Index(fields=["role"]), models.Index(fields=["oauth_provider"])]
+        indexes = [
+            models.Index(fields=["role"]),
+            models.Index(fields=["oauth_provider"]),
+            # Admin approval queue: only the (few) pending rows are indexed.
+            models.Index(
+                fields=["date_joined", "id"],
+                condition=models.Q(is_approved=False, is_active=True),
+                name="user_pending_approval_idx",
+            ),
+        ]
+
+
+def picture_variant_urls(variants, storage):
+    """
+    {size: {format: url}} for a ``picture_variants`` value.
+    """
+    return {
+        size: {fmt: storage.url(name) for fmt, name in formats.items()}
+        for size, formats in (variants or {}).get("sizes", {}).items()
+    }
 
 
 # UserProfile Model
+# Bio given to every new profile, whichever signup path created it.
+DEFAULT_BIO = "Welcome to my Karpithal profile!"
+
+
 class UserProfile(models.Model):
     """
     Profile model associated with User.
@@ -116,7 +142,7 @@ class UserProfile(models.Model):
 
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile")
     bio = models.TextField(
-        _("bio"), blank=True, null=True, default="Welcome to my Karpithal profile!"
+        _("bio"), blank=True, null=True, default=DEFAULT_BIO
     )
     profile_picture = models.ImageField(
         _("profile picture"),
@@ -129,18 +155,28 @@ class UserProfile(models.Model):
         ],
         help_text=_("Allowed formats: JPG, JPEG, PNG. Max size: 5MB."),
     )
+    picture_variants = models.JSONField(
+        _("profile picture variants"),
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text=_("Resized WebP/JPEG copies of the picture, filled in after upload."),
+    )
 
     def clean(self):
         """
-        Additional validation on profile_picture if needed.
+        Additional validation on newly uploaded profile pictures.
         """
-        if self.profile_picture:
-            validate_image_size(self.profile_picture)
-            ext = self.profile_picture.name.split('.')[-1].lower()
-            if ext not in ["jpg", "jpeg", "png"]:
-                raise ValidationError("Only JPG, JPEG, PNG files are allowed.")
+        if self.profile_picture and not self.profile_picture._committed:
+            validate_profile_picture_upload(self.profile_picture)
         super().clean()
 
+    def get_picture_variant_urls(self):
+        """
+        Return {size: {format: url}} for the processed picture variants.
+        """
+        return picture_variant_urls(self.picture_variants, self.profile_picture.storage)
+
     def __str__(self):
         return f"Profile of {self.user.email}"
 
@@ -149,6 +185,97 @@ class UserProfile(models.Model):
         verbose_name_plural = _("user profiles")
 
 
+# Email Outbox Model
+class OutboxEmail(models.Model):
+    """
+    Email queued for background delivery by the send_outbox command.
+    A pending message with the same dedupe_key (set only for password reset
+    mail) is replaced, not duplicated.
+    """
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    dedupe_key = models.CharField(max_length=64, blank=True, null=True)
+    subject = models.CharField(max_length=998)
+    body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254, blank=True)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    reply_to = models.JSONField(default=list, blank=True)
+    headers = models.JSONField(default=dict, blank=True)
+    alternatives = models.JSONField(
+        default=list, blank=True, help_text=_("List of [content, mimetype] pairs, e.g. the HTML part.")
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+    class Meta:
+        verbose_name = _("outbox email")
+        verbose_name_plural = _("outbox emails")
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dedupe_key"],
+                condition=models.Q(status="pending"),
+                name="unique_pending_outbox_dedupe_key",
+            )
+        ]
+
+
+# Token Revocation Models
+class RevokedToken(models.Model):
+    """
+    A refresh or access token revoked before it expired (e.g. on logout).
+    Rows are useless once ``expires_at`` passes; prune_revoked_tokens deletes them.
+    """
+
+    jti = models.CharField(max_length=255, unique=True)
+    user_id = models.BigIntegerField(db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.jti} (user {self.user_id})"
+
+    class Meta:
+        verbose_name = _("revoked token")
+        verbose_name_plural = _("revoked tokens")
+
+
+class UserTokenCutoff(models.Model):
+    """
+    Every token of the user issued before ``revoked_before`` is revoked
+    (e.g. "log out everywhere").
+    """
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="token_cutoff")
+    revoked_before = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"Tokens of user {self.user_id} before {self.revoked_before}"
+
+    class Meta:
+        verbose_name = _("user token cutoff")
+        verbose_name_plural = _("user token cutoffs")
+
+
 # Signal to automatically create UserProfile when a User is created
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -0,0 +1,158 @@
+"""
+OAuth identity lookup and signup.
+
+Returning users are resolved from a short-TTL cache mapping
+(provider, oauth_id) to a snapshot of their User and UserProfile rows, so a
+warm login touches the database zero times and a cold one runs a single
+indexed SELECT. Signup inserts the user and profile in one guarded
+transaction without going through the post_save profile signals.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models.fields.files import FieldFile
+from rest_framework.exceptions import ValidationError
+
+from .models import DEFAULT_BIO, UserProfile
+
+User = get_user_model()
+
+IDENTITY_CACHE_KEY = "accounts:oauth-identity:{}:{}"
+SNAPSHOT_CACHE_KEY = "accounts:oauth-user:{}"
+
+
+# ---------------------------
+# Row snapshots
+# ---------------------------
+def _field_values(instance):
+    values = []
+    for field in instance._meta.concrete_fields:
+        value = getattr(instance, field.attname)
+        if isinstance(value, FieldFile):
+            value = value.name
+        values.append(value)
+    return values
+
+
+def _snapshot(user):
+    return {"user": _field_values(user), "profile": _field_values(user.profile)}
+
+
+def _restore(snapshot):
+    """
+    Rebuild a User with its profile attached, exactly as if loaded with
+    ``select_related("profile")``.
+    """
+    user = User.from_db(
+        DEFAULT_DB_ALIAS, [f.attname for f in User._meta.concrete_fields], snapshot["user"]
+    )
+    user.profile = UserProfile.from_db(
+        DEFAULT_DB_ALIAS, [f.attname for f in UserProfile._meta.concrete_fields], snapshot["profile"]
+    )
+    return user
+
+
+def cache_oauth_user(provider, oauth_id, user):
+    if not hasattr(user, "profile"):
+        return
+    ttl = settings.OAUTH_IDENTITY_CACHE_TTL
+    cache.set_many(
+        {
+            IDENTITY_CACHE_KEY.format(provider, oauth_id): user.pk,
+            SNAPSHOT_CACHE_KEY.format(user.pk): _snapshot(user),
+        },
+        ttl,
+    )
+
+
+def get_cached_oauth_user(provider, oauth_id):
+    user_id = cache.get(IDENTITY_CACHE_KEY.format(provider, oauth_id))
+    if user_id is None:
+        return None
+    snapshot = cache.get(SNAPSHOT_CACHE_KEY.format(user_id))
+    if snapshot is None:
+        return None
+    user = _restore(snapshot)
+    # The identity entry may predate a change of the user's provider id.
+    return user if getattr(user, f"{provider}_id") == oauth_id else None
+
+
+def invalidate_oauth_user(user_id):
+    """
+    Drop the cached snapshot of a user; called when the User or UserProfile row changes.
+    """
+    cache.delete(SNAPSHOT_CACHE_KEY.format(user_id))
+
+
+def invalidate_oauth_users(user_ids):
+    cache.delete_many([SNAPSHOT_CACHE_KEY.format(user_id) for user_id in user_ids])
+
+
+# ---------------------------
+# Lookup / signup
+# ---------------------------
+def oauth_username(email):
+    """
+    The email, or when it is longer than a username may be, its start plus
+    a hash of the whole address (so distinct emails stay distinct).
+    """
+    limit = User._meta.get_field("username").max_length
+    if len(email) <= limit:
+        return email
+    digest = hashlib.sha256(email.encode()).hexdigest()[:16]
+    return f"{email[:limit - len(digest) - 1]}-{digest}"
+
+
+def get_or_create_oauth_user(provider, oauth_id, email=None, profile_data=None):
+    """
+    Return (user, created) for an OAuth identity, creating a verified,
+    password-less student on first login.
+    """
+    user = get_cached_oauth_user(provider, oauth_id)
+    if user is not None:
+        return user, False
+
+    lookup_field = f"{provider}_id"
+    user = User.objects.select_related("profile").filter(**{lookup_field: oauth_id}).first()
+    if user is not None:
+        cache_oauth_user(provider, oauth_id, user)
+        return user, False
+
+    if not email:
+        raise ValidationError("Email is required for new OAuth users.")
+    if len(email) > User._meta.get_field("email").max_length:
+        raise ValidationError({"email": ["Email is too long."]})
+
+    # bulk_create skips User.save() and its signals, so apply their effects here.
+    user = User(
+        email=email,
+        username=oauth_username(email),
+        role=User.STUDENT,
+        is_approved=True,
+        is_verified=True,
+        oauth_provider=provider,
+        password=make_password(None),
+        **{lookup_field: oauth_id},
+    )
+    profile = UserProfile(user=user, **{"bio": DEFAULT_BIO, **(profile_data or {})})
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create([user])
+            profile.user = user
+            UserProfile.objects.bulk_create([profile])
+    except IntegrityError:
+        # Either a concurrent login for the same identity won the race,
+        # or the email already belongs to another account.
+        user = User.objects.select_related("profile").filter(**{lookup_field: oauth_id}).first()
+        if user is None:
+            raise ValidationError({"email": ["A user with that email already exists."]})
+        cache_oauth_user(provider, oauth_id, user)
+        return user, False
+
+    user.profile = profile
+    cache_oauth_user(provider, oauth_id, user)
+    return user, True
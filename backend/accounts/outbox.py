@@ -0,0 +1,178 @@
+"""
+Durable email outbox.
+
+``OutboxEmailBackend`` is installed as ``EMAIL_BACKEND`` so every
+``send_mail``/``EmailMessage.send`` (including allauth's password reset)
+only inserts a row. The ``send_outbox`` command delivers queued rows through
+``OUTBOX_DELIVERY_BACKEND`` in batches, one connection per batch, retrying
+failures with exponential backoff. A batch is claimed in a short
+``SELECT ... FOR UPDATE SKIP LOCKED`` transaction that leases its rows for
+``OUTBOX_CLAIM_SECONDS``; sending happens after that transaction commits, so
+no row locks are held while talking to the mail server.
+
+Messages are only deduplicated when sent inside ``deduplicate_pending(key)``
+(the password reset flow does this); all other mail is queued as is.
+"""
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+_dedupe_key = ContextVar("outbox_dedupe_key", default=None)
+
+
+@contextmanager
+def deduplicate_pending(key):
+    """
+    Messages sent inside the block replace a still-pending message queued
+    under the same ``key``, e.g. one per address for repeated password
+    reset requests.
+    """
+    token = _dedupe_key.set(hashlib.sha256(key.encode()).hexdigest())
+    try:
+        yield
+    finally:
+        _dedupe_key.reset(token)
+
+
+def enqueue_email(message, dedupe_key=None):
+    """
+    Store an EmailMessage for background delivery.
+    If a pending message has the same ``dedupe_key`` it is overwritten
+    with this (newer) content instead.
+    """
+    fields = {
+        "subject": message.subject,
+        "body": message.body,
+        "from_email": message.from_email or settings.DEFAULT_FROM_EMAIL,
+        "to": list(message.to),
+        "cc": list(message.cc),
+        "bcc": list(message.bcc),
+        "reply_to": list(message.reply_to),
+        "headers": dict(message.extra_headers),
+        "alternatives": [list(alt) for alt in getattr(message, "alternatives", [])],
+        "next_attempt_at": timezone.now(),
+    }
+    if dedupe_key is None:
+        OutboxEmail.objects.create(**fields)
+        return
+
+    pending = OutboxEmail.objects.filter(status=OutboxEmail.PENDING, dedupe_key=dedupe_key)
+    if not pending.update(**fields):
+        try:
+            with transaction.atomic():
+                OutboxEmail.objects.create(dedupe_key=dedupe_key, **fields)
+        except IntegrityError:
+            # A concurrent request queued the same message first.
+            pending.update(**fields)
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """
+    Email backend that queues messages in the outbox instead of sending them.
+    """
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            enqueue_email(message, dedupe_key=_dedupe_key.get())
+        return len(email_messages)
+
+
+# ---------------------------
+# Delivery
+# ---------------------------
+def _build_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.to,
+        cc=email.cc,
+        bcc=email.bcc,
+        reply_to=email.reply_to,
+        headers=email.headers,
+        connection=connection,
+    )
+    for content, mimetype in email.alternatives:
+        message.attach_alternative(content, mimetype)
+    return message
+
+
+def retry_delay(attempts):
+    base = settings.OUTBOX_RETRY_BASE_SECONDS
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), settings.OUTBOX_RETRY_MAX_SECONDS))
+
+
+def _record_failure(email, error):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        email.status = OutboxEmail.FAILED
+    else:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+
+
+def claim_batch(batch_size):
+    """
+    Lease up to ``batch_size`` due messages to this worker: their
+    ``next_attempt_at`` moves ``OUTBOX_CLAIM_SECONDS`` ahead, so other
+    workers skip them, and they become due again if this one dies.
+    """
+    with transaction.atomic():
+        batch = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.PENDING, next_attempt_at__lte=timezone.now())
+            .order_by("next_attempt_at")[:batch_size]
+        )
+        if batch:
+            OutboxEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+                next_attempt_at=timezone.now() + timedelta(seconds=settings.OUTBOX_CLAIM_SECONDS)
+            )
+    return batch
+
+
+def deliver_batch(batch_size=None):
+    """
+    Claim up to ``batch_size`` due messages and send them over one
+    connection. Returns (sent, failed) counts for the batch.
+    """
+    batch = claim_batch(batch_size or settings.OUTBOX_BATCH_SIZE)
+    if not batch:
+        return 0, 0
+    sent = failed = 0
+
+    connection = get_connection(settings.OUTBOX_DELIVERY_BACKEND)
+    try:
+        connection.open()
+    except Exception as e:
+        # Mail server unreachable: reschedule the whole batch.
+        for email in batch:
+            _record_failure(email, e)
+        failed = len(batch)
+    else:
+        try:
+            for email in batch:
+                try:
+                    _build_message(email, connection).send()
+                except Exception as e:
+                    _record_failure(email, e)
+                    failed += 1
+                else:
+                    email.attempts += 1
+                    email.status = OutboxEmail.SENT
+                    email.sent_at = timezone.now()
+                    sent += 1
+        finally:
+            connection.close()
+
+    OutboxEmail.objects.bulk_update(batch, ["status", "attempts", "last_error", "next_attempt_at", "sent_at"])
+    return sent, failed
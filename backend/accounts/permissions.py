@@ -1,5 +1,7 @@
+from rest_framework.filters import BaseFilterBackend
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldDoesNotExist
 
 User = get_user_model()
 
@@ -15,6 +17,11 @@ class HasRole(BasePermission):
 
     allowed_roles = []
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Precomputed once per class; membership checks are O(1).
+        cls.allowed_roles = frozenset(cls.allowed_roles)
+
     def has_permission(self, request, view):
         user = request.user
         return (
@@ -39,6 +46,57 @@ class IsAdmin(HasRole):
     allowed_roles = [User.ADMIN]
 
 
+class IsInstructorOrAdmin(HasRole):
+    allowed_roles = [User.INSTRUCTOR, User.ADMIN]
+
+
+# ---------------------------
+# Ownership by foreign key
+# ---------------------------
+DEFAULT_OWNER_FIELDS = ("owner", "user")
+
+
+def get_owner_field(model, view=None):
+    """
+    The foreign key naming an object's owner: ``view.owner_field`` if set,
+    else the first of "owner"/"user" that the model has.
+    """
+    names = (view.owner_field,) if getattr(view, "owner_field", None) else DEFAULT_OWNER_FIELDS
+    for name in names:
+        try:
+            return model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+    return None
+
+
+def is_owner(request, view, obj):
+    """
+    Compare the owner's id column (``owner_id``) with the request user's
+    pk, without loading the related user. The pk is converted to the
+    column's type first, so token users with string ids compare equal.
+    """
+    field = get_owner_field(type(obj), view)
+    if field is None or request.user.pk is None:
+        return False
+    return getattr(obj, field.attname) == field.target_field.to_python(request.user.pk)
+
+
+class OwnerFilterBackend(BaseFilterBackend):
+    """
+    Narrows list querysets to the request user's own rows in SQL
+    (``WHERE owner_id = <user pk>``). Admins see every row.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if getattr(request.user, "role", None) == User.ADMIN:
+            return queryset
+        field = get_owner_field(queryset.model, view)
+        if field is None:
+            return queryset.none()
+        return queryset.filter(**{field.attname: request.user.pk})
+
+
 # ---------------------------
 # Object-Level Permission: Owner or Read-Only
 # ---------------------------
@@ -51,7 +109,16 @@ class IsOwnerOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in SAFE_METHODS:
             return True
+        return is_owner(request, view, obj)
+
 
-        # Check for 'owner' attribute first, then fallback to 'user'
-        owner = getattr(obj, "owner", getattr(obj, "user", None))
-        return owner is not None and owner == request.user
+# ---------------------------
+# Object-Level Permission: Owner or Admin
+# ---------------------------
+class IsOwnerOrAdmin(BasePermission):
+    """
+    Object-level permission for the owner of an object and admins.
+    """
+
+    def has_object_permission(self, request, view, obj):
+        return getattr(request.user, "role", None) == User.ADMIN or is_owner(request, view, obj)
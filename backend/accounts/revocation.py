@@ -0,0 +1,240 @@
+"""
+Token revocation without a database query per request.
+
+Revoked JTIs live in the ``RevokedToken`` table and "log out everywhere"
+cutoffs in ``UserTokenCutoff``. Every worker mirrors them in memory: the
+JTIs in a Bloom filter, the cutoffs in a dict. A daemon thread pulls rows
+added since the previous pass every ``REVOCATION_SYNC_INTERVAL`` seconds,
+so a revocation made on one worker reaches the others within that window
+(immediately on the worker that made it).
+
+A token is checked against the cutoff dict and the filter only; the
+database is asked to confirm the rare filter hit, which weeds out false
+positives. Expired rows are removed by ``manage.py prune_revoked_tokens``.
+"""
+import datetime
+import hashlib
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import RevokedToken, UserTokenCutoff
+
+logger = logging.getLogger(__name__)
+
+# Re-read rows this far behind the previous pass to cover clock skew
+# between workers and transactions that committed late.
+SYNC_OVERLAP = datetime.timedelta(seconds=30)
+# Passes between full reloads, which drop expired JTIs from the filter.
+FULL_RELOAD_EVERY = 120
+MAX_CONFIRMED = 10000
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings (blake2b, double hashing).
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.capacity = capacity
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * step) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        added = False
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            if not self._bits[byte] & (1 << bit):
+                self._bits[byte] |= 1 << bit
+                added = True
+        if added:
+            self.count += 1
+
+    def __contains__(self, key):
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationSet:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sync_lock = threading.RLock()
+        self._thread = None
+        self._loaded = False
+        self._synced_at = None
+        self._passes = 0
+        self.bloom_hits = 0
+        self.false_positives = 0
+        self._reset()
+
+    def _reset(self, capacity=None):
+        self._bloom = BloomFilter(
+            capacity or settings.REVOCATION_BLOOM_CAPACITY, settings.REVOCATION_BLOOM_ERROR_RATE
+        )
+        self._cutoffs = {}
+        # jti -> bool for filter hits already looked up in the database.
+        self._confirmed = {}
+
+    def clear(self):
+        """
+        Forget all revocations held in memory (tests).
+        """
+        with self._lock:
+            self._reset()
+            self._synced_at = None
+
+    # ---------------------------
+    # Checks
+    # ---------------------------
+    def is_revoked(self, payload):
+        """
+        Whether a validated token payload (access or refresh) has been revoked.
+        """
+        self._ensure_loaded()
+        user_id = payload.get(api_settings.USER_ID_CLAIM)
+        cutoff = self._cutoffs.get(str(user_id))
+        # ``iat`` has one-second resolution; tokens issued in the second of
+        # the cutoff are treated as revoked.
+        if cutoff is not None and payload.get("iat", 0) <= cutoff:
+            return True
+
+        jti = payload.get(api_settings.JTI_CLAIM)
+        if not jti or jti not in self._bloom:
+            return False
+        return self._confirm(jti)
+
+    def _confirm(self, jti):
+        revoked = self._confirmed.get(jti)
+        if revoked is None:
+            self.bloom_hits += 1
+            revoked = RevokedToken.objects.filter(jti=jti).exists()
+            if not revoked:
+                self.false_positives += 1
+            with self._lock:
+                if len(self._confirmed) >= MAX_CONFIRMED:
+                    self._confirmed.clear()
+                self._confirmed[jti] = revoked
+        return revoked
+
+    # ---------------------------
+    # Revoking
+    # ---------------------------
+    def revoke_token(self, token):
+        """
+        Revoke a single simplejwt token (refresh or access) until it expires.
+        """
+        jti = token[api_settings.JTI_CLAIM]
+        expires_at = datetime.datetime.fromtimestamp(token["exp"], tz=datetime.timezone.utc)
+        try:
+            RevokedToken.objects.get_or_create(
+                jti=jti,
+                defaults={"user_id": token[api_settings.USER_ID_CLAIM], "expires_at": expires_at},
+            )
+        except IntegrityError:
+            pass  # revoked concurrently
+        with self._lock:
+            self._bloom.add(jti)
+            self._confirmed[jti] = True
+
+    def revoke_user_tokens(self, user_id):
+        """
+        Revoke every token issued to the user so far.
+        """
+        now = timezone.now()
+        UserTokenCutoff.objects.update_or_create(user_id=user_id, defaults={"revoked_before": now})
+        with self._lock:
+            self._cutoffs[str(user_id)] = int(now.timestamp())
+
+    # ---------------------------
+    # Synchronisation
+    # ---------------------------
+    def sync(self, full=False):
+        """
+        Pull revocations made by other workers: everything on the first pass
+        (or with ``full``), otherwise rows added since the previous pass.
+        """
+        with self._sync_lock:
+            started = timezone.now()
+            self._passes += 1
+            full = (
+                full
+                or self._synced_at is None
+                or self._passes % FULL_RELOAD_EVERY == 0
+                or self._bloom.count > self._bloom.capacity
+            )
+            tokens = RevokedToken.objects.filter(expires_at__gt=started)
+            cutoffs = UserTokenCutoff.objects.all()
+            if not full:
+                since = self._synced_at - SYNC_OVERLAP
+                tokens = tokens.filter(revoked_at__gte=since)
+                cutoffs = cutoffs.filter(updated_at__gte=since)
+            jtis = list(tokens.values_list("jti", flat=True))
+            cutoff_rows = list(cutoffs.values_list("user_id", "revoked_before"))
+
+            with self._lock:
+                if full:
+                    self._reset(capacity=max(settings.REVOCATION_BLOOM_CAPACITY, 2 * len(jtis)))
+                for jti in jtis:
+                    self._bloom.add(jti)
+                    if self._confirmed.get(jti) is False:
+                        del self._confirmed[jti]
+                for user_id, revoked_before in cutoff_rows:
+                    self._cutoffs[str(user_id)] = int(revoked_before.timestamp())
+                self._synced_at = started
+            return len(jtis), len(cutoff_rows)
+
+    def _ensure_loaded(self):
+        """
+        Load the set on first use and start the background sync.
+        ``REVOCATION_SYNC_INTERVAL = 0`` disables both (tests call ``sync``).
+        """
+        if self._loaded or not settings.REVOCATION_SYNC_INTERVAL:
+            return
+        with self._sync_lock:
+            if self._loaded:
+                return
+            self.sync(full=True)
+            self._thread = threading.Thread(target=self._run, name="revocation-sync", daemon=True)
+            self._thread.start()
+            self._loaded = True
+
+    def _run(self):
+        while True:
+            time.sleep(settings.REVOCATION_SYNC_INTERVAL)
+            try:
+                self.sync()
+            except Exception:
+                logger.exception("Failed to sync revoked tokens")
+            finally:
+                close_old_connections()
+
+
+revocation_set = RevocationSet()
+
+
+def prune_revoked_tokens(now=None):
+    """
+    Delete revocations that no longer matter: expired tokens, and cutoffs
+    older than the longest refresh token lifetime. Returns (tokens, cutoffs).
+    """
+    now = now or timezone.now()
+    tokens, _ = RevokedToken.objects.filter(expires_at__lte=now).delete()
+    cutoffs, _ = UserTokenCutoff.objects.filter(
+        revoked_before__lte=now - api_settings.REFRESH_TOKEN_LIFETIME
+    ).delete()
+    return tokens, cutoffs
@@ -2,30 +2,55 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 from rest_framework import serializers
-from .models import UserProfile
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from karpithal.serializers import ValuesSerializer
+from .approvals import APPROVAL_ACTIONS
+from .authentication import ClaimsRefreshToken, get_user_claims
+from .images import is_processed_picture, validate_profile_picture_upload
+from .models import UserProfile, picture_variant_urls
+from .oauth import get_or_create_oauth_user
 
 User = get_user_model()
+PROFILE_PICTURE_STORAGE = UserProfile._meta.get_field("profile_picture").storage
 
 
 # ---------------------------
 # UserProfile Serializer
 # ---------------------------
 class UserProfileSerializer(serializers.ModelSerializer):
-    profile_picture = serializers.ImageField(required=False, allow_null=True)
+    # FileField rather than ImageField: validation reads only the image header.
+    profile_picture = serializers.FileField(required=False, allow_null=True)
+    profile_picture_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = UserProfile
-        fields = ["bio", "profile_picture"]
+        fields = ["bio", "profile_picture", "profile_picture_variants"]
 
     def validate_profile_picture(self, value):
         if value:
-            if value.size > 5 * 1024 * 1024:
-                raise ValidationError("Profile picture size must be less than 5MB.")
-            ext = value.name.split(".")[-1].lower()
-            if ext not in ["jpg", "jpeg", "png"]:
-                raise ValidationError("Only PNG, JPG, or JPEG files are allowed.")
+            validate_profile_picture_upload(value)
         return value
 
+    def get_profile_picture_variants(self, obj):
+        return absolute_variant_urls(obj.get_picture_variant_urls(), self.context.get("request"))
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if not is_processed_picture(instance.profile_picture.name, instance.picture_variants):
+            data["profile_picture"] = None
+        return data
+
+
+def absolute_variant_urls(urls, request):
+    if request is None:
+        return urls
+    return {
+        size: {fmt: request.build_absolute_uri(url) for fmt, url in formats.items()}
+        for size, formats in urls.items()
+    }
+
 
 # ---------------------------
 # User Registration Serializer
@@ -57,6 +82,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         profile_data = validated_data.pop("profile", None)
         password = validated_data.pop("password", None)
         oauth_provider = validated_data.pop("oauth_provider", None)
+        password_hash = validated_data.pop("password_hash", None)
 
         user = User(**validated_data)
 
@@ -68,7 +94,11 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         else:
             if not password:
                 raise ValidationError("Password is required for email signup.")
-            user.set_password(password)
+            if password_hash:
+                # Already hashed off the request thread by the async view
+                user.password = password_hash
+            else:
+                user.set_password(password)
 
         user.save()
 
@@ -78,6 +108,70 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
+# ---------------------------
+# JWT Login Serializer
+# ---------------------------
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Login serializer issuing tokens that carry role/approval/active claims.
+    """
+    token_class = ClaimsRefreshToken
+
+
+class RevocationAwareTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh serializer that also rejects revoked refresh tokens (from the
+    in-memory revocation set). Like simplejwt it loads the User row and
+    applies USER_AUTHENTICATION_RULE, so a deactivated or deleted user
+    cannot mint tokens; the new access token carries the row's current claims.
+    """
+    token_class = ClaimsRefreshToken
+
+    default_error_messages = {"token_revoked": "Token has been revoked."}
+
+    def validate(self, attrs):
+        from .revocation import revocation_set
+
+        refresh = self.token_class(attrs["refresh"])
+        if revocation_set.is_revoked(refresh.payload):
+            raise AuthenticationFailed(self.error_messages["token_revoked"], "token_revoked")
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first() if user_id else None
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+        claims = get_user_claims(user)
+
+        access = refresh.access_token
+        for claim, value in claims.items():
+            access[claim] = value
+        data = {"access": str(access)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                revocation_set.revoke_token(refresh)
+            for claim, value in claims.items():
+                refresh[claim] = value
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+        return data
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
+
+    def validate_refresh(self, value):
+        try:
+            token = ClaimsRefreshToken(value)
+        except TokenError:
+            raise serializers.ValidationError("Invalid or expired refresh token.")
+        if str(token.get(api_settings.USER_ID_CLAIM)) != str(self.context["request"].user.pk):
+            raise serializers.ValidationError("Refresh token belongs to another user.")
+        return token
+
+
 # ---------------------------
 # OAuth Login Serializer
 # ---------------------------
@@ -100,28 +194,12 @@ class OAuthLoginSerializer(serializers.Serializer):
         """
         Returns existing user if oauth_id exists, otherwise creates a new OAuth user.
         """
-        provider = self.validated_data["provider"]
-        oauth_id = self.validated_data["oauth_id"]
-        email = self.validated_data.get("email")
-        profile_data = self.validated_data.get("profile", {})
-
-        lookup_field = f"{provider}_id"
-        user_qs = User.objects.filter(**{lookup_field: oauth_id})
-        if user_qs.exists():
-            return user_qs.first(), False
-
-        if not email:
-            raise ValidationError("Email is required for new OAuth users.")
-
-        user_data = {"email": email, "role": User.STUDENT, lookup_field: oauth_id, "is_verified": True}
-        user = User.objects.create(**user_data)
-        user.set_unusable_password()
-        user.save()
-
-        if profile_data:
-            UserProfile.objects.create(user=user, **profile_data)
-
-        return user, True
+        return get_or_create_oauth_user(
+            self.validated_data["provider"],
+            self.validated_data["oauth_id"],
+            email=self.validated_data.get("email"),
+            profile_data=self.validated_data.get("profile"),
+        )
 
 
 # ---------------------------
@@ -144,6 +222,38 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "role", "is_active", "is_verified", "is_approved"]
 
 
+# ---------------------------
+# Read-only fast path (.values() rows)
+# ---------------------------
+class UserProfileReadSerializer(ValuesSerializer):
+    """
+    UserProfileSerializer output from ``UserProfile.objects.values(*lookups())`` rows.
+    """
+    serializer_class = UserProfileSerializer
+    method_lookups = {
+        "profile_picture": ("profile_picture", "picture_variants"),
+        "profile_picture_variants": ("picture_variants",),
+    }
+
+    def get_profile_picture(self, row, prefix):
+        name = row[prefix + "profile_picture"]
+        if not is_processed_picture(name, row[prefix + "picture_variants"]):
+            return None
+        return self.file_url(name, PROFILE_PICTURE_STORAGE)
+
+    def get_profile_picture_variants(self, row, prefix):
+        urls = picture_variant_urls(row[prefix + "picture_variants"], PROFILE_PICTURE_STORAGE)
+        return absolute_variant_urls(urls, self.context.get("request"))
+
+
+class UserReadSerializer(UserProfileReadSerializer):
+    """
+    UserSerializer output from ``User.objects.values(*lookups())`` rows,
+    or from a user instance with ``from_instance``.
+    """
+    serializer_class = UserSerializer
+
+
 # ---------------------------
 # Admin User Serializer
 # ---------------------------
@@ -168,6 +278,16 @@ class UserSerializerForAdmin(serializers.ModelSerializer):
             "is_verified": {"required": True},
             "is_approved": {"required": True},
         }
+# ---------------------------
+# Admin Bulk Approval Serializer
+# ---------------------------
+class UserApprovalSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000
+    )
+    action = serializers.ChoiceField(choices=APPROVAL_ACTIONS)
+
+
 # ---------------------------
 # Change Password Serializer    
 # ---------------------------
@@ -180,7 +300,10 @@ class ChangePasswordSerializer(serializers.Serializer):
     confirm_new_password = serializers.CharField(write_only=True, required=True)
 
     def validate_old_password(self, value):
-        user = self.context['request'].user
+        if self.context.get('defer_password_check'):
+            # The async view checks it on the hashing pool instead
+            return value
+        user = self.context['user']
         if not user.check_password(value):
             raise ValidationError("Old password is incorrect.")
         return value
@@ -190,9 +313,12 @@ class ChangePasswordSerializer(serializers.Serializer):
             raise ValidationError({"confirm_new_password": "New passwords do not match."})
         return attrs
 
-    def save(self, **kwargs):
-        user = self.context['request'].user
-        user.set_password(self.validated_data['new_password'])
+    def save(self, password_hash=None, **kwargs):
+        user = self.context['user']
+        if password_hash:
+            user.password = password_hash
+        else:
+            user.set_password(self.validated_data['new_password'])
         user.save()
         return user
 
@@ -234,11 +360,15 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
         attrs['user'] = user
         return attrs
 
-    def save(self, **kwargs):
+    def save(self, password_hash=None, **kwargs):
         """
         Sets the new password for the validated user.
+        ``password_hash`` is a precomputed hash from the async view.
         """
         user = self.validated_data['user']
-        user.set_password(self.validated_data['new_password'])
+        if password_hash:
+            user.password = password_hash
+        else:
+            user.set_password(self.validated_data['new_password'])
         user.save()
         return user
\ No newline at end of file
@@ -1,11 +1,13 @@
 import logging
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.core.exceptions import ObjectDoesNotExist
-from .models import User, UserProfile
+from .authentication import claims_cache, get_user_claims
+from .images import profile_picture_needs_processing, schedule_profile_picture_processing
+from .models import DEFAULT_BIO, User, UserProfile
+from .oauth import invalidate_oauth_user
 
 logger = logging.getLogger(__name__)
-DEFAULT_BIO = "Welcome to my Karpithal profile!"
 
 @receiver(post_save, sender=User)
 def create_or_ensure_user_profile(sender, instance, created, **kwargs):
@@ -14,15 +16,46 @@ def create_or_ensure_user_profile(sender, instance, created, **kwargs):
     - Creates profile with default bio for new users.
     - Ensures existing users without profiles get one.
     """
-    user_identifier = instance.email  # Use email for logging
-
     try:
         profile, created_profile = UserProfile.objects.get_or_create(
             user=instance, defaults={"bio": DEFAULT_BIO}
         )
         if created_profile:
-            logger.info(f"UserProfile created for user '{user_identifier}'.")
-    except Exception as e:
-        logger.error(
-            f"Failed to create or ensure UserProfile for user '{user_identifier}': {str(e)}"
-        )
+            # Arguments, not f-strings: the message is only built if the record is written.
+            logger.info("UserProfile created for user '%s'.", instance.email)
+    except Exception:
+        logger.exception("Failed to create or ensure UserProfile for user '%s'", instance.email)
+
+
+@receiver(post_save, sender=User)
+def publish_user_claims(sender, instance, **kwargs):
+    """
+    Publishes the user's current role/approval/active state so that
+    tokens issued with older claims pick up the change within
+    CLAIMS_AUTH_CACHE_TTL seconds.
+    """
+    claims_cache.publish(str(instance.pk), get_user_claims(instance))
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_claims(sender, instance, **kwargs):
+    claims = get_user_claims(instance)
+    claims["is_active"] = False
+    claims_cache.publish(str(instance.pk), claims)
+
+
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=UserProfile)
+def invalidate_oauth_snapshot(sender, instance, **kwargs):
+    invalidate_oauth_user(instance.pk if sender is User else instance.user_id)
+
+
+@receiver(post_save, sender=UserProfile)
+def process_new_profile_picture(sender, instance, update_fields=None, **kwargs):
+    """
+    Builds resized variants off the request path whenever the picture changes.
+    """
+    if update_fields and "profile_picture" not in update_fields:
+        return
+    if profile_picture_needs_processing(instance):
+        schedule_profile_picture_processing(instance)
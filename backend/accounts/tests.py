@@ -1,8 +1,20 @@
+import importlib.util
+import io
+import json
+import logging
+import os
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.test import RequestFactory, SimpleTestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APITestCase
-from .models import UserProfile
+from rest_framework.test import APITestCase, APITransactionTestCase
+from karpithal.testing import QueryBudgetTestMixin
+from .models import DEFAULT_BIO, UserProfile
+from .views import UserMeView
 
 User = get_user_model()
 
@@ -99,6 +111,38 @@ class OAuthLoginTest(APITestCase):
         self.assertTrue(response.data['created'])
         self.assertEqual(response.data['user']['email'], "oauthuser@example.com")
 
+    def test_returning_oauth_user_hits_identity_cache(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        url = reverse("accounts:oauth-login")
+        data = {"provider": "github", "oauth_id": "gh42", "email": "gh@example.com"}
+        self.client.post(url, data, format='json')
+
+        with self.assertNumQueries(0):
+            response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['created'])
+        self.assertEqual(response.data['user']['profile']['bio'], "Welcome to my Karpithal profile!")
+
+    def test_oauth_signup_defaults_and_long_email(self):
+        from .oauth import get_or_create_oauth_user
+
+        email = "a" * 160 + "@example.com"
+        user, created = get_or_create_oauth_user("google", "g-long", email=email)
+        self.assertTrue(created)
+        user.refresh_from_db()
+        self.assertEqual(user.email, email)
+        self.assertLessEqual(len(user.username), 150)
+        self.assertEqual(UserProfile.objects.get(user=user).bio, DEFAULT_BIO)
+
+    def test_oauth_signup_with_taken_email_is_rejected(self):
+        User.objects.create(username="taken@example.com", email="taken@example.com")
+        url = reverse("accounts:oauth-login")
+        data = {"provider": "google", "oauth_id": "g-taken", "email": "taken@example.com"}
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class PasswordResetTest(APITestCase):
     def setUp(self):
@@ -124,3 +168,1078 @@ class PasswordResetTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.user.refresh_from_db()
         self.assertTrue(self.user.check_password("NewPass123!"))
+
+
+class ClaimsJWTAuthenticationTest(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from .authentication import claims_cache
+
+        cache.clear()
+        claims_cache.clear()
+        self.student = User.objects.create(
+            username="claims@example.com", email="claims@example.com", role=User.STUDENT
+        )
+        self.url = reverse("accounts:student-only")
+
+    def authenticate(self):
+        from .authentication import ClaimsRefreshToken
+
+        access = ClaimsRefreshToken.for_user(self.student).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def test_role_gated_view_makes_no_queries(self):
+        self.authenticate()
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_role_change_overrides_token_claims(self):
+        self.authenticate()
+        self.student.role = User.INSTRUCTOR
+        self.student.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_token_user_pk_matches_model_pk(self):
+        from .authentication import ClaimsJWTAuthentication, ClaimsRefreshToken
+
+        access = ClaimsRefreshToken.for_user(self.student).access_token
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+        user, _ = ClaimsJWTAuthentication().authenticate(request)
+        self.assertEqual(user.pk, self.student.pk)
+        self.assertEqual(user.id, self.student.id)
+
+    def test_deactivated_user_is_rejected(self):
+        self.authenticate()
+        self.student.is_active = False
+        self.student.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class UserImportTest(APITestCase):
+    CSV = (
+        "email,password,role,first_name\n"
+        "new.student@example.com,ImportPass123!,student,Ada\n"
+        "not-an-email,ImportPass123!,student,\n"
+        "existing@example.com,ImportPass123!,student,\n"
+        "new.instructor@example.com,,instructor,\n"
+    )
+
+    def setUp(self):
+        User.objects.create(username="existing@example.com", email="existing@example.com")
+
+    def test_importer_creates_users_and_reports_bad_rows(self):
+        from .importers import UserImporter, read_rows
+
+        report = UserImporter(batch_size=2, workers=0).run(read_rows(self.CSV.splitlines(True), "csv"))
+
+        self.assertEqual(report["created"], 2)
+        self.assertEqual([e["row"] for e in report["errors"]], [2, 3])
+        student = User.objects.get(email="new.student@example.com")
+        self.assertTrue(student.is_approved)
+        self.assertTrue(student.check_password("ImportPass123!"))
+        self.assertTrue(UserProfile.objects.filter(user=student).exists())
+        instructor = User.objects.get(email="new.instructor@example.com")
+        self.assertFalse(instructor.is_approved)
+        self.assertFalse(instructor.has_usable_password())
+
+    def test_overlong_values_are_row_errors(self):
+        from .importers import UserImporter, read_rows
+
+        long_email = "a" * 140 + "@example.com"  # valid email, longer than a username may be
+        rows = [(1, {"email": long_email}), (2, {"email": "ok@example.com", "last_name": "x" * 151})]
+        report = UserImporter(workers=0).run(rows)
+
+        self.assertEqual(report["created"], 0)
+        self.assertEqual([(e["row"], list(e["errors"])) for e in report["errors"]], [(1, ["email"]), (2, ["last_name"])])
+
+    def test_non_string_values_are_row_errors(self):
+        from .importers import UserImporter
+
+        rows = [(1, {"email": 123}), (2, {"email": "typed@example.com", "role": ["student"], "first_name": None})]
+        report = UserImporter(workers=0).run(rows)
+
+        self.assertEqual(report["created"], 0)
+        self.assertEqual(
+            [(e["row"], e["email"], e["errors"]) for e in report["errors"]],
+            [(1, None, {"email": ["Must be a string."]}), (2, "typed@example.com", {"role": ["Must be a string."]})],
+        )
+
+    def test_admin_import_endpoint(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        admin = User.objects.create(username="admin@example.com", email="admin@example.com", role=User.ADMIN)
+        self.client.force_authenticate(user=admin)
+        upload = SimpleUploadedFile(
+            "users.ndjson",
+            b'{"email": "row1@example.com", "password": "ImportPass123!"}\nnot json\n',
+        )
+        response = self.client.post(reverse("accounts:admin-import-users"), {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["created"], 1)
+        self.assertEqual(response.data["data"]["errors"][0]["row"], 2)
+        self.assertEqual(UserProfile.objects.get(user__email="row1@example.com").bio, DEFAULT_BIO)
+
+        latin1 = SimpleUploadedFile("users.csv", "email\nzoë@example.com\n".encode("latin-1"))
+        response = self.client.post(reverse("accounts:admin-import-users"), {"file": latin1}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncPasswordViewsTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="async@example.com", email="async@example.com", password="AsyncPass123!"
+        )
+
+    def test_async_login(self):
+        url = reverse("accounts:async-login")
+        response = self.client.post(url, {"email": "async@example.com", "password": "AsyncPass123!"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("access", response.json())
+
+        response = self.client.post(url, {"email": "async@example.com", "password": "wrong"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_async_login_checks_like_authenticate(self):
+        from django.contrib.auth.hashers import PBKDF2PasswordHasher
+        from unittest import mock
+
+        url = reverse("accounts:async-login")
+        self.user.password = PBKDF2PasswordHasher().encode("AsyncPass123!", "oldsalt", iterations=1000)
+        self.user.save(update_fields=["password"])
+        response = self.client.post(url, {"email": "async@example.com", "password": "AsyncPass123!"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertNotIn("$1000$", self.user.password)
+        self.assertTrue(self.user.check_password("AsyncPass123!"))
+
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        with mock.patch("accounts.async_views.get_hashing_pool") as get_pool:
+            get_pool.return_value.verify_password = mock.AsyncMock(return_value=(True, False))
+            response = self.client.post(url, {"email": "async@example.com", "password": "AsyncPass123!"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        get_pool.return_value.verify_password.assert_awaited_once()
+
+    def test_async_registration_is_atomic(self):
+        from unittest import mock
+
+        from django.db import DatabaseError
+
+        from karpithal.throttling import get_throttle_store
+
+        get_throttle_store().clear()
+        self.addCleanup(get_throttle_store().clear)
+        data = {"email": "atomic@example.com", "password": "AtomicPass123!", "profile": {"bio": "Hi"}}
+        with mock.patch.object(UserProfile.objects, "create", side_effect=DatabaseError), \
+                self.assertLogs("django.request", "ERROR"), self.assertRaises(DatabaseError):
+            self.client.post(reverse("accounts:async-user-register"), data, format="json")
+        self.assertFalse(User.objects.filter(email="atomic@example.com").exists())
+
+    def test_async_change_password(self):
+        from .views import get_tokens_for_user
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(self.user)['access']}")
+        url = reverse("accounts:async-change-password")
+        data = {
+            "old_password": "AsyncPass123!",
+            "new_password": "NewAsyncPass123!",
+            "confirm_new_password": "NewAsyncPass123!",
+        }
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("NewAsyncPass123!"))
+
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reset_confirm_attempts_are_throttled(self):
+        from karpithal.throttling import get_throttle_store
+
+        get_throttle_store().clear()
+        self.addCleanup(get_throttle_store().clear)
+        url = reverse("accounts:async-password-reset-confirm", args=["bad", "token"])
+        data = {"new_password": "NewAsyncPass123!", "confirm_new_password": "NewAsyncPass123!"}
+        responses = [self.client.post(url, data, format="json") for _ in range(6)]
+        self.assertEqual([r.status_code for r in responses[:5]], [status.HTTP_400_BAD_REQUEST] * 5)
+        self.assertEqual(responses[5].status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", responses[5])
+
+    def test_saturated_pool_rejects(self):
+        import asyncio
+        from .hashing import HashingPoolBusy, PasswordHashingPool
+
+        pool = PasswordHashingPool(workers=1, max_pending=0)
+        with self.assertRaises(HashingPoolBusy):
+            asyncio.run(pool.make_password("secret"))
+        self.assertEqual(pool.stats()["rejected"], 1)
+
+
+class QueryBudgetTest(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(username="budget@example.com", email="budget@example.com")
+        self.client.force_authenticate(user=self.user)
+
+    def test_user_me_within_budget(self):
+        with self.assertMaxQueries(1):
+            response = self.client.get(reverse("accounts:user-me"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_exceeded_budget_fails(self):
+        from karpithal.metrics import QueryBudgetExceeded
+
+        with patch.object(UserMeView, "query_budget", {"GET": 0}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse("accounts:user-me"))
+
+    def test_metrics_endpoint_reports_view(self):
+        self.client.get(reverse("accounts:user-me"))
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, status.HTTP_403_FORBIDDEN)
+
+        staff = User.objects.create(username="ops@example.com", email="ops@example.com", is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('django_view_db_queries_total{view="accounts:user-me"}', response.content.decode())
+
+    def test_metrics_endpoint_requires_configured_token(self):
+        staff = User.objects.create(username="ops@example.com", email="ops@example.com", is_staff=True)
+        self.client.force_login(staff)
+        with override_settings(METRICS_TOKEN="scrape-secret"):
+            self.assertEqual(self.client.get(reverse("metrics")).status_code, status.HTTP_403_FORBIDDEN)
+            self.client.logout()
+            response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-secret")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_middleware_runs_async(self):
+        import asyncio
+
+        from asgiref.sync import iscoroutinefunction
+        from django.http import HttpResponse
+        from karpithal.metrics import QueryBudgetMiddleware, view_query_stats
+
+        async def view(request):
+            return HttpResponse()
+
+        view_query_stats.reset()
+        middleware = QueryBudgetMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = asyncio.run(middleware(RequestFactory().get("/")))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(view_query_stats.snapshot()["<unresolved>"]["requests"], 1)
+
+
+@override_settings(
+    EMAIL_BACKEND="accounts.outbox.OutboxEmailBackend",
+    OUTBOX_DELIVERY_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+class EmailOutboxTest(APITestCase):
+    def setUp(self):
+        User.objects.create(username="outbox@example.com", email="outbox@example.com")
+
+    def test_reset_requests_are_queued_and_deduplicated(self):
+        from django.core import mail
+        from .models import OutboxEmail
+        from .outbox import deliver_batch
+
+        url = reverse("accounts:password-reset")
+        for _ in range(3):
+            response = self.client.post(url, {"email": "outbox@example.com"}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.PENDING).count(), 1)
+
+        self.assertEqual(deliver_batch(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["outbox@example.com"])
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmail.SENT)
+
+    def test_other_mail_is_not_deduplicated(self):
+        from django.core.mail import EmailMessage
+        from .models import OutboxEmail
+
+        for body in ("First", "Second"):
+            EmailMessage("Your receipt", body, to=["outbox@example.com"]).send()
+        self.assertEqual(
+            list(OutboxEmail.objects.order_by("pk").values_list("body", "dedupe_key")),
+            [("First", None), ("Second", None)],
+        )
+
+    def test_rows_are_leased_not_locked_while_sending(self):
+        from django.core.mail import EmailMessage
+        from django.db import connection
+        from django.utils import timezone
+        from .models import OutboxEmail
+        from .outbox import deliver_batch
+
+        EmailMessage("Hello", "Body", to=["outbox@example.com"]).send()
+        depth = len(connection.savepoint_ids)  # the test case's own transactions
+        seen = []
+
+        def send_messages(backend, messages):
+            seen.append((len(connection.savepoint_ids), OutboxEmail.objects.get().next_attempt_at > timezone.now()))
+            return len(messages)
+
+        with patch("django.core.mail.backends.locmem.EmailBackend.send_messages", send_messages):
+            self.assertEqual(deliver_batch(), (1, 0))
+        # Sent after the claiming transaction closed, with the row leased.
+        self.assertEqual(seen, [(depth, True)])
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmail.SENT)
+
+    def test_failed_delivery_is_retried_later(self):
+        from django.core.mail import EmailMessage
+        from .models import OutboxEmail
+        from .outbox import deliver_batch
+
+        EmailMessage("Hello", "Body", to=["outbox@example.com"]).send()
+        with patch("django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=OSError("down")):
+            self.assertEqual(deliver_batch(), (0, 1))
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.status, OutboxEmail.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, email.created_at)
+        self.assertEqual(deliver_batch(), (0, 0))
+
+
+class SlidingWindowThrottleTest(APITestCase):
+    def setUp(self):
+        from karpithal.throttling import get_throttle_store
+
+        get_throttle_store().clear()
+
+    def test_password_reset_scope_is_limited(self):
+        url = reverse("accounts:password-reset")
+        codes = [self.client.post(url, {"email": "nobody@example.com"}, format="json").status_code for _ in range(6)]
+        self.assertEqual(codes[:5], [status.HTTP_200_OK] * 5)
+        self.assertEqual(codes[5], status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_previous_window_weight_decays(self):
+        from karpithal.throttling import SlidingAnonRateThrottle
+
+        throttle = SlidingAnonRateThrottle()
+        throttle.num_requests, throttle.duration = 10, 60
+        request = self.client.get(reverse("accounts:student-only")).wsgi_request
+        with patch.object(throttle, "get_cache_key", return_value="k"):
+            throttle.timer = lambda: 59.0
+            for _ in range(10):
+                self.assertTrue(throttle.allow_request(request, None))
+            throttle.timer = lambda: 60.0 + 30.0
+            # Half of the previous window still counts: 10 * 0.5 + 6 > 10.
+            results = [throttle.allow_request(request, None) for _ in range(6)]
+        self.assertEqual(results, [True] * 5 + [False])
+
+    def test_locked_sqlite_store_fails_open_or_closed(self):
+        import shutil
+        import sqlite3
+        import tempfile
+
+        from karpithal.throttling import SQLiteThrottleStore
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = directory + "/throttle.sqlite3"
+        open_store = SQLiteThrottleStore(path, timeout=0.01)
+        closed_store = SQLiteThrottleStore(path, timeout=0.01, fail_open=False)
+        self.assertEqual(open_store.hit("k", 60, 1), (0, 1))
+        closed_store.connection  # creates the table before the lock is taken
+
+        locker = sqlite3.connect(path, isolation_level=None)
+        locker.execute("BEGIN EXCLUSIVE")
+        self.addCleanup(locker.close)
+        with self.assertLogs("karpithal.throttling", "WARNING"):
+            self.assertEqual(open_store.hit("k", 60, 1), (0, 0))
+            previous, current = closed_store.hit("k", 60, 1)
+        self.assertGreater(current, 10**9)
+
+
+class ProfilePictureVariantsTest(APITestCase):
+    def setUp(self):
+        import shutil
+        import tempfile
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, PROFILE_PICTURE_SIZES=[32, 64])
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create(username="pic@example.com", email="pic@example.com")
+
+    def _jpeg(self, name="avatar.jpg"):
+        from io import BytesIO
+
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from PIL import Image
+
+        exif = Image.Exif()
+        exif[0x010F] = "TestCamera"  # Make
+        buffer = BytesIO()
+        Image.new("RGB", (300, 200), "red").save(buffer, format="JPEG", exif=exif)
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+    def test_upload_builds_variants_without_exif(self):
+        from PIL import Image
+
+        profile = self.user.profile
+        profile.profile_picture = self._jpeg()
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        uploaded = profile.profile_picture.name
+
+        profile.refresh_from_db()
+        self.assertEqual(profile.picture_variants["source"], profile.profile_picture.name)
+        # The stripped copy is stored under a new name and the upload removed.
+        self.assertNotEqual(profile.profile_picture.name, uploaded)
+        self.assertTrue(profile.profile_picture.storage.exists(profile.profile_picture.name))
+        self.assertFalse(profile.profile_picture.storage.exists(uploaded))
+        self.assertEqual(set(profile.picture_variants["sizes"]), {"32", "64"})
+        with profile.profile_picture.open("rb") as fh, Image.open(fh) as image:
+            self.assertFalse(image.getexif())
+        with profile.profile_picture.storage.open(profile.picture_variants["sizes"]["32"]["webp"]) as fh:
+            with Image.open(fh) as image:
+                self.assertEqual((image.format, image.size), ("WEBP", (32, 32)))
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse("accounts:user-me"))
+        variants = response.data["profile"]["profile_picture_variants"]
+        self.assertTrue(variants["64"]["jpeg"].startswith("http://testserver/media/"))
+
+    def test_unprocessed_upload_url_is_not_served(self):
+        from .serializers import UserReadSerializer
+
+        profile = self.user.profile
+        profile.profile_picture = self._jpeg()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            profile.save()
+        self.client.force_authenticate(user=self.user)
+
+        # The stored file still carries the upload's EXIF until processing runs.
+        response = self.client.get(reverse("accounts:user-me"))
+        self.assertIsNone(response.data["profile"]["profile_picture"])
+        row = User.objects.values(*UserReadSerializer.lookups()).get(pk=self.user.pk)
+        self.assertIsNone(UserReadSerializer().to_representation(row)["profile"]["profile_picture"])
+
+        for callback in callbacks:
+            callback()
+        profile.refresh_from_db()
+        response = self.client.get(reverse("accounts:user-me"))
+        self.assertEqual(
+            response.data["profile"]["profile_picture"],
+            "http://testserver" + profile.profile_picture.url,
+        )
+        self.assertEqual(profile.profile_picture.name, profile.picture_variants["source"])
+
+    def test_non_image_upload_rejected(self):
+        from django.core.exceptions import ValidationError
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        from .images import validate_profile_picture_upload
+
+        with self.assertRaises(ValidationError):
+            validate_profile_picture_upload(SimpleUploadedFile("avatar.png", b"not an image"))
+        with self.assertRaises(ValidationError):
+            validate_profile_picture_upload(self._jpeg("avatar.png"))
+
+
+class BulkApprovalTest(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create(
+            username="admin@example.com", email="admin@example.com", role=User.ADMIN, is_approved=True
+        )
+        self.pending = [
+            User.objects.create(username=f"inst{i}@example.com", email=f"inst{i}@example.com", role=User.INSTRUCTOR)
+            for i in range(3)
+        ]
+        self.client.force_authenticate(user=self.admin)
+
+    def test_pending_queue_lists_unapproved_users(self):
+        with self.assertMaxQueries(1):
+            response = self.client.get(reverse("accounts:admin-pending-approvals"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([u["email"] for u in response.data["results"]], [u.email for u in self.pending])
+
+    def test_bulk_approve_and_reject(self):
+        from .authentication import claims_cache
+
+        url = reverse("accounts:admin-bulk-approval")
+        ids = [u.pk for u in self.pending]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {"ids": ids[:2], "action": "approve"}, format="json")
+        self.assertEqual(sorted(response.data["data"]["updated"]), ids[:2])
+        self.assertEqual(User.objects.filter(pk__in=ids, is_approved=True).count(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {"ids": ids, "action": "reject"}, format="json")
+        # Already approved users are not pending, so only the third is rejected.
+        self.assertEqual(response.data["data"]["updated"], [ids[2]])
+        self.assertFalse(User.objects.get(pk=ids[2]).is_active)
+        self.assertFalse(claims_cache.get(str(ids[2]))["is_active"])
+        self.assertEqual(self.client.get(reverse("accounts:admin-pending-approvals")).data["results"], [])
+
+    def test_invalid_action_rejected(self):
+        response = self.client.post(
+            reverse("accounts:admin-bulk-approval"), {"ids": [self.pending[0].pk], "action": "ban"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class UserAdminChangelistTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create(
+            username="root@example.com", email="root@example.com", is_staff=True, is_superuser=True
+        )
+        self.client.force_login(self.admin)
+
+    def _changelist_queries(self, **params):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("admin:accounts_user_changelist"), params)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_profile_column_has_no_n_plus_one(self):
+        for i in range(2):
+            User.objects.create(username=f"member{i}@example.com", email=f"member{i}@example.com")
+        baseline = self._changelist_queries(role__exact="student", is_approved__exact="1")
+        for i in range(2, 8):
+            User.objects.create(username=f"member{i}@example.com", email=f"member{i}@example.com")
+        self.assertEqual(self._changelist_queries(role__exact="student", is_approved__exact="1"), baseline)
+        self.assertEqual(self._changelist_queries(), baseline)
+
+
+class OwnershipPermissionTest(APITestCase):
+    def test_owner_check_with_bearer_token(self):
+        from rest_framework.request import Request
+
+        from .authentication import ClaimsJWTAuthentication
+        from .permissions import IsInstructorOrAdmin, IsOwnerOrReadOnly
+        from .views import get_tokens_for_user
+
+        user = User.objects.create(username="own@example.com", email="own@example.com")
+        other = User.objects.create(username="other@example.com", email="other@example.com")
+        profile = UserProfile.objects.get(user_id=user.pk)
+
+        def request_as(owner):
+            access = get_tokens_for_user(owner)["access"]
+            request = RequestFactory().patch("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+            return Request(request, authenticators=[ClaimsJWTAuthentication()])
+
+        owner_request, other_request = request_as(user), request_as(other)
+        with self.assertNumQueries(0):
+            self.assertTrue(IsOwnerOrReadOnly().has_object_permission(owner_request, None, profile))
+            self.assertFalse(IsOwnerOrReadOnly().has_object_permission(other_request, None, profile))
+        self.assertEqual(IsInstructorOrAdmin.allowed_roles, frozenset({User.INSTRUCTOR, User.ADMIN}))
+
+
+class TokenRevocationTest(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from .authentication import ClaimsRefreshToken, claims_cache
+        from .revocation import revocation_set
+
+        cache.clear()
+        claims_cache.clear()
+        revocation_set.clear()
+        self.addCleanup(revocation_set.clear)
+        self.revocation_set = revocation_set
+        self.claims_cache = claims_cache
+        self.user = User.objects.create(username="revoke@example.com", email="revoke@example.com", role=User.STUDENT)
+        self.refresh = ClaimsRefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.refresh.access_token}")
+
+    def refresh_token(self):
+        return self.client.post(reverse("accounts:token_refresh"), {"refresh": str(self.refresh)}, format="json")
+
+    def test_refresh_loads_user_once(self):
+        with self.assertNumQueries(1):
+            response = self.refresh_token()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("access", response.data)
+
+    def test_refresh_rejected_for_deactivated_user(self):
+        # Bypasses User.save, so no claims are published: the row decides.
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.refresh_token()
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_rejected_for_deleted_user(self):
+        self.user.delete()
+        self.claims_cache.clear()  # another worker never saw the delete
+        response = self.refresh_token()
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_revokes_refresh_and_access_tokens(self):
+        response = self.client.post(reverse("accounts:logout"), {"refresh": str(self.refresh)}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.refresh_token().status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.client.get(reverse("accounts:student-only")).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_all_revokes_earlier_tokens(self):
+        response = self.client.post(reverse("accounts:logout-all"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.refresh_token().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revocations_reach_other_workers_on_sync(self):
+        from .revocation import RevocationSet
+
+        other_worker = RevocationSet()
+        other_worker.sync()
+        self.assertFalse(other_worker.is_revoked(self.refresh.payload))
+
+        self.revocation_set.revoke_token(self.refresh)
+        self.assertEqual(other_worker.sync(), (1, 0))
+        with self.assertNumQueries(1):  # the filter hit is confirmed once
+            self.assertTrue(other_worker.is_revoked(self.refresh.payload))
+            self.assertTrue(other_worker.is_revoked(self.refresh.payload))
+        with self.assertNumQueries(0):
+            self.assertFalse(other_worker.is_revoked(self.refresh.access_token.payload))
+
+    def test_prune_removes_expired_revocations(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+        from .models import RevokedToken, UserTokenCutoff
+        from .revocation import prune_revoked_tokens
+
+        self.revocation_set.revoke_token(self.refresh)
+        self.revocation_set.revoke_user_tokens(self.user.pk)
+        RevokedToken.objects.create(jti="expired", user_id=self.user.pk, expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(prune_revoked_tokens(), (1, 0))
+        self.assertEqual(prune_revoked_tokens(now=timezone.now() + timedelta(days=30)), (1, 1))
+        self.assertFalse(UserTokenCutoff.objects.exists())
+
+
+class RouteScopedMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        from karpithal.handlers import RouteScopedWSGIHandler
+
+        self.handler = RouteScopedWSGIHandler()
+        self.factory = RequestFactory()
+
+    def test_api_requests_skip_session_and_csrf_middleware(self):
+        request = self.factory.get(reverse("accounts:student-only"))
+        response = self.handler.get_response(request)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(hasattr(request, "session"))
+        self.assertNotIn("X-Frame-Options", response)
+
+    def test_other_requests_run_full_chain(self):
+        request = self.factory.get("/accounts/no-such-page/")
+        response = self.handler.get_response(request)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(hasattr(request, "session"))
+        self.assertEqual(response["X-Frame-Options"], "DENY")
+
+
+class RouteScopedEndpointTest(APITestCase):
+    """
+    Representative endpoints served by the production handlers, which run the
+    reduced API_MIDDLEWARE chain (the test client always runs the full one).
+    """
+
+    def setUp(self):
+        from karpithal.throttling import get_throttle_store
+
+        get_throttle_store().clear()
+        self.addCleanup(get_throttle_store().clear)
+        self.user = User.objects.create_user(
+            username="scoped@example.com", email="scoped@example.com", password="ScopedPass123!"
+        )
+
+    def send(self, asynchronous, method, url, data=None, token=None):
+        from asgiref.sync import async_to_sync
+        from django.test import AsyncRequestFactory
+
+        from karpithal.handlers import RouteScopedASGIHandler, RouteScopedWSGIHandler
+
+        kwargs = {"content_type": "application/json"} if data is not None else {}
+        if asynchronous:
+            if token:
+                kwargs["headers"] = {"Authorization": f"Bearer {token}"}
+            request = getattr(AsyncRequestFactory(), method)(url, json.dumps(data) if data is not None else None, **kwargs)
+            response = async_to_sync(RouteScopedASGIHandler().get_response_async)(request)
+        else:
+            if token:
+                kwargs["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+            request = getattr(RequestFactory(), method)(url, json.dumps(data) if data is not None else None, **kwargs)
+            response = RouteScopedWSGIHandler().get_response(request)
+        self.assertFalse(hasattr(request, "session"))
+        return response
+
+    def check_endpoints(self, asynchronous):
+        from django.core import mail
+
+        from .outbox import deliver_batch
+
+        response = self.send(
+            asynchronous, "post", reverse("accounts:login-alias"),
+            {"email": "scoped@example.com", "password": "ScopedPass123!"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        access = json.loads(response.content)["access"]
+
+        response = self.send(asynchronous, "get", reverse("accounts:user-me"), token=access)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)["email"], "scoped@example.com")
+
+        response = self.send(asynchronous, "get", reverse("accounts:user-me"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.send(asynchronous, "post", reverse("accounts:password-reset"), {"email": "scoped@example.com"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        deliver_batch()
+        self.assertEqual(len(mail.outbox), 1)
+
+        response = self.send(
+            asynchronous, "post", reverse("accounts:async-login"),
+            {"email": "scoped@example.com", "password": "ScopedPass123!"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_wsgi_handler(self):
+        self.check_endpoints(asynchronous=False)
+
+    def test_asgi_handler(self):
+        self.check_endpoints(asynchronous=True)
+
+
+class PrebuiltSchemaTest(APITestCase):
+    def setUp(self):
+        import tempfile
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.enterContext(override_settings(OPENAPI_SCHEMA_DIR=directory.name, DEBUG=False))
+        self.url = reverse("schema")
+
+    def test_missing_schema_is_not_generated_per_request(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def test_serves_prebuilt_schema_with_etag(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+        from drf_spectacular.drainage import GENERATOR_STATS
+
+        with GENERATOR_STATS.silence():
+            call_command("build_openapi_schema", stdout=StringIO())
+        response = self.client.get(self.url, {"format": "json"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/vnd.oai.openapi+json")
+        schema = json.loads(b"".join(response.streaming_content))
+        self.assertIn("/api/v1/courses/", schema["paths"])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)  # YAML has its own ETag
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    def make_pool(self, **options):
+        import sqlite3
+
+        from karpithal.db.pool import ConnectionPool
+
+        pool = ConnectionPool(lambda: sqlite3.connect(":memory:", check_same_thread=False), **options)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_reuses_returned_connections(self):
+        pool = self.make_pool(max_size=2)
+        first = pool.getconn()
+        pool.putconn(first)
+        self.assertIs(pool.getconn(), first)
+        self.assertEqual(pool.snapshot()["opened"], 1)
+
+    def test_waits_for_a_free_connection_then_times_out(self):
+        import threading
+
+        from karpithal.db.pool import PoolTimeout
+
+        pool = self.make_pool(max_size=1, timeout=0.05)
+        held = pool.getconn()
+        with self.assertRaises(PoolTimeout):
+            pool.getconn()
+
+        threading.Timer(0.01, pool.putconn, [held]).start()
+        pool.timeout = 5
+        self.assertIs(pool.getconn(), held)
+        stats = pool.snapshot()
+        self.assertEqual((stats["timeouts"], stats["waits"]), (1, 1))
+        self.assertGreater(stats["wait_seconds"], 0)
+
+    def test_recycles_after_max_uses_and_drops_unhealthy(self):
+        pool = self.make_pool(max_uses=2, check_idle=0)
+        first = pool.getconn()
+        pool.putconn(first)
+        self.assertIs(pool.getconn(), first)
+        pool.putconn(first)
+        second = pool.getconn()
+        self.assertIsNot(second, first)
+
+        second.close()  # the ping on checkout fails
+        pool.putconn(second)
+        self.assertIsNot(pool.getconn(), second)
+        stats = pool.snapshot()
+        self.assertEqual((stats["recycled"], stats["failed_checks"], stats["size"]), (1, 1, 1))
+
+    def test_reclaims_connections_of_dead_threads(self):
+        import threading
+
+        pool = self.make_pool(max_size=1, timeout=1)
+        thread = threading.Thread(target=pool.getconn)
+        thread.start()
+        thread.join()
+        pool.getconn()
+        self.assertEqual(pool.snapshot()["reclaimed"], 1)
+
+
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.enterContext(override_settings(DATABASE_REPLICAS=["replica"]))
+
+    def route(self, method, user_id=7, status_code=200, asynchronous=False):
+        import asyncio
+        from types import SimpleNamespace
+
+        from asgiref.sync import sync_to_async
+        from django.http import HttpResponse
+        from karpithal.db.routers import PrimaryReplicaRouter, ReplicaRoutingMiddleware
+
+        routed = []
+
+        def view(request):
+            request.user = SimpleNamespace(pk=user_id, is_authenticated=True)
+            routed.append(PrimaryReplicaRouter().db_for_read(User))
+            return HttpResponse(status=status_code)
+
+        async def async_view(request):
+            # Async views run their queries in sync_to_async threads.
+            return await sync_to_async(view)(request)
+
+        request = getattr(RequestFactory(), method.lower())("/api/v1/accounts/api/v1/me/")
+        if asynchronous:
+            asyncio.run(ReplicaRoutingMiddleware(async_view)(request))
+        else:
+            ReplicaRoutingMiddleware(view)(request)
+        return routed[0]
+
+    def test_reads_outside_requests_use_primary(self):
+        from karpithal.db.routers import PrimaryReplicaRouter
+
+        self.assertEqual(PrimaryReplicaRouter().db_for_read(User), "default")
+
+    def test_user_reads_primary_after_writing(self):
+        self.assertEqual(self.route("GET"), "replica")
+        self.assertEqual(self.route("PATCH", status_code=400), "default")
+        self.assertEqual(self.route("GET"), "replica")  # failed writes do not pin
+        self.route("PATCH")
+        self.assertEqual(self.route("GET"), "default")
+        self.assertEqual(self.route("GET", user_id=8), "replica")
+
+    def test_async_requests_are_routed(self):
+        self.assertEqual(self.route("GET", asynchronous=True), "replica")
+        self.assertEqual(self.route("PATCH", asynchronous=True), "default")
+        self.assertEqual(self.route("GET", asynchronous=True), "default")
+
+
+@skipUnless("replica_1" in settings.DATABASES, "run with DJANGO_SETTINGS_MODULE=karpithal.replica_test_settings")
+class ReplicaReadYourWritesTest(APITransactionTestCase):
+    # Not APITestCase: reads inside its wrapping transaction always go to the primary.
+    databases = "__all__"
+
+    def setUp(self):
+        from django.core.cache import cache
+        from .authentication import ClaimsRefreshToken, claims_cache
+
+        cache.clear()
+        claims_cache.clear()
+        self.user = User.objects.create(username="lag@example.com", email="lag@example.com")
+        # The replica still has an older row (bulk_create skips the profile signal).
+        User.objects.using("replica_1").bulk_create(
+            [User(pk=self.user.pk, username=self.user.username, email="stale@example.com")]
+        )
+        UserProfile.objects.using("replica_1").bulk_create([UserProfile(user_id=self.user.pk)])
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {ClaimsRefreshToken.for_user(self.user).access_token}")
+        self.url = reverse("accounts:user-me")
+
+    def test_reads_follow_replica_until_the_user_writes(self):
+        from django.core.cache import cache
+
+        self.assertEqual(self.client.get(self.url).data["email"], "stale@example.com")
+        response = self.client.patch(self.url, {"email": "updated@example.com"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.url).data["email"], "updated@example.com")
+        cache.clear()  # the pin expires
+        self.assertEqual(self.client.get(self.url).data["email"], "stale@example.com")
+
+
+class StructuredLoggingTest(SimpleTestCase):
+    def make_record(self, msg, *args, level=logging.INFO, name="karpithal.test", **extra):
+        record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+        record.__dict__.update(extra)
+        return record
+
+    def test_json_formatter_formats_args_and_extra(self):
+        from karpithal.logs import JSONFormatter
+
+        entry = json.loads(JSONFormatter().format(self.make_record("hello %s", "world", user_id=7)))
+        self.assertEqual(entry["message"], "hello world")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["logger"], "karpithal.test")
+        self.assertEqual(entry["user_id"], 7)
+
+    def test_sampling_keeps_warnings(self):
+        from karpithal.logs import SamplingFilter, log_stats
+
+        sampler = SamplingFilter({"karpithal": 0})
+        before = log_stats.snapshot()["sampled_out"].get("karpithal.test", 0)
+        self.assertFalse(sampler.filter(self.make_record("hot path")))
+        self.assertTrue(sampler.filter(self.make_record("slow", level=logging.WARNING)))
+        self.assertTrue(sampler.filter(self.make_record("other", name="django.request")))
+        self.assertEqual(log_stats.snapshot()["sampled_out"]["karpithal.test"], before + 1)
+
+    def test_full_queue_drops_and_reports(self):
+        from karpithal.logs import JSONFormatter, QueueLogHandler, log_stats
+
+        stream = io.StringIO()
+        handler = QueueLogHandler(maxsize=2, stream=stream)
+        handler.setFormatter(JSONFormatter())
+        handler.listener.stop()  # nothing drains the queue
+        before = log_stats.snapshot()["dropped"].get("INFO", 0)
+        for i in range(3):
+            handler.handle(self.make_record("record %d", i))
+        self.assertEqual(log_stats.snapshot()["dropped"]["INFO"], before + 1)
+
+        handler._start_listener()
+        handler.handle(self.make_record("record %d", 3))
+        handler.close()
+        messages = [json.loads(line)["message"] for line in stream.getvalue().splitlines()]
+        self.assertEqual(
+            messages,
+            ["record 0", "record 1", "record 3", "Log queue was full; dropped 1 records"],
+        )
+
+
+    @skipUnless(hasattr(os, "fork"), "needs os.fork()")
+    def test_forked_child_gets_an_empty_queue(self):
+        from karpithal.logs import QueueLogHandler
+
+        read_end, write_end = os.pipe()
+        handler = QueueLogHandler(stream=io.StringIO())
+        self.addCleanup(handler.close)
+        handler.listener.stop()
+        handler.handle(self.make_record("parent record"))  # still queued at fork time
+        parent_queue = handler.queue
+
+        pid = os.fork()
+        if pid == 0:  # child
+            os.close(read_end)
+            ok = handler.queue is not parent_queue and handler.queue.empty() and handler.listener._thread.is_alive()
+            os.write(write_end, b"1" if ok else b"0")
+            os._exit(0)
+        os.close(write_end)
+        os.waitpid(pid, 0)
+        with os.fdopen(read_end, "rb") as pipe:
+            self.assertEqual(pipe.read(), b"1")
+        self.assertEqual(handler.queue.qsize(), 1)
+
+class FastJSONPathTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="fast@example.com", email="fast@example.com", role="instructor")
+        profile = self.user.profile
+        profile.profile_picture.name = "profile_pictures/fast.jpg"
+        profile.picture_variants = {
+            "source": "profile_pictures/fast.jpg",
+            "sizes": {"64": {"webp": "profile_pictures/fast_64.webp"}},
+        }
+        profile.save()
+
+    def test_read_serializer_matches_model_serializer(self):
+        from .serializers import UserReadSerializer, UserSerializer
+
+        request = RequestFactory().get("/")
+        user = User.objects.select_related("profile").get(pk=self.user.pk)
+        row = User.objects.values(*UserReadSerializer.lookups()).get(pk=self.user.pk)
+        context = {"request": request}
+        self.assertEqual(UserReadSerializer(context).to_representation(row), UserSerializer(user, context=context).data)
+        self.assertEqual(UserReadSerializer().from_instance(user), UserSerializer(user).data)
+
+        UserProfile.objects.filter(user=user).delete()
+        user = User.objects.get(pk=self.user.pk)
+        row = User.objects.values(*UserReadSerializer.lookups()).get(pk=self.user.pk)
+        self.assertIsNone(UserReadSerializer().to_representation(row)["profile"])
+        self.assertEqual(UserReadSerializer().from_instance(user), UserSerializer(user).data)
+
+    @skipUnless(importlib.util.find_spec("orjson"), "orjson (the fast-json extra) is not installed")
+    def test_orjson_renderer_matches_json_renderer(self):
+        import datetime
+        import decimal
+        import uuid
+
+        from django.utils.translation import gettext_lazy
+        from rest_framework.renderers import JSONRenderer
+
+        from karpithal.renderers import ORJSONRenderer
+
+        data = {
+            "when": datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+            "price": decimal.Decimal("9.90"),
+            "id": uuid.UUID(int=1),
+            "label": gettext_lazy("user"),
+            "text": "Karpithal   தமிழ்",
+            1: [1.5, None, True],
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONRenderer().render({"big": 2**70}), JSONRenderer().render({"big": 2**70}))
+
+    def test_json_round_trip_without_orjson(self):
+        # orjson is an optional extra; without it both classes defer to DRF.
+        self.client.force_authenticate(user=self.user)
+        with patch("karpithal.renderers.orjson", None), patch("karpithal.parsers.orjson", None):
+            response = self.client.patch(reverse("accounts:user-me"), b"{not json", content_type="application/json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            response = self.client.patch(reverse("accounts:user-me"), {"profile": {"bio": "Plain"}}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()["user"]["profile"]["bio"], "Plain")
+
+    def test_malformed_json_body_rejected(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.patch(reverse("accounts:user-me"), b"{not json", content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.patch(reverse("accounts:user-me"), {"profile": {"bio": "Hi"}}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["user"]["profile"]["bio"], "Hi")
+
+
+class SharedCacheTest(SimpleTestCase):
+    def test_claims_overrides_are_bounded(self):
+        from .authentication import ClaimsOverrideCache
+
+        overrides = ClaimsOverrideCache(ttl=30, max_entries=3)
+        for user_id in range(10):
+            overrides.publish(str(user_id), {"is_active": True})
+        self.assertLessEqual(len(overrides._entries), 3)
+        self.assertEqual(overrides.get("9"), {"is_active": True})
+
+    def test_deploy_check_flags_per_process_cache(self):
+        from .checks import check_shared_cache
+
+        self.assertEqual([w.id for w in check_shared_cache(None)], ["accounts.W001"])  # tests use LocMemCache
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}):
+            self.assertEqual(check_shared_cache(None), [])
@@ -1,6 +1,5 @@
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
 from .views import (
     UserRegistrationView,
@@ -12,9 +11,22 @@ from .views import (
     PasswordResetConfirmView,
     OAuthLoginView,
     AdminApproveUserView,
+    AdminUserListView,
+    AdminPendingApprovalListView,
+    AdminBulkApprovalView,
+    AdminUserImportView,
+    HashingPoolStatsView,
     ChangePasswordView,
+    LogoutView,
+    LogoutAllView,
     # ProfilePictureUploadView is removed from imports
 )
+from .async_views import (
+    AsyncLoginView,
+    AsyncUserRegistrationView,
+    AsyncChangePasswordView,
+    AsyncPasswordResetConfirmView,
+)
 
 app_name = "accounts"
 
@@ -32,6 +44,8 @@ urlpatterns = [
     path('api/v1/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/v1/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/v1/login/', TokenObtainPairView.as_view(), name='login-alias'),
+    path('api/v1/logout/', LogoutView.as_view(), name='logout'),
+    path('api/v1/logout-all/', LogoutAllView.as_view(), name='logout-all'),
 
     # ---------------------------
     # OAuth Login / Signup
@@ -48,6 +62,10 @@ urlpatterns = [
     # Admin Endpoints
     # ---------------------------
     path('api/v1/admin/approve-user/<int:pk>/', AdminApproveUserView.as_view(), name='admin-approve-user'),
+    path('api/v1/admin/users/', AdminUserListView.as_view(), name='admin-user-list'),
+    path('api/v1/admin/pending-approvals/', AdminPendingApprovalListView.as_view(), name='admin-pending-approvals'),
+    path('api/v1/admin/bulk-approval/', AdminBulkApprovalView.as_view(), name='admin-bulk-approval'),
+    path('api/v1/admin/import-users/', AdminUserImportView.as_view(), name='admin-import-users'),
 
     # ---------------------------
     # Email Verification & Password Reset
@@ -57,9 +75,11 @@ urlpatterns = [
     path('api/v1/password-reset-confirm/<str:uidb64>/<str:token>/', PasswordResetConfirmView.as_view(), name='password-reset-confirm'),
 
     # ---------------------------
-    # API Schema & Documentation
+    # Async (ASGI) Password Endpoints
     # ---------------------------
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-    path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    path('api/v1/async/login/', AsyncLoginView.as_view(), name='async-login'),
+    path('api/v1/async/register/', AsyncUserRegistrationView.as_view(), name='async-user-register'),
+    path('api/v1/async/change-password/', AsyncChangePasswordView.as_view(), name='async-change-password'),
+    path('api/v1/async/password-reset-confirm/<str:uidb64>/<str:token>/', AsyncPasswordResetConfirmView.as_view(), name='async-password-reset-confirm'),
+    path('api/v1/admin/hashing-pool/', HashingPoolStatsView.as_view(), name='hashing-pool-stats'),
 ]
\ No newline at end of file
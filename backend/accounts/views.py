@@ -1,23 +1,37 @@
+import codecs
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.encoding import force_str
 from django.utils.http import urlsafe_base64_decode
 from rest_framework import generics, status
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.db import transaction
 
+from karpithal.pagination import KeysetPagination
+
 from .serializers import (
     UserRegistrationSerializer,
+    UserReadSerializer,
     UserSerializer,
+    UserSerializerForAdmin,
+    UserApprovalSerializer,
     UserProfileSerializer,
     OAuthLoginSerializer,
     ChangePasswordSerializer,
     PasswordResetConfirmSerializer,
+    LogoutSerializer,
 )
 from .permissions import HasRole, IsStudent, IsInstructor, IsAdmin
+from .approvals import apply_approval, pending_approval_queryset
+from .authentication import ClaimsRefreshToken
+from .hashing import get_hashing_pool, get_import_hashing_pool
+from .importers import IMPORT_FORMATS, UserImporter, read_rows
+from .outbox import deduplicate_pending
+from .revocation import revocation_set
 
 User = get_user_model()
 
@@ -26,7 +40,7 @@ User = get_user_model()
 # JWT token helper
 # ---------------------------
 def get_tokens_for_user(user):
-    refresh = RefreshToken.for_user(user)
+    refresh = ClaimsRefreshToken.for_user(user)
     return {"refresh": str(refresh), "access": str(refresh.access_token)}
 
 
@@ -36,6 +50,7 @@ def get_tokens_for_user(user):
 class UserRegistrationView(generics.CreateAPIView):
     serializer_class = UserRegistrationSerializer
     permission_classes = [AllowAny]
+    throttle_scope = "register"
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -56,7 +71,7 @@ class UserRegistrationView(generics.CreateAPIView):
             {
                 "success": True,
                 "data": {
-                    "user": UserSerializer(user).data,
+                    "user": UserReadSerializer().from_instance(user),
                     "tokens": tokens,
                 },
                 "message": (
@@ -74,6 +89,7 @@ class UserRegistrationView(generics.CreateAPIView):
 # ---------------------------
 class OAuthLoginView(APIView):
     permission_classes = [AllowAny]
+    throttle_scope = "oauth-login"
 
     def post(self, request):
         serializer = OAuthLoginSerializer(data=request.data)
@@ -84,7 +100,7 @@ class OAuthLoginView(APIView):
         return Response(
             {
                 "success": True,
-                "user": UserSerializer(user).data,
+                "user": UserReadSerializer().from_instance(user),
                 "tokens": tokens,
                 "created": created,
             },
@@ -98,9 +114,17 @@ class OAuthLoginView(APIView):
 class UserMeView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {"GET": 1}
 
     def get_object(self):
-        return self.request.user
+        # request.user only carries token claims; load the row once per request.
+        if not hasattr(self, "_user"):
+            self._user = User.objects.select_related("profile").get(pk=self.request.user.pk)
+        return self._user
+
+    def retrieve(self, request, *args, **kwargs):
+        row = User.objects.values(*UserReadSerializer.lookups()).get(pk=request.user.pk)
+        return Response(UserReadSerializer(self.get_serializer_context()).to_representation(row))
 
     def update(self, request, *args, **kwargs):
         # Prevent password updates here
@@ -113,10 +137,11 @@ class UserMeView(generics.RetrieveUpdateAPIView):
         # Handle nested profile update
         profile_data = request.data.get("profile", None)
         with transaction.atomic():
-            user = super().update(request, *args, **kwargs)
+            super().update(request, *args, **kwargs)
+            user = self.get_object()
             if profile_data:
                 profile_serializer = UserProfileSerializer(
-                    instance=request.user.profile,
+                    instance=user.profile,
                     data=profile_data,
                     partial=True,
                 )
@@ -124,7 +149,7 @@ class UserMeView(generics.RetrieveUpdateAPIView):
                 profile_serializer.save()
 
         return Response(
-            {"success": True, "user": UserSerializer(request.user).data},
+            {"success": True, "user": UserReadSerializer().from_instance(user)},
             status=status.HTTP_200_OK,
         )
 
@@ -134,12 +159,15 @@ class UserMeView(generics.RetrieveUpdateAPIView):
 # ---------------------------
 class StudentOnlyView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated, IsStudent]
+    query_budget = 0
+
     def get(self, request):
         return Response({"success": True, "message": "Welcome, Student!"}, status=status.HTTP_200_OK)
 
 
 class InstructorOnlyView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated, IsInstructor]
+    query_budget = 0
 
     def get(self, request):
         return Response({"success": True, "message": "Welcome, Instructor!"}, status=status.HTTP_200_OK)
@@ -162,6 +190,115 @@ class AdminApproveUserView(generics.UpdateAPIView):
         return Response({"success": False, "message": f"User {user.email} is already active."})
 
 
+# ---------------------------
+# Admin: User Listing / Approval Queue
+# ---------------------------
+class AdminPendingApprovalListView(generics.ListAPIView):
+    """
+    Active users awaiting approval, oldest first.
+    """
+    serializer_class = UserSerializerForAdmin
+    permission_classes = [IsAuthenticated, IsAdmin]
+    pagination_class = KeysetPagination
+    ordering = ("date_joined", "id")  # user_pending_approval_idx
+    query_budget = {"GET": 2}  # page + optional ?count=approx
+
+    def get_queryset(self):
+        return pending_approval_queryset().select_related("profile")
+
+
+class AdminUserListView(generics.ListAPIView):
+    """
+    All users ordered by email; ``?role=`` narrows to one role.
+    """
+    serializer_class = UserSerializerForAdmin
+    permission_classes = [IsAuthenticated, IsAdmin]
+    pagination_class = KeysetPagination
+    ordering = ("email", "id")
+    query_budget = {"GET": 2}  # page + optional ?count=approx
+
+    def get_queryset(self):
+        queryset = User.objects.select_related("profile")
+        role = self.request.query_params.get("role")
+        if role:
+            queryset = queryset.filter(role=role)
+        return queryset
+
+
+class AdminBulkApprovalView(APIView):
+    """
+    Approve or reject many pending users with a single UPDATE.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+    query_budget = {"POST": 2}
+
+    def post(self, request):
+        serializer = UserApprovalSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        action = serializer.validated_data["action"]
+        changed = apply_approval(serializer.validated_data["ids"], action)
+        return Response(
+            {
+                "success": True,
+                "data": {"action": action, "updated": changed},
+                "message": f"{len(changed)} users {action}d.",
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+# ---------------------------
+# Admin: Bulk User Import
+# ---------------------------
+class AdminUserImportView(APIView):
+    """
+    Accepts a multipart CSV/NDJSON upload in the ``file`` field and
+    streams it through the bulk importer. Per-row errors are returned.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"success": False, "message": "A CSV or NDJSON file is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        fmt = request.data.get("format") or ("ndjson" if upload.name.endswith((".ndjson", ".jsonl")) else "csv")
+        if fmt not in IMPORT_FORMATS:
+            return Response({"success": False, "message": f"Unsupported format '{fmt}'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        importer = UserImporter(pool=get_import_hashing_pool())
+        try:
+            report = importer.run(read_rows(codecs.iterdecode(upload, "utf-8-sig"), fmt))
+        except UnicodeDecodeError:
+            # Batches before the undecodable line are already imported.
+            return Response(
+                {"success": False, "data": importer.report(), "message": "The file must be UTF-8 encoded."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            {
+                "success": report["failed"] == 0,
+                "data": report,
+                "message": f"Imported {report['created']} users, {report['failed']} rows failed.",
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+# ---------------------------
+# Admin: Password Hashing Pool Stats
+# ---------------------------
+class HashingPoolStatsView(APIView):
+    """
+    Queue depth and wait time of the async views' password hashing pool.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        return Response({"success": True, "data": get_hashing_pool().stats()}, status=status.HTTP_200_OK)
+
+
 # ---------------------------
 # Email Verification
 # ---------------------------
@@ -191,17 +328,21 @@ class EmailVerificationView(APIView):
 # ---------------------------
 class PasswordResetRequestView(APIView):
     permission_classes = [AllowAny]
+    throttle_scope = "password-reset"
 
     def post(self, request):
         email = request.data.get("email")
         if not email:
             return Response({"success": False, "message": "Email is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Use allauth ResetPasswordForm if desired
+        # Use allauth ResetPasswordForm if desired.
+        # EMAIL_BACKEND queues the message in the outbox, so this never waits on SMTP.
         from allauth.account.forms import ResetPasswordForm
         form = ResetPasswordForm(data={"email": email})
         if form.is_valid():
-            form.save(request=request)
+            # Repeated requests replace the still-unsent reset email.
+            with deduplicate_pending(f"password-reset:{email.strip().lower()}"):
+                form.save(request=request)
 
         return Response({"success": True, "message": "If the email exists, a reset link has been sent."}, status=status.HTTP_200_OK)
 
@@ -237,11 +378,45 @@ class ChangePasswordView(APIView):
         # 1. Pass the context to the serializer for validation (critical)
         serializer = ChangePasswordSerializer(
             data=request.data, 
-            context={'request': request}
+            context={'request': request, 'user': User.objects.get(pk=request.user.pk)}
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(
             {"success": True, "message": "Password changed successfully."},
             status=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+
+# ---------------------------
+# Logout (token revocation)
+# ---------------------------
+class LogoutView(APIView):
+    """
+    Revoke the access token of this request and, if given, a refresh token.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = LogoutSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        refresh = serializer.validated_data.get("refresh")
+        if refresh is not None:
+            revocation_set.revoke_token(refresh)
+        if request.auth is not None:
+            revocation_set.revoke_token(request.auth)
+        return Response({"success": True, "message": "Logged out."}, status=status.HTTP_200_OK)
+
+
+class LogoutAllView(APIView):
+    """
+    Revoke every token issued to the current user so far.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        revocation_set.revoke_user_tokens(request.user.pk)
+        return Response(
+            {"success": True, "message": "Logged out of all sessions."},
+            status=status.HTTP_200_OK,
+        )
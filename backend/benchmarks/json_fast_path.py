@@ -0,0 +1,107 @@
+"""
+Response building on hot endpoints, DRF's default path vs. the fast path.
+
+    python -m benchmarks.json_fast_path [--iterations 5000]
+
+For each endpoint the DRF column is what the view used to do (ModelSerializer
+plus JSONRenderer/JSONParser) and the fast column what it does now
+(ValuesSerializer rows plus the orjson renderer/parser). A throwaway user is
+created inside a transaction that is rolled back, so any configured database
+works; token issuing and the rest of the request cycle are excluded.
+"""
+import argparse
+import io
+import os
+import statistics
+import time
+
+
+def measure(func, iterations, rounds):
+    per_call = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        per_call.append((time.perf_counter() - started) / iterations * 1e6)
+    return statistics.median(per_call)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "karpithal.settings")
+    import django
+
+    django.setup()
+
+    from django.db import transaction
+    from django.test import RequestFactory
+    from django.test.utils import setup_test_environment
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from accounts.models import User
+    from accounts.serializers import UserReadSerializer, UserSerializer
+    from accounts.views import get_tokens_for_user
+    from karpithal.parsers import ORJSONParser
+    from karpithal.renderers import ORJSONRenderer, orjson
+
+    setup_test_environment()  # allows the "testserver" host
+    request = RequestFactory().get("/api/v1/accounts/api/v1/me/")
+    context = {"request": request}
+    drf_renderer, fast_renderer = JSONRenderer(), ORJSONRenderer()
+
+    with transaction.atomic():
+        user = User.objects.create(username="bench@example.com", email="bench@example.com", role="student")
+        profile = user.profile
+        profile.profile_picture.name = "profile_pictures/bench.jpg"
+        profile.picture_variants = {
+            "sizes": {size: {"webp": f"v/{size}.webp", "jpeg": f"v/{size}.jpg"} for size in ("64", "128", "256")}
+        }
+        profile.save()
+        user = User.objects.select_related("profile").get(pk=user.pk)
+        tokens = get_tokens_for_user(user)
+        body = drf_renderer.render({"email": user.email, "profile": {"bio": "Learning Django " * 20}})
+
+        endpoints = {
+            "GET me (query + serialize + render)": (
+                lambda: drf_renderer.render(
+                    UserSerializer(User.objects.select_related("profile").get(pk=user.pk), context=context).data
+                ),
+                lambda: fast_renderer.render(
+                    UserReadSerializer(context).to_representation(
+                        User.objects.values(*UserReadSerializer.lookups()).get(pk=user.pk)
+                    )
+                ),
+            ),
+            "POST oauth/login, register (serialize + render)": (
+                lambda: drf_renderer.render({"success": True, "user": UserSerializer(user).data, "tokens": tokens}),
+                lambda: fast_renderer.render(
+                    {"success": True, "user": UserReadSerializer().from_instance(user), "tokens": tokens}
+                ),
+            ),
+            "POST token (render)": (
+                lambda: drf_renderer.render(tokens),
+                lambda: fast_renderer.render(tokens),
+            ),
+            "PATCH me (parse body)": (
+                lambda: JSONParser().parse(io.BytesIO(body)),
+                lambda: ORJSONParser().parse(io.BytesIO(body)),
+            ),
+        }
+
+        print(f"{args.iterations} iterations x {args.rounds} rounds, median us/call"
+              f"{'' if orjson else ' (orjson not installed: renderer/parser fall back to DRF)'}")
+        for name, (drf, fast) in endpoints.items():
+            before = measure(drf, args.iterations, args.rounds)
+            after = measure(fast, args.iterations, args.rounds)
+            print(f"  {name}")
+            print(f"    DRF:  {before:8.1f}   fast: {after:8.1f}   {before / after:4.1f}x")
+        transaction.set_rollback(True)
+
+
+if __name__ == "__main__":
+    main()
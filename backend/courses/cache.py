@@ -0,0 +1,155 @@
+"""
+Read-through cache for the public course catalog.
+
+Cached responses are keyed on two kinds of version, millisecond timestamps
+kept in the shared default cache (``CACHE_URL``) so every worker sees the
+same ETags and invalidations:
+
+- the catalog version, bumped by the ``Course`` save/delete signals, which
+  decides which courses a list page holds;
+- one version per course, bumped by the same signals and by enrollment
+  changes, which decides the content of that course's entries.
+
+A detail page depends on its course's version only, and a list page on the
+catalog version plus the versions of the courses it shows (their ids are
+cached alongside the page). An enrollment therefore retires only the pages
+that show the course, not the whole catalog. ``ETag`` is derived from those
+versions, the rendered format and the absolute request URL (pages embed
+absolute next/previous links), so a client revalidating an unchanged page
+gets ``304 Not Modified`` after a couple of cache reads, before the view
+queries the database or runs the serializer.
+
+``QuerySet.update()``/``bulk_create()`` bypass the signals; call
+``bump_catalog_version()`` (and ``bump_course_versions()``) after using
+them on courses.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+VERSION_KEY = "courses:catalog-version"
+COURSE_VERSION_KEY = "courses:course-version:{}"
+PAGE_COURSES_KEY = "courses:catalog-page:{}:{}"
+RESPONSE_CACHE_KEY = "courses:catalog:{}:{}"
+
+
+def _now():
+    return int(time.time() * 1000)
+
+
+def get_catalog_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _now(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    cache.set(VERSION_KEY, max(_now(), (cache.get(VERSION_KEY) or 0) + 1), None)
+
+
+def get_course_versions(course_ids):
+    """
+    Return the versions of ``course_ids``, in order, starting a new one
+    for any course that has none yet.
+    """
+    keys = [COURSE_VERSION_KEY.format(pk) for pk in course_ids]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        now = _now()
+        for key in missing:
+            cache.add(key, now, None)
+        versions.update(cache.get_many(missing))
+    return [versions[key] for key in keys]
+
+
+def bump_course_versions(course_ids):
+    keys = [COURSE_VERSION_KEY.format(pk) for pk in course_ids]
+    current = cache.get_many(keys)
+    now = _now()
+    cache.set_many({key: max(now, current.get(key, 0) + 1) for key in keys}, None)
+
+
+class CachedCatalogMixin:
+    """
+    Serves GET from the catalog cache with strong ETag/Last-Modified
+    validators. Only successful responses are cached.
+    """
+
+    def _validators(self, page, versions):
+        digest = hashlib.sha1(f"{page}:{','.join(map(str, versions))}".encode()).hexdigest()
+        return quote_etag(digest), max(versions) // 1000, digest
+
+    def _set_validators(self, response, etag, last_modified):
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, public=True, no_cache=True)
+        patch_vary_headers(response, ["Accept"])
+
+    def _page(self, request, *scope):
+        variant = ":".join(map(str, [*scope, request.accepted_renderer.format, request.build_absolute_uri()]))
+        return hashlib.sha1(variant.encode()).hexdigest()
+
+    def get(self, request, *args, **kwargs):
+        pk = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        if pk is not None:
+            # A detail page depends on its own course only.
+            return self._cached_get(request, self._page(request), get_course_versions([pk]), *args, **kwargs)
+
+        catalog_version = get_catalog_version()
+        page = self._page(request, catalog_version)
+        courses_key = PAGE_COURSES_KEY.format(self.catalog_cache_name, page)
+        course_ids = cache.get(courses_key)
+        if course_ids is not None:
+            return self._cached_get(request, page, [catalog_version, *get_course_versions(course_ids)], *args, **kwargs)
+
+        # A page not seen under this catalog version: build it and remember
+        # its courses. Its validators come from course versions read after
+        # the query, so leave them off if one moved while it ran.
+        started = _now()
+        response = super().get(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        course_ids = [row["id"] for row in response.data["results"]]
+        cache.set(courses_key, course_ids, settings.COURSE_CATALOG_CACHE_TTL)
+        course_versions = get_course_versions(course_ids)
+        if max(course_versions, default=0) >= started:
+            return response
+        return self._store(response, *self._validators(page, [catalog_version, *course_versions]))
+
+    def _cached_get(self, request, page, versions, *args, **kwargs):
+        etag, last_modified, digest = self._validators(page, versions)
+
+        not_modified = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            self._set_validators(not_modified, etag, last_modified)
+            return not_modified
+
+        cached = cache.get(RESPONSE_CACHE_KEY.format(self.catalog_cache_name, digest))
+        if cached is not None:
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+            self._set_validators(response, etag, last_modified)
+            return response
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        return self._store(response, etag, last_modified, digest)
+
+    def _store(self, response, etag, last_modified, digest):
+        key = RESPONSE_CACHE_KEY.format(self.catalog_cache_name, digest)
+
+        def store(rendered):
+            cache.set(key, (rendered.content, rendered["Content-Type"]), settings.COURSE_CATALOG_CACHE_TTL)
+
+        response.add_post_render_callback(store)
+        self._set_validators(response, etag, last_modified)
+        return response
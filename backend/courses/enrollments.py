@@ -0,0 +1,117 @@
+"""
+Course enrollment.
+
+A roster is enrolled with batched ``INSERT ... ON CONFLICT DO NOTHING
+RETURNING`` statements, so ``Course.enrolled_count`` is advanced with a
+single ``F()`` update by the number of rows actually inserted, even when a
+single enrollment for one of the students lands concurrently. Single
+enrollments created through the ORM adjust the counter from a signal (see
+courses.signals). Deletions, direct or cascaded from a course or a user,
+go through ``enrollments_deleting``, which takes them off the counters per
+course and revokes the cached lesson access of their students.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connections, router, transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+from django.utils import timezone
+
+from .cache import bump_course_versions
+from .models import Course, Enrollment
+from .progress import revoke_lesson_access
+from .stats import enrollments_changed, enrollments_removed
+
+User = get_user_model()
+
+ENROLL_BATCH_SIZE = 1000
+
+
+def adjust_enrolled_count(course_id, delta):
+    Course.objects.filter(pk=course_id).update(enrolled_count=F("enrolled_count") + delta)
+    enrollments_changed(course_id, delta)
+    # Only the pages showing this course carry its count.
+    transaction.on_commit(lambda: bump_course_versions([course_id]))
+
+
+def remove_enrollment_counts(enrollments):
+    """
+    Take ``enrollments`` (a queryset about to be deleted) off their courses'
+    counters and their instructors' stats: one aggregate and one UPDATE each,
+    however many rows are going.
+    """
+    per_course = {}
+    per_owner = {}
+    rows = enrollments.order_by().values_list("course_id", "course__owner_id").annotate(n=Count("id"))
+    for course_id, owner_id, n in rows:
+        per_course[course_id] = n
+        per_owner[owner_id] = per_owner.get(owner_id, 0) + n
+    if not per_course:
+        return
+    Course.objects.filter(pk__in=per_course).update(
+        enrolled_count=F("enrolled_count")
+        - Case(*(When(pk=pk, then=Value(n)) for pk, n in per_course.items()), output_field=IntegerField())
+    )
+    enrollments_removed(per_owner)
+    transaction.on_commit(lambda: bump_course_versions(list(per_course)))
+
+
+def enrollments_deleting(enrollments):
+    """
+    Bookkeeping for ``enrollments`` (a queryset) before they are deleted.
+    """
+    remove_enrollment_counts(enrollments)
+    revoke_lesson_access(enrollments)
+
+
+def insert_enrollments(course_id, student_ids):
+    """
+    Enroll ``student_ids`` in a course, skipping existing enrollments.
+    Returns the ids that were inserted by this call.
+    """
+    connection = connections[router.db_for_write(Enrollment)]
+    opts = Enrollment._meta
+    fields = [opts.get_field(name) for name in ("course", "student", "created_at")]
+    table = connection.ops.quote_name(opts.db_table)
+    course, student, created_at = (connection.ops.quote_name(f.column) for f in fields)
+    now = timezone.now()
+    batch_size = min(ENROLL_BATCH_SIZE, connection.ops.bulk_batch_size(fields, student_ids))
+    inserted = []
+    with connection.cursor() as cursor:
+        for start in range(0, len(student_ids), batch_size):
+            batch = student_ids[start : start + batch_size]
+            params = [
+                field.get_db_prep_save(value, connection)
+                for pk in batch
+                for field, value in zip(fields, (course_id, pk, now))
+            ]
+            cursor.execute(
+                f"INSERT INTO {table} ({course}, {student}, {created_at}) "
+                f"VALUES {', '.join(['(%s, %s, %s)'] * len(batch))} "
+                f"ON CONFLICT ({student}, {course}) DO NOTHING RETURNING {student}",
+                params,
+            )
+            inserted.extend(row[0] for row in cursor.fetchall())
+    return sorted(inserted)
+
+
+def enroll_students(course_id, student_ids):
+    """
+    Enroll the active students among ``student_ids`` in a course.
+    Returns (enrolled_ids, already_enrolled_ids, invalid_ids).
+    """
+    student_ids = set(student_ids)
+    valid = set(
+        User.objects.filter(pk__in=student_ids, role=User.STUDENT, is_active=True).values_list("pk", flat=True)
+    )
+
+    with transaction.atomic():
+        # Keeps the course from being deleted while the roster is written.
+        Course.objects.select_for_update().filter(pk=course_id).values_list("pk").get()
+        existing = set(
+            Enrollment.objects.filter(course_id=course_id, student_id__in=valid).values_list("student_id", flat=True)
+        )
+        new = insert_enrollments(course_id, sorted(valid - existing)) if valid - existing else []
+        if new:
+            adjust_enrolled_count(course_id, len(new))
+
+    # Students enrolled concurrently since the lookup above count as existing.
+    return new, sorted(valid - set(new)), sorted(student_ids - valid)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from courses.stats import reconcile_enrolled_counts, reconcile_instructor_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute denormalized course enrollment counts and instructor dashboard stats (run periodically)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--skip-enrolled-counts", action="store_true", help="Trust Course.enrolled_count instead of recounting it."
+        )
+
+    def handle(self, *args, **options):
+        if not options["skip_enrolled_counts"]:
+            courses = reconcile_enrolled_counts()
+            self.stdout.write(f"Recounted enrollments of {courses} courses.")
+        rows = reconcile_instructor_stats()
+        self.stdout.write(self.style.SUCCESS(f"Reconciled stats for {rows} instructors."))
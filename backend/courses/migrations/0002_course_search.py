@@ -0,0 +1,94 @@
+# Generated by Django 5.0 on 2026-10-18 09:09
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    """
+    CREATE FUNCTION courses_course_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER courses_course_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON courses_course
+    FOR EACH ROW EXECUTE FUNCTION courses_course_search_vector_update()
+    """,
+    "UPDATE courses_course SET title = title",
+    "CREATE INDEX courses_course_search_gin ON courses_course USING gin (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS courses_course_search_gin",
+    "DROP TRIGGER IF EXISTS courses_course_search_vector_trigger ON courses_course",
+    "DROP FUNCTION IF EXISTS courses_course_search_vector_update()",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE courses_course_fts USING fts5(
+        title, description, content='courses_course', content_rowid='id',
+        tokenize='porter unicode61', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER courses_course_fts_insert AFTER INSERT ON courses_course BEGIN
+        INSERT INTO courses_course_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER courses_course_fts_delete AFTER DELETE ON courses_course BEGIN
+        INSERT INTO courses_course_fts (courses_course_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER courses_course_fts_update AFTER UPDATE OF title, description ON courses_course BEGIN
+        INSERT INTO courses_course_fts (courses_course_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO courses_course_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO courses_course_fts (courses_course_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS courses_course_fts_insert",
+    "DROP TRIGGER IF EXISTS courses_course_fts_delete",
+    "DROP TRIGGER IF EXISTS courses_course_fts_update",
+    "DROP TABLE IF EXISTS courses_course_fts",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            _run({"postgresql": POSTGRES_FORWARD, "sqlite": SQLITE_FORWARD}),
+            _run({"postgresql": POSTGRES_REVERSE, "sqlite": SQLITE_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-18 09:18
+
+import courses.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_lesson_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='media',
+            field=models.FileField(blank=True, max_length=255, upload_to=courses.models.lesson_media_path),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0 on 2026-10-18 09:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_user_search_trigram_indexes'),
+        ('courses', '0005_lesson_media'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InstructorStats',
+            fields=[
+                ('instructor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='instructor_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('course_count', models.IntegerField(default=0)),
+                ('enrollment_count', models.IntegerField(default=0)),
+                ('last_course_at', models.DateTimeField(blank=True, null=True)),
+                ('last_enrollment_at', models.DateTimeField(blank=True, null=True)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'instructor stats',
+            },
+        ),
+    ]
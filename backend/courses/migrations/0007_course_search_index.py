@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-18 10:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_instructorstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseSearchIndex',
+            fields=[
+                ('course', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='courses.course')),
+                ('document', models.TextField(db_column='courses_course_fts')),
+            ],
+            options={
+                'db_table': 'courses_course_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -1,4 +1,8 @@
-from django.db import models
+import os
+import uuid
+
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 from django.conf import settings
 
 class Course(models.Model):
@@ -8,6 +12,145 @@ class Course(models.Model):
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="courses"
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Weighted title (A) / description (B) tsvector, kept current by a database
+    # trigger on PostgreSQL; SQLite uses the courses_course_fts table instead.
+    # See courses.search and migration 0002.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Denormalized; only ever changed with F() updates (see courses.enrollments).
+    enrolled_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        # Matches the keyset pagination order of course listings.
+        indexes = [models.Index(fields=["-created_at", "-id"], name="course_created_idx")]
+
+    def __str__(self):
+        return self.title
+
+
+class CourseSearchIndex(models.Model):
+    """
+    SQLite's courses_course_fts FTS5 table (created in migration 0002), mapped
+    so searches can join it. Unmanaged; the table does not exist on PostgreSQL.
+    """
+
+    course = models.OneToOneField(
+        Course,
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name="search_index",
+    )
+    # FTS5's hidden column named after the table; the left side of MATCH.
+    document = models.TextField(db_column="courses_course_fts")
+
+    class Meta:
+        managed = False
+        db_table = "courses_course_fts"
+
+
+class EnrollmentQuerySet(models.QuerySet):
+    def delete(self):
+        from .enrollments import enrollments_deleting
+
+        # Enrollments have no delete signals so cascades can fast-delete them;
+        # direct deletes do their bookkeeping (counters, cached access) here.
+        with transaction.atomic(using=self.db):
+            enrollments_deleting(self)
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class Enrollment(models.Model):
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="enrollments"
+    )
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="enrollments")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = EnrollmentQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Also serves "courses of a student" lookups.
+            models.UniqueConstraint(fields=["student", "course"], name="unique_enrollment"),
+        ]
+        indexes = [models.Index(fields=["course", "created_at"], name="enrollment_course_created_idx")]
+
+    def __str__(self):
+        return f"{self.student_id} -> {self.course_id}"
+
+    def delete(self, *args, **kwargs):
+        from .enrollments import enrollments_deleting
+
+        with transaction.atomic():
+            enrollments_deleting(Enrollment.objects.filter(pk=self.pk))
+            return super().delete(*args, **kwargs)
+
+
+def lesson_media_path(instance, filename):
+    ext = os.path.splitext(filename)[1].lower()
+    return os.path.join("lessons", str(instance.course_id), f"{uuid.uuid4()}{ext}")
+
+
+class Lesson(models.Model):
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="lessons")
+    title = models.CharField(max_length=255)
+    position = models.PositiveIntegerField(default=0)
+    duration_seconds = models.PositiveIntegerField(default=0)
+    # Video/PDF; served only through LessonMediaView, never from MEDIA_URL.
+    media = models.FileField(upload_to=lesson_media_path, blank=True, max_length=255)
+
+    class Meta:
+        ordering = ["course", "position", "id"]
+        indexes = [models.Index(fields=["course", "position"], name="lesson_course_position_idx")]
 
     def __str__(self):
         return self.title
+
+
+class LessonProgress(models.Model):
+    """
+    Latest playback position of a student in a lesson.
+    Written in batches by courses.progress, never per heartbeat.
+    """
+
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="lesson_progress"
+    )
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name="progress")
+    position_seconds = models.PositiveIntegerField(default=0)
+    completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["student", "lesson"], name="unique_lesson_progress"),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} @ {self.lesson_id}: {self.position_seconds}s"
+
+
+class InstructorStats(models.Model):
+    """
+    Per-instructor dashboard totals, maintained incrementally from course
+    and enrollment writes (courses.stats) and periodically reconciled.
+    """
+
+    instructor = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name="instructor_stats"
+    )
+    course_count = models.IntegerField(default=0)
+    enrollment_count = models.IntegerField(default=0)
+    last_course_at = models.DateTimeField(null=True, blank=True)
+    last_enrollment_at = models.DateTimeField(null=True, blank=True)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "instructor stats"
+
+    def __str__(self):
+        return f"Stats for {self.instructor_id}"
@@ -0,0 +1,259 @@
+"""
+Write-batched lesson progress.
+
+Heartbeats only update an in-process dict keyed on (student, lesson); a
+newer heartbeat for the same key replaces the older one. A daemon thread
+flushes the dict every ``PROGRESS_FLUSH_INTERVAL`` seconds (or sooner when
+``PROGRESS_BUFFER_MAX_ENTRIES`` keys are waiting) as one batched upsert, so
+the database sees at most one write per active (student, lesson) per
+interval and worker instead of one per heartbeat.
+
+Reads overlay this worker's pending entries on the stored rows; entries
+buffered by other workers are at most one flush interval behind. While the
+database is unreachable the buffer keeps merging heartbeats for the keys it
+holds but takes no new keys beyond ``PROGRESS_BUFFER_LIMIT``; those
+heartbeats are dropped, counted and logged.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connections, router, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import Enrollment, Lesson, LessonProgress
+
+logger = logging.getLogger(__name__)
+
+LESSON_COURSE_CACHE_KEY = "courses:lesson-course:{}"
+ENROLLMENT_ACCESS_CACHE_KEY = "courses:enrolled:{}:{}"
+LESSON_ACCESS_CACHE_TTL = 600
+UPSERT_BATCH_SIZE = 1000
+
+
+def upsert_progress(rows):
+    """
+    Insert or update ``(student_id, lesson_id, position_seconds, completed,
+    updated_at)`` rows in batches.
+
+    Other workers flush the same keys, so an existing row is only moved to
+    an entry that is newer than it, and completion is never undone: a stale
+    flush can mark a lesson completed but cannot rewind the position or
+    clear the flag. ``bulk_create(update_conflicts=True)`` cannot express
+    either condition, hence the hand-written ``ON CONFLICT`` clause
+    (PostgreSQL and SQLite).
+    """
+    connection = connections[router.db_for_write(LessonProgress)]
+    opts = LessonProgress._meta
+    fields = [opts.get_field(name) for name in ("student", "lesson", "position_seconds", "completed", "updated_at")]
+    table = connection.ops.quote_name(opts.db_table)
+    student, lesson, position, completed, updated_at = (connection.ops.quote_name(f.column) for f in fields)
+    newer = f"excluded.{updated_at} > {table}.{updated_at}"
+    upsert = (
+        f"ON CONFLICT ({student}, {lesson}) DO UPDATE SET "
+        f"{position} = CASE WHEN {newer} THEN excluded.{position} ELSE {table}.{position} END, "
+        f"{completed} = {table}.{completed} OR excluded.{completed}, "
+        f"{updated_at} = CASE WHEN {newer} THEN excluded.{updated_at} ELSE {table}.{updated_at} END "
+        f"WHERE {newer} OR (excluded.{completed} AND NOT {table}.{completed})"
+    )
+    columns = ", ".join((student, lesson, position, completed, updated_at))
+    placeholders = "(" + ", ".join(["%s"] * len(fields)) + ")"
+    batch_size = min(UPSERT_BATCH_SIZE, connection.ops.bulk_batch_size(fields, rows))
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start : start + batch_size]
+            params = [
+                field.get_db_prep_save(value, connection)
+                for row in batch
+                for field, value in zip(fields, row)
+            ]
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) VALUES {', '.join([placeholders] * len(batch))} {upsert}",
+                params,
+            )
+
+
+class ProgressBuffer:
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.heartbeats = 0
+        self.flushed_rows = 0
+        self.flushes = 0
+        self.dropped = 0
+        self._overflowing = False
+
+    def record(self, student_id, course_id, lesson_id, position_seconds, completed=False):
+        key = (student_id, lesson_id)
+        with self._lock:
+            self.heartbeats += 1
+            previous = self._pending.get(key)
+            if previous is None and len(self._pending) >= settings.PROGRESS_BUFFER_LIMIT:
+                self._drop(1)
+                return
+            # Once a lesson is completed in this interval it stays completed.
+            completed = completed or bool(previous and previous[1])
+            self._pending[key] = (position_seconds, completed, timezone.now(), course_id)
+            size = len(self._pending)
+        self._ensure_flusher()
+        if size >= settings.PROGRESS_BUFFER_MAX_ENTRIES:
+            self._wakeup.set()
+
+    def _drop(self, count):
+        # Called with self._lock held; logs once per overflow, not per heartbeat.
+        self.dropped += count
+        if not self._overflowing:
+            self._overflowing = True
+            logger.warning(
+                "Lesson progress buffer is full (%d entries); dropping heartbeats for new lessons until it flushes",
+                settings.PROGRESS_BUFFER_LIMIT,
+            )
+
+    def pending_for(self, student_id, course_id):
+        """
+        Buffered (not yet flushed) entries of a student in a course, as {lesson_id: entry}.
+        """
+        with self._lock:
+            return {
+                lesson_id: entry
+                for (student, lesson_id), entry in self._pending.items()
+                if student == student_id and entry[3] == course_id
+            }
+
+    def flush(self):
+        """
+        Write every buffered entry with batched upserts. Returns the row count.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            rows = [
+                (student_id, lesson_id, position, completed, updated_at)
+                for (student_id, lesson_id), (position, completed, updated_at, _) in pending.items()
+            ]
+            try:
+                upsert_progress(rows)
+            except Exception:
+                # Put the entries back unless newer heartbeats replaced them,
+                # up to the buffer limit.
+                with self._lock:
+                    for key, entry in pending.items():
+                        if key in self._pending:
+                            continue
+                        if len(self._pending) >= settings.PROGRESS_BUFFER_LIMIT:
+                            self._drop(1)
+                            continue
+                        self._pending[key] = entry
+                raise
+            with self._lock:
+                if self._overflowing:
+                    self._overflowing = False
+                    logger.warning("Lesson progress buffer flushed; %d heartbeats dropped so far", self.dropped)
+            self.flushes += 1
+            self.flushed_rows += len(rows)
+            return len(rows)
+
+    # ---------------------------
+    # Background flusher
+    # ---------------------------
+    def _ensure_flusher(self):
+        if self._thread is not None or not settings.PROGRESS_FLUSH_INTERVAL:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="progress-flusher", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(settings.PROGRESS_FLUSH_INTERVAL)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush lesson progress")
+            finally:
+                close_old_connections()
+
+
+progress_buffer = ProgressBuffer()
+
+
+def get_trackable_course_id(student_id, lesson_id):
+    """
+    Course of the lesson if the student is enrolled in it, else None.
+    The lesson's course and positive enrollment answers are cached so steady
+    heartbeats do not touch the database; ``revoke_lesson_access`` drops
+    the enrollment answers when enrollments go.
+    """
+    course_key = LESSON_COURSE_CACHE_KEY.format(lesson_id)
+    course_id = cache.get(course_key)
+    if course_id is None:
+        enrolled = Enrollment.objects.filter(student_id=student_id, course_id=OuterRef("course_id"))
+        row = Lesson.objects.filter(pk=lesson_id).values_list("course_id", Exists(enrolled)).first()
+        if row is None:
+            return None
+        course_id, is_enrolled = row
+        cache.set(course_key, course_id, LESSON_ACCESS_CACHE_TTL)
+    else:
+        is_enrolled = None
+
+    enrolled_key = ENROLLMENT_ACCESS_CACHE_KEY.format(student_id, course_id)
+    if is_enrolled is None:
+        if cache.get(enrolled_key):
+            return course_id
+        is_enrolled = Enrollment.objects.filter(student_id=student_id, course_id=course_id).exists()
+    if not is_enrolled:
+        return None
+    cache.set(enrolled_key, True, LESSON_ACCESS_CACHE_TTL)
+    return course_id
+
+
+def revoke_lesson_access(enrollments):
+    """
+    Forget the cached access of ``enrollments`` (a queryset about to be
+    deleted) once the deletion commits.
+    """
+    keys = [
+        ENROLLMENT_ACCESS_CACHE_KEY.format(student_id, course_id)
+        for student_id, course_id in enrollments.values_list("student_id", "course_id")
+    ]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def forget_lesson(lesson_id):
+    transaction.on_commit(lambda: cache.delete(LESSON_COURSE_CACHE_KEY.format(lesson_id)))
+
+
+def get_course_progress(student_id, course_id):
+    """
+    Progress of a student in every lesson of a course they have started,
+    with this worker's buffered heartbeats applied.
+    """
+    progress = {
+        row["lesson_id"]: row
+        for row in LessonProgress.objects.filter(student_id=student_id, lesson__course_id=course_id).values(
+            "lesson_id", "position_seconds", "completed", "updated_at"
+        )
+    }
+    for lesson_id, (position, completed, updated_at, _) in progress_buffer.pending_for(student_id, course_id).items():
+        stored = progress.get(lesson_id)
+        if stored is not None and stored["updated_at"] >= updated_at:
+            continue
+        progress[lesson_id] = {
+            "lesson_id": lesson_id,
+            "position_seconds": position,
+            "completed": completed,
+            "updated_at": updated_at,
+        }
+    return sorted(progress.values(), key=lambda row: row["lesson_id"])
@@ -0,0 +1,89 @@
+"""
+Course full-text search.
+
+PostgreSQL matches against ``Course.search_vector`` (GIN-indexed, title
+weighted above description, maintained by a trigger) and ranks with
+``ts_rank``. SQLite matches against the ``courses_course_fts`` FTS5 table
+and ranks with ``bm25``. Every search term is treated as a prefix, so
+partial words typed into a search box already match. Other databases get
+an unindexed, unranked ``icontains`` match on title and description.
+"""
+import re
+from functools import reduce
+from operator import and_
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, Lookup, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Course, CourseSearchIndex
+
+MAX_TERMS = 8
+TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+# Column weights for SQLite's bm25(), mirroring tsvector weights A and B.
+FTS_TITLE_WEIGHT = 10.0
+FTS_DESCRIPTION_WEIGHT = 4.0
+
+
+# courses_course_fts is kept in sync with courses_course by triggers created
+# in 0002_course_search. SQLite drops them whenever a migration rebuilds
+# courses_course (most AlterField / AddField operations), so such migrations
+# must recreate them, as 0003_enrollment does.
+
+
+def search_terms(text):
+    return TERM_RE.findall(text.lower())[:MAX_TERMS]
+
+
+def _search_postgres(queryset, terms, limit):
+    query = SearchQuery(" & ".join(f"{term}:*" for term in terms), config="english", search_type="raw")
+    return list(
+        queryset.filter(search_vector=query)
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .order_by("-rank", "-id")[:limit]
+    )
+
+
+class Match(Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+CourseSearchIndex._meta.get_field("document").register_lookup(Match)
+
+
+def _search_sqlite(queryset, terms, limit):
+    match = " ".join(f'"{term}"*' for term in terms)
+    fts = CourseSearchIndex._meta.db_table
+    ranked = queryset.filter(search_index__document__match=match).annotate(
+        rank=RawSQL(f"bm25({fts}, %s, %s)", [FTS_TITLE_WEIGHT, FTS_DESCRIPTION_WEIGHT])
+    )
+    # bm25() is lower-is-better.
+    return list(ranked.order_by("rank", "-id")[:limit])
+
+
+def _search_icontains(queryset, terms, limit):
+    match = reduce(and_, (Q(title__icontains=term) | Q(description__icontains=term) for term in terms))
+    return list(queryset.filter(match).order_by("-id")[:limit])
+
+
+def search_courses(text, limit=20, queryset=None):
+    """
+    Return up to ``limit`` courses matching ``text``, best match first.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return []
+    queryset = Course.objects.defer("search_vector") if queryset is None else queryset
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        return _search_postgres(queryset, terms, limit)
+    if vendor == "sqlite":
+        return _search_sqlite(queryset, terms, limit)
+    return _search_icontains(queryset, terms, limit)
@@ -0,0 +1,46 @@
+from rest_framework import serializers
+
+from .models import Course, InstructorStats
+
+
+# ---------------------------
+# Course Serializer
+# ---------------------------
+class CourseSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Course
+        fields = ["id", "title", "description", "owner", "enrolled_count", "created_at"]
+        read_only_fields = ["id", "owner", "enrolled_count", "created_at"]
+
+
+# ---------------------------
+# Bulk Enrollment Serializer
+# ---------------------------
+class BulkEnrollmentSerializer(serializers.Serializer):
+    student_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=10000
+    )
+
+
+# ---------------------------
+# Lesson Progress Serializers
+# ---------------------------
+class ProgressHeartbeatSerializer(serializers.Serializer):
+    position_seconds = serializers.IntegerField(min_value=0)
+    completed = serializers.BooleanField(default=False)
+
+
+class LessonProgressSerializer(serializers.Serializer):
+    lesson_id = serializers.IntegerField()
+    position_seconds = serializers.IntegerField()
+    completed = serializers.BooleanField()
+    updated_at = serializers.DateTimeField()
+
+
+# ---------------------------
+# Instructor Dashboard Serializer
+# ---------------------------
+class InstructorStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = InstructorStats
+        fields = ["course_count", "enrollment_count", "last_course_at", "last_enrollment_at", "reconciled_at"]
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import bump_catalog_version, bump_course_versions
+from .enrollments import adjust_enrolled_count, enrollments_deleting
+from .models import Course, Enrollment, Lesson
+from .progress import forget_lesson
+from .stats import course_created, course_deleted
+
+
+@receiver([post_save, post_delete], sender=Course)
+def invalidate_course_catalog(sender, instance, **kwargs):
+    bump_catalog_version()
+    bump_course_versions([instance.pk])
+
+
+@receiver(post_save, sender=Course)
+def count_new_course(sender, instance, created, **kwargs):
+    if created:
+        course_created(instance)
+
+
+@receiver(post_delete, sender=Course)
+def count_removed_course(sender, instance, **kwargs):
+    course_deleted(instance)
+
+
+@receiver(post_save, sender=Enrollment)
+def count_new_enrollment(sender, instance, created, **kwargs):
+    if created:
+        adjust_enrolled_count(instance.course_id, 1)
+
+
+# Enrollments themselves have no delete receivers, so the collector can
+# fast-delete them when a course or a user goes; their counts and cached
+# lesson access are dealt with here, per course, before the cascade runs.
+@receiver(pre_delete, sender=Course)
+def forget_course_enrollments(sender, instance, **kwargs):
+    enrollments_deleting(Enrollment.objects.filter(course=instance))
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def forget_student_enrollments(sender, instance, **kwargs):
+    enrollments_deleting(Enrollment.objects.filter(student=instance))
+
+
+@receiver(post_delete, sender=Lesson)
+def forget_deleted_lesson(sender, instance, **kwargs):
+    forget_lesson(instance.pk)
@@ -0,0 +1,124 @@
+"""
+Instructor dashboard totals.
+
+``InstructorStats`` holds one row per instructor. Course creation/deletion
+and every enrollment counter change apply their delta to that row with a
+single ``F()`` UPDATE, so the dashboard reads one row instead of
+aggregating over all of an instructor's courses. Changes the events
+cannot see (a course moved to another owner, raw SQL, a lost write) are
+repaired by ``reconcile_instructor_stats``, run periodically through the
+``reconcile_instructor_stats`` management command.
+"""
+from django.db.models import Case, Count, F, IntegerField, Max, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Course, Enrollment, InstructorStats
+
+
+def _apply(queryset, owner_id=None, **changes):
+    """
+    Run ``changes`` as one UPDATE; if the instructor has no row yet and
+    ``owner_id`` is given, build it from scratch instead.
+    """
+    if not queryset.update(**changes) and owner_id is not None:
+        reconcile_instructor_stats([owner_id])
+
+
+def course_created(course):
+    _apply(
+        InstructorStats.objects.filter(pk=course.owner_id),
+        owner_id=course.owner_id,
+        course_count=F("course_count") + 1,
+        last_course_at=course.created_at,
+    )
+
+
+def course_deleted(course):
+    # The course's enrollments were taken off in pre_delete (see courses.signals).
+    # No rebuild when the row is missing: deleting the instructor cascades to
+    # their stats row before their courses, and a new row would point at the
+    # user being deleted. Reconciliation covers any other missing row.
+    _apply(
+        InstructorStats.objects.filter(pk=course.owner_id),
+        course_count=F("course_count") - 1,
+    )
+
+
+def enrollments_changed(course_id, delta):
+    changes = {"enrollment_count": F("enrollment_count") + delta}
+    if delta > 0:
+        changes["last_enrollment_at"] = timezone.now()
+    # Removals never rebuild a missing row (see course_deleted).
+    if not InstructorStats.objects.filter(instructor__courses__id=course_id).update(**changes) and delta > 0:
+        owner_id = Course.objects.filter(pk=course_id).values_list("owner_id", flat=True).first()
+        if owner_id is not None:
+            reconcile_instructor_stats([owner_id])
+
+
+def enrollments_removed(per_owner):
+    """
+    Subtract ``{instructor_id: removed_enrollments}`` in one UPDATE.
+    """
+    # Removals never rebuild a missing row (see course_deleted).
+    InstructorStats.objects.filter(pk__in=per_owner).update(
+        enrollment_count=F("enrollment_count")
+        - Case(*(When(pk=pk, then=Value(n)) for pk, n in per_owner.items()), output_field=IntegerField())
+    )
+
+
+def reconcile_instructor_stats(instructor_ids=None):
+    """
+    Recompute stats rows from the source tables (all instructors with
+    courses or an existing row, or only ``instructor_ids``).
+    Returns the number of rows written.
+    """
+    courses = Course.objects.all()
+    enrollments = Enrollment.objects.all()
+    existing = InstructorStats.objects.all()
+    if instructor_ids is not None:
+        courses = courses.filter(owner_id__in=instructor_ids)
+        enrollments = enrollments.filter(course__owner_id__in=instructor_ids)
+        existing = existing.filter(pk__in=instructor_ids)
+
+    totals = {
+        row["owner_id"]: row
+        for row in courses.values("owner_id").annotate(
+            courses=Count("id"), enrollments=Coalesce(Sum("enrolled_count"), 0), last_course=Max("created_at")
+        )
+    }
+    last_enrollment = dict(
+        enrollments.values("course__owner_id").annotate(last=Max("created_at")).values_list("course__owner_id", "last")
+    )
+    now = timezone.now()
+    rows = []
+    for owner_id in set(totals) | set(existing.values_list("pk", flat=True)) | set(instructor_ids or ()):
+        row = totals.get(owner_id, {})
+        rows.append(
+            InstructorStats(
+                instructor_id=owner_id,
+                course_count=row.get("courses", 0),
+                enrollment_count=row.get("enrollments", 0),
+                last_course_at=row.get("last_course"),
+                last_enrollment_at=last_enrollment.get(owner_id),
+                reconciled_at=now,
+            )
+        )
+    InstructorStats.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["instructor"],
+        update_fields=["course_count", "enrollment_count", "last_course_at", "last_enrollment_at", "reconciled_at"],
+    )
+    return len(rows)
+
+
+def reconcile_enrolled_counts():
+    """
+    Reset every ``Course.enrolled_count`` to the true enrollment count in one UPDATE.
+    """
+    actual = (
+        Enrollment.objects.filter(course=OuterRef("pk")).order_by().values("course").annotate(n=Count("id")).values("n")
+    )
+    return Course.objects.update(enrolled_count=Coalesce(Subquery(actual), 0))
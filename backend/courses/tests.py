@@ -1,3 +1,516 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from karpithal.testing import QueryBudgetTestMixin
+from .models import Course
+
+User = get_user_model()
+
+
+class CourseKeysetPaginationTest(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User.objects.create(username="owner@example.com", email="owner@example.com")
+        self.courses = [Course.objects.create(title=f"Course {i}", description="", owner=self.owner) for i in range(5)]
+        # Equal timestamps must still page deterministically by id.
+        Course.objects.filter(pk__in=[c.pk for c in self.courses[1:4]]).update(created_at=self.courses[1].created_at)
+        self.client.force_authenticate(user=self.owner)
+        self.url = reverse("courses:course-list")
+
+    def _titles(self, response):
+        return [course["title"] for course in response.data["results"]]
+
+    def test_walks_forward_and_back(self):
+        with self.assertMaxQueries(1):
+            response = self.client.get(self.url, {"page_size": 2})
+        self.assertNotIn("count", response.data)
+        self.assertIsNone(response.data["previous"])
+        pages = [self._titles(response)]
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            pages.append(self._titles(response))
+        self.assertEqual(pages, [["Course 4", "Course 3"], ["Course 2", "Course 1"], ["Course 0"]])
+
+        response = self.client.get(response.data["previous"])
+        self.assertEqual(self._titles(response), ["Course 2", "Course 1"])
+        response = self.client.get(response.data["previous"])
+        self.assertEqual(self._titles(response), ["Course 4", "Course 3"])
+        self.assertIsNone(response.data["previous"])
+
+    def test_approximate_count_and_invalid_cursor(self):
+        response = self.client.get(self.url, {"count": "approx"})
+        self.assertEqual(response.data["count"], 5)
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+    def test_keyset_orderings_are_checked_at_startup(self):
+        from accounts.checks import check_keyset_pagination
+        from accounts.models import UserProfile
+
+        from karpithal.pagination import check_keyset_ordering
+
+        self.assertEqual(check_keyset_pagination(None), [])
+        self.assertEqual(len(check_keyset_ordering(UserProfile, ("-created_at", "-id"))), 1)
+        self.assertEqual(len(check_keyset_ordering(Course, ("-created_at", "title"))), 1)
+        self.assertEqual(check_keyset_ordering(Course, ("-created_at", "-id")), [])
+
+
+class CourseSearchTest(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        owner = User.objects.create(username="teacher@example.com", email="teacher@example.com")
+        self.python = Course.objects.create(title="Python for Data Science", description="Pandas and NumPy.", owner=owner)
+        self.django = Course.objects.create(title="Web Development", description="Building APIs with Django and Python.", owner=owner)
+        Course.objects.create(title="Watercolour Basics", description="Painting landscapes.", owner=owner)
+        self.client.force_authenticate(user=owner)
+        self.url = reverse("courses:course-search")
+
+    def _ids(self, q):
+        with self.assertMaxQueries(1):
+            response = self.client.get(self.url, {"q": q})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [course["id"] for course in response.data]
+
+    def test_title_matches_rank_above_description(self):
+        self.assertEqual(self._ids("python"), [self.python.pk, self.django.pk])
+
+    def test_prefix_and_multiple_terms(self):
+        self.assertEqual(self._ids("pyth djan"), [self.django.pk])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.python.title = "Statistics"
+        self.python.save()
+        self.django.delete()
+        self.assertEqual(self._ids("python"), [])
+        self.assertEqual(self._ids("stat"), [self.python.pk])
+
+    def test_blank_query_returns_nothing(self):
+        self.assertEqual(self.client.get(self.url, {"q": "  !! "}).data, [])
+
+    def test_other_databases_fall_back_to_icontains(self):
+        from unittest.mock import patch
+
+        from django.db import connection
+
+        from .search import search_courses
+
+        with patch.object(connection, "vendor", "mysql"):
+            self.assertEqual([c.pk for c in search_courses("pyth")], [self.django.pk, self.python.pk])
+            self.assertEqual([c.pk for c in search_courses("pyth djan")], [self.django.pk])
+
+
+class CourseCatalogCacheTest(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        owner = User.objects.create(username="catalog@example.com", email="catalog@example.com")
+        self.course = Course.objects.create(title="Algebra", description="Equations.", owner=owner)
+        self.url = reverse("courses:course-detail", args=[self.course.pk])
+
+    def test_revalidation_and_cache_hits_skip_the_database(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            cached = self.client.get(self.url)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(cached["ETag"], etag)
+
+    def test_pages_are_cached_per_host(self):
+        list_url = reverse("courses:course-list")
+        with override_settings(ALLOWED_HOSTS=["*"]):
+            first = self.client.get(list_url, HTTP_HOST="a.example.com")
+            second = self.client.get(list_url, HTTP_HOST="b.example.com")
+        self.assertNotEqual(first["ETag"], second["ETag"])
+
+    def test_enrollment_retires_only_pages_showing_the_course(self):
+        from .models import Enrollment
+
+        other = Course.objects.create(title="Geometry", description="Shapes.", owner=self.course.owner)
+        other_url = reverse("courses:course-detail", args=[other.pk])
+        list_url = reverse("courses:course-list")
+        etags = {url: self.client.get(url)["ETag"] for url in (self.url, other_url, list_url)}
+
+        student = User.objects.create(username="learner@example.com", email="learner@example.com")
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(course=self.course, student=student)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.client.get(other_url, HTTP_IF_NONE_MATCH=etags[other_url]).status_code,
+                status.HTTP_304_NOT_MODIFIED,
+            )
+        for url in (self.url, list_url):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"][-1]["enrolled_count"], 1)
+
+    def test_course_change_invalidates(self):
+        list_url = reverse("courses:course-list")
+        etag = self.client.get(list_url)["ETag"]
+        self.course.title = "Linear Algebra"
+        self.course.save()
+
+        response = self.client.get(list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["results"][0]["title"], "Linear Algebra")
+
+
+class BulkEnrollmentTest(APITestCase):
+    def setUp(self):
+        self.instructor = User.objects.create(
+            username="prof@example.com", email="prof@example.com", role=User.INSTRUCTOR, is_approved=True
+        )
+        self.course = Course.objects.create(title="Biology", description="Cells.", owner=self.instructor)
+        self.students = [
+            User.objects.create(username=f"s{i}@example.com", email=f"s{i}@example.com") for i in range(4)
+        ]
+        self.url = reverse("courses:course-bulk-enroll", args=[self.course.pk])
+        self.client.force_authenticate(user=self.instructor)
+
+    def test_roster_enrollment_updates_counter(self):
+        from .models import Enrollment
+
+        ids = [s.pk for s in self.students]
+        Enrollment.objects.create(course=self.course, student=self.students[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {"student_ids": ids + [self.instructor.pk, 999999]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data["data"]
+        self.assertEqual(data["enrolled"], ids[1:])
+        self.assertEqual(data["already_enrolled"], ids[:1])
+        self.assertEqual(data["invalid"], sorted([self.instructor.pk, 999999]))
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.enrolled_count, 4)
+
+        Enrollment.objects.filter(student=self.students[1]).get().delete()
+        listed = self.client.get(reverse("courses:course-list")).data["results"]
+        self.assertEqual(listed[0]["enrolled_count"], 3)
+
+    def test_owner_can_enroll_with_bearer_token(self):
+        from accounts.views import get_tokens_for_user
+
+        self.client.force_authenticate(user=None)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(self.instructor)['access']}")
+        response = self.client.post(self.url, {"student_ids": [self.students[0].pk]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["enrolled"], [self.students[0].pk])
+
+    def test_only_owner_can_enroll(self):
+        other = User.objects.create(
+            username="other@example.com", email="other@example.com", role=User.INSTRUCTOR, is_approved=True
+        )
+        self.client.force_authenticate(user=other)
+        response = self.client.post(self.url, {"student_ids": [self.students[0].pk]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class LessonProgressTest(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        from .models import Enrollment, Lesson
+        from .progress import progress_buffer
+
+        self.buffer = progress_buffer
+        self.addCleanup(self.buffer.flush)
+        owner = User.objects.create(username="author@example.com", email="author@example.com", role=User.INSTRUCTOR)
+        course = Course.objects.create(title="Chemistry", description="Atoms.", owner=owner)
+        self.lessons = [Lesson.objects.create(course=course, title=f"Lesson {i}", position=i) for i in range(2)]
+        self.student = User.objects.create(username="learner@example.com", email="learner@example.com")
+        Enrollment.objects.create(course=course, student=self.student)
+        self.progress_url = reverse("courses:course-progress", args=[course.pk])
+        self.client.force_authenticate(user=self.student)
+
+    def _beat(self, lesson, position, **extra):
+        url = reverse("courses:lesson-progress-heartbeat", args=[lesson.pk])
+        return self.client.post(url, {"position_seconds": position, **extra}, format="json")
+
+    def test_heartbeats_are_coalesced_into_one_upsert(self):
+        from .models import LessonProgress
+
+        self.assertEqual(self._beat(self.lessons[0], 5).status_code, status.HTTP_202_ACCEPTED)
+        with self.assertNumQueries(0):
+            for position in (10, 15, 20):
+                self._beat(self.lessons[0], position)
+        self._beat(self.lessons[1], 3, completed=True)
+        self.assertFalse(LessonProgress.objects.exists())
+
+        # Buffered heartbeats are visible before any flush.
+        data = self.client.get(self.progress_url).data["data"]
+        self.assertEqual([(row["lesson_id"], row["position_seconds"]) for row in data], [(self.lessons[0].pk, 20), (self.lessons[1].pk, 3)])
+
+        self.assertEqual(self.buffer.flush(), 2)
+        self._beat(self.lessons[0], 25)
+        self.assertEqual(self.buffer.flush(), 1)
+        stored = {p.lesson_id: p for p in LessonProgress.objects.all()}
+        self.assertEqual(stored[self.lessons[0].pk].position_seconds, 25)
+        self.assertTrue(stored[self.lessons[1].pk].completed)
+
+    def test_stale_flush_keeps_newer_position_and_completion(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from .models import LessonProgress
+        from .progress import upsert_progress
+
+        lesson = self.lessons[0]
+        now = timezone.now()
+        upsert_progress([(self.student.pk, lesson.pk, 300, True, now)])
+        # Another worker flushes an older heartbeat after this one.
+        upsert_progress([(self.student.pk, lesson.pk, 30, False, now - timedelta(seconds=10))])
+        stored = LessonProgress.objects.get(student=self.student, lesson=lesson)
+        self.assertEqual((stored.position_seconds, stored.completed, stored.updated_at), (300, True, now))
+
+        # A newer heartbeat moves the position but cannot clear completion.
+        upsert_progress([(self.student.pk, lesson.pk, 12, False, now + timedelta(seconds=10))])
+        stored.refresh_from_db()
+        self.assertEqual((stored.position_seconds, stored.completed), (12, True))
+
+        # An older completion still marks the lesson completed.
+        other = self.lessons[1]
+        upsert_progress([(self.student.pk, other.pk, 50, False, now)])
+        upsert_progress([(self.student.pk, other.pk, 40, True, now - timedelta(seconds=10))])
+        stored = LessonProgress.objects.get(student=self.student, lesson=other)
+        self.assertEqual((stored.position_seconds, stored.completed, stored.updated_at), (50, True, now))
+
+    def test_buffer_is_capped_while_flushes_fail(self):
+        from unittest.mock import patch
+
+        from django.db import OperationalError
+
+        from .progress import ProgressBuffer
+
+        buffer = ProgressBuffer()
+        with self.settings(PROGRESS_FLUSH_INTERVAL=0, PROGRESS_BUFFER_LIMIT=2), \
+                patch("courses.progress.upsert_progress", side_effect=OperationalError), \
+                self.assertLogs("courses.progress", "WARNING") as logs:
+            buffer.record(1, 1, 1, 10)
+            buffer.record(1, 1, 2, 10)
+            with self.assertRaises(OperationalError):
+                buffer.flush()
+            buffer.record(1, 1, 3, 10)
+            buffer.record(1, 1, 1, 20)  # known keys still merge
+            buffer.record(1, 1, 4, 10)
+        self.assertEqual(sorted(buffer._pending), [(1, 1), (1, 2)])
+        self.assertEqual(buffer._pending[(1, 1)][0], 20)
+        self.assertEqual(buffer.dropped, 2)
+        self.assertEqual(len(logs.output), 1)
+
+    def test_unenrolling_revokes_cached_access(self):
+        from .models import Enrollment
+
+        self.assertEqual(self._beat(self.lessons[0], 5).status_code, status.HTTP_202_ACCEPTED)
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.get(student=self.student).delete()
+        self.assertEqual(self._beat(self.lessons[0], 6).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_not_enrolled_lesson_rejected(self):
+        from .models import Lesson
+
+        other = Course.objects.create(title="Other", description="", owner=self.student)
+        lesson = Lesson.objects.create(course=other, title="Closed")
+        self.assertEqual(self._beat(lesson, 1).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class LessonMediaTest(APITestCase):
+    def setUp(self):
+        import shutil
+        import tempfile
+
+        from django.core.files.base import ContentFile
+        from django.test import override_settings
+
+        from .models import Enrollment, Lesson
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+
+        self.owner = owner = User.objects.create(
+            username="lecturer@example.com", email="lecturer@example.com", role=User.INSTRUCTOR
+        )
+        course = Course.objects.create(title="Physics", description="Motion.", owner=owner)
+        self.data = bytes(range(256)) * 4
+        self.lesson = Lesson.objects.create(course=course, title="Lecture 1")
+        self.lesson.media.save("lecture.mp4", ContentFile(self.data))
+        self.student = User.objects.create(username="viewer@example.com", email="viewer@example.com")
+        Enrollment.objects.create(course=course, student=self.student)
+        self.url = reverse("courses:lesson-media", args=[self.lesson.pk])
+        self.client.force_authenticate(user=self.student)
+
+    def _body(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_full_and_range_requests(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Type"], "video/mp4")
+        self.assertEqual(self._body(response), self.data)
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=100-199")
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(self.data)}")
+        self.assertEqual(response["Content-Length"], "100")
+        self.assertEqual(self._body(response), self.data[100:200])
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=-10")
+        self.assertEqual(self._body(response), self.data[-10:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.data)}-")
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+
+        # A stale If-Range falls back to the whole file.
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_offload_modes_and_access(self):
+        from django.test import override_settings
+
+        with override_settings(PROTECTED_MEDIA_SERVER="nginx"):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Accel-Redirect"], "/protected-media/" + self.lesson.media.name)
+        self.assertFalse(response.has_header("Content-Type"))
+
+        outsider = User.objects.create(username="outsider@example.com", email="outsider@example.com")
+        self.client.force_authenticate(user=outsider)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+    def test_owner_streams_with_bearer_token(self):
+        from accounts.views import get_tokens_for_user
+
+        self.client.force_authenticate(user=None)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(self.owner)['access']}")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._body(response), self.data)
+
+class InstructorDashboardTest(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.instructor = User.objects.create(
+            username="dash@example.com", email="dash@example.com", role=User.INSTRUCTOR, is_approved=True
+        )
+        self.students = [User.objects.create(username=f"d{i}@example.com", email=f"d{i}@example.com") for i in range(3)]
+        self.client.force_authenticate(user=self.instructor)
+
+    def _stats(self):
+        with self.assertMaxQueries(1):
+            return self.client.get(reverse("courses:instructor-dashboard")).data["data"]
+
+    def test_stats_follow_course_and_enrollment_events(self):
+        from .enrollments import enroll_students
+        from .models import Enrollment, InstructorStats
+        from .stats import reconcile_instructor_stats
+
+        self.assertEqual(self._stats()["course_count"], 0)
+        first = Course.objects.create(title="One", description="", owner=self.instructor)
+        second = Course.objects.create(title="Two", description="", owner=self.instructor)
+        enroll_students(first.pk, [s.pk for s in self.students])
+        Enrollment.objects.create(course=second, student=self.students[0])
+        stats = self._stats()
+        self.assertEqual((stats["course_count"], stats["enrollment_count"]), (2, 4))
+        self.assertIsNotNone(stats["last_enrollment_at"])
+
+        first.delete()
+        stats = self._stats()
+        self.assertEqual((stats["course_count"], stats["enrollment_count"]), (1, 1))
+
+        # Drift is repaired by reconciliation.
+        InstructorStats.objects.filter(pk=self.instructor.pk).update(course_count=7, enrollment_count=-3)
+        reconcile_instructor_stats()
+        stats = self._stats()
+        self.assertEqual((stats["course_count"], stats["enrollment_count"]), (1, 1))
+        self.assertIsNotNone(stats["reconciled_at"])
+
+    def test_deleting_instructor_with_courses(self):
+        from .enrollments import enroll_students
+        from .models import Enrollment, InstructorStats
+
+        course = Course.objects.create(title="Gone", description="", owner=self.instructor)
+        enroll_students(course.pk, [s.pk for s in self.students])
+        Enrollment.objects.create(
+            course=Course.objects.create(title="Gone too", description="", owner=self.instructor),
+            student=self.students[0],
+        )
+        self.instructor.delete()
+        self.assertFalse(Course.objects.filter(owner_id=self.instructor.pk).exists())
+        self.assertFalse(InstructorStats.objects.filter(pk=self.instructor.pk).exists())
+
+    def test_cascaded_enrollment_deletes_are_counted_per_course(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from .enrollments import enroll_students
+        from .models import Enrollment
+
+        def delete_course(n):
+            course = Course.objects.create(title=f"Size {n}", description="", owner=self.instructor)
+            students = [User.objects.create(username=f"c{n}-{i}@example.com", email=f"c{n}-{i}@example.com") for i in range(n)]
+            enroll_students(course.pk, [s.pk for s in students])
+            with CaptureQueriesContext(connection) as queries:
+                course.delete()
+            return len(queries)
+
+        self.assertEqual(delete_course(2), delete_course(10))
+        self.assertEqual(self._stats()["enrollment_count"], 0)
+
+        kept = Course.objects.create(title="Kept", description="", owner=self.instructor)
+        enroll_students(kept.pk, [s.pk for s in self.students])
+        self.students[0].delete()
+        Enrollment.objects.filter(student=self.students[1]).delete()
+        kept.refresh_from_db()
+        self.assertEqual(kept.enrolled_count, 1)
+        self.assertEqual(self._stats()["enrollment_count"], 1)
+
+    def test_roster_counts_only_inserted_rows(self):
+        from unittest.mock import patch
+
+        from .enrollments import enroll_students
+        from .models import Enrollment
+
+        course = Course.objects.create(title="Race", description="", owner=self.instructor)
+        Enrollment.objects.create(course=course, student=self.students[0])
+        # A single enrollment lands between the roster's lookup and its insert.
+        with patch.object(Enrollment.objects, "filter", return_value=Enrollment.objects.none()):
+            enrolled, already, invalid = enroll_students(course.pk, [s.pk for s in self.students])
+        self.assertEqual(enrolled, [s.pk for s in self.students[1:]])
+        self.assertEqual(already, [self.students[0].pk])
+        course.refresh_from_db()
+        self.assertEqual(course.enrolled_count, 3)
+        self.assertEqual(self._stats()["enrollment_count"], 3)
+
+    def test_reconcile_command_recounts_courses(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        course = Course.objects.create(title="Three", description="", owner=self.instructor)
+        Course.objects.filter(pk=course.pk).update(enrolled_count=42)
+        call_command("reconcile_instructor_stats", stdout=StringIO())
+        course.refresh_from_db()
+        self.assertEqual(course.enrolled_count, 0)
+        self.assertEqual(self._stats()["enrollment_count"], 0)
+
+
+class InstructorCourseListTest(QueryBudgetTestMixin, APITestCase):
+    def test_lists_only_own_courses(self):
+        mine = User.objects.create(username="mine@example.com", email="mine@example.com", role=User.INSTRUCTOR)
+        other = User.objects.create(username="theirs@example.com", email="theirs@example.com", role=User.INSTRUCTOR)
+        Course.objects.create(title="Mine", description="", owner=mine)
+        Course.objects.create(title="Theirs", description="", owner=other)
+        self.client.force_authenticate(user=mine)
+        with self.assertMaxQueries(1):
+            response = self.client.get(reverse("courses:instructor-course-list"))
+        self.assertEqual([c["title"] for c in response.data["results"]], ["Mine"])
@@ -0,0 +1,27 @@
+from django.urls import path
+
+from .views import (
+    CourseBulkEnrollView,
+    CourseDetailView,
+    CourseListView,
+    CourseProgressView,
+    CourseSearchView,
+    InstructorCourseListView,
+    InstructorDashboardView,
+    LessonMediaView,
+    LessonProgressHeartbeatView,
+)
+
+app_name = "courses"
+
+urlpatterns = [
+    path('', CourseListView.as_view(), name='course-list'),
+    path('mine/', InstructorCourseListView.as_view(), name='instructor-course-list'),
+    path('<int:pk>/', CourseDetailView.as_view(), name='course-detail'),
+    path('<int:pk>/enrollments/', CourseBulkEnrollView.as_view(), name='course-bulk-enroll'),
+    path('<int:pk>/progress/', CourseProgressView.as_view(), name='course-progress'),
+    path('lessons/<int:lesson_id>/media/', LessonMediaView.as_view(), name='lesson-media'),
+    path('lessons/<int:lesson_id>/progress/', LessonProgressHeartbeatView.as_view(), name='lesson-progress-heartbeat'),
+    path('instructor/dashboard/', InstructorDashboardView.as_view(), name='instructor-dashboard'),
+    path('search/', CourseSearchView.as_view(), name='course-search'),
+]
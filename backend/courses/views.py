@@ -1,3 +1,201 @@
-from django.shortcuts import render
+from django.contrib.auth import get_user_model
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, status
+from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from accounts.permissions import IsInstructor, IsInstructorOrAdmin, IsOwnerOrAdmin, OwnerFilterBackend, is_owner
+
+from .cache import CachedCatalogMixin
+from karpithal.media import serve_protected_file
+from karpithal.pagination import KeysetPagination
+from karpithal.throttling import SlidingScopedRateThrottle
+from .enrollments import enroll_students
+from .models import Course, InstructorStats, Lesson
+from .progress import get_course_progress, get_trackable_course_id, progress_buffer
+from .search import search_courses
+from .serializers import (
+    BulkEnrollmentSerializer,
+    CourseSerializer,
+    InstructorStatsSerializer,
+    LessonProgressSerializer,
+    ProgressHeartbeatSerializer,
+)
+
+User = get_user_model()
+
+
+# ---------------------------
+# Course Listing
+# ---------------------------
+class CourseListView(CachedCatalogMixin, generics.ListAPIView):
+    """
+    Newest courses first, paginated by (created_at, id) keyset cursor.
+    Public and served from the catalog cache.
+    """
+    queryset = Course.objects.defer("search_vector")
+    serializer_class = CourseSerializer
+    permission_classes = [AllowAny]
+    pagination_class = KeysetPagination
+    ordering = ("-created_at", "-id")
+    catalog_cache_name = "list"
+    query_budget = {"GET": 2}  # page + optional ?count=approx
+
+
+class CourseDetailView(CachedCatalogMixin, generics.RetrieveAPIView):
+    queryset = Course.objects.defer("search_vector")
+    serializer_class = CourseSerializer
+    permission_classes = [AllowAny]
+    catalog_cache_name = "detail"
+    query_budget = {"GET": 1}
+
+
+class InstructorCourseListView(generics.ListAPIView):
+    """
+    The current instructor's own courses (every course for admins),
+    filtered by owner_id in SQL.
+    """
+    queryset = Course.objects.defer("search_vector")
+    serializer_class = CourseSerializer
+    permission_classes = [IsAuthenticated, IsInstructorOrAdmin]
+    filter_backends = [OwnerFilterBackend]
+    pagination_class = KeysetPagination
+    ordering = ("-created_at", "-id")
+    query_budget = {"GET": 2}  # page + optional ?count=approx
+
+
+# ---------------------------
+# Course Search
+# ---------------------------
+class CourseSearchView(generics.ListAPIView):
+    """
+    Full-text search over title and description: ``?q=<text>&limit=<n>``.
+    Terms match as prefixes; results are ranked, best first.
+    """
+    serializer_class = CourseSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+    default_limit = 20
+    max_limit = 50
+    query_budget = {"GET": 1}
+
+    def get_queryset(self):
+        try:
+            limit = int(self.request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        limit = max(1, min(limit, self.max_limit))
+        return search_courses(self.request.query_params.get("q", ""), limit=limit)
+
+
+# ---------------------------
+# Bulk Enrollment
+# ---------------------------
+class CourseBulkEnrollView(APIView):
+    """
+    Enroll a roster of students in one request.
+    Only the course owner or an admin may enroll students.
+    """
+    permission_classes = [IsAuthenticated, IsInstructorOrAdmin, IsOwnerOrAdmin]
+
+    def post(self, request, pk):
+        course = get_object_or_404(Course.objects.only("id", "owner_id"), pk=pk)
+        self.check_object_permissions(request, course)
+
+        serializer = BulkEnrollmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        enrolled, already_enrolled, invalid = enroll_students(course.pk, serializer.validated_data["student_ids"])
+        return Response(
+            {
+                "success": True,
+                "data": {"enrolled": enrolled, "already_enrolled": already_enrolled, "invalid": invalid},
+                "message": f"{len(enrolled)} students enrolled.",
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+# ---------------------------
+# Lesson Progress
+# ---------------------------
+class LessonProgressHeartbeatView(APIView):
+    """
+    Player heartbeat. Buffered in memory and written in batches,
+    so a steady stream of heartbeats costs no database writes.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [SlidingScopedRateThrottle]
+    throttle_scope = "progress"
+    query_budget = {"POST": 1}
+
+    def post(self, request, lesson_id):
+        serializer = ProgressHeartbeatSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        course_id = get_trackable_course_id(request.user.pk, lesson_id)
+        if course_id is None:
+            raise NotFound("Lesson not found or you are not enrolled in its course.")
+
+        progress_buffer.record(request.user.pk, course_id, lesson_id, **serializer.validated_data)
+        return Response({"success": True}, status=status.HTTP_202_ACCEPTED)
+
+
+class CourseProgressView(APIView):
+    """
+    The current user's progress in a course, at most one flush interval stale.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = {"GET": 1}
+
+    def get(self, request, pk):
+        progress = get_course_progress(request.user.pk, pk)
+        return Response(
+            {"success": True, "data": LessonProgressSerializer(progress, many=True).data},
+            status=status.HTTP_200_OK,
+        )
+
+
+# ---------------------------
+# Protected Lesson Media
+# ---------------------------
+class LessonMediaView(APIView):
+    """
+    Streams a lesson's video/PDF to its course owner, admins and enrolled
+    students, with Range support for seeking (see karpithal.media).
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_classes = []  # players issue many range requests per view
+    query_budget = {"GET": 2}
+
+    def get(self, request, lesson_id):
+        lesson = get_object_or_404(Lesson.objects.select_related("course").only("media", "course__owner_id"), pk=lesson_id)
+        user = request.user
+        allowed = (
+            user.role == User.ADMIN
+            or is_owner(request, None, lesson.course)
+            or get_trackable_course_id(user.pk, lesson.pk) is not None
+        )
+        if not allowed:
+            raise PermissionDenied("You are not enrolled in this course.")
+        if not lesson.media:
+            raise NotFound("This lesson has no media.")
+        return serve_protected_file(request, lesson.media)
+
+
+# ---------------------------
+# Instructor Dashboard
+# ---------------------------
+class InstructorDashboardView(APIView):
+    """
+    Totals for the current instructor, read from their single stats row.
+    """
+    permission_classes = [IsAuthenticated, IsInstructor]
+    query_budget = {"GET": 1}
+
+    def get(self, request):
+        stats = InstructorStats.objects.filter(pk=request.user.pk).first() or InstructorStats()
+        return Response(
+            {"success": True, "data": InstructorStatsSerializer(stats).data},
+            status=status.HTTP_200_OK,
+        )
@@ -9,8 +9,21 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.conf import settings
+
+from karpithal.handlers import RouteScopedASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'karpithal.settings')
 
-application = get_asgi_application()
+# Same as get_asgi_application(), with the lean middleware chain for API routes.
+django.setup(set_prefix=False)
+
+# Each ASGI request runs its sync code in a new thread, so per-thread
+# persistent connections are never reused and never closed. Only pooled
+# databases (OPTIONS["pool"]) may keep connections open across requests.
+for database in settings.DATABASES.values():
+    if "pool" not in database.get("OPTIONS", {}):
+        database["CONN_MAX_AGE"] = 0
+
+application = RouteScopedASGIHandler()
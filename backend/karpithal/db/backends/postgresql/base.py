@@ -0,0 +1,81 @@
+"""
+PostgreSQL backend with a per-process connection pool.
+
+Configure it with ``OPTIONS["pool"]`` (the ``ConnectionPool`` keyword
+arguments: ``min_size``, ``max_size``, ``timeout``, ``max_uses``,
+``max_idle``, ``check_idle``) and ``CONN_MAX_AGE = 0``, so every request
+returns its connection to the pool when it finishes. Without
+``OPTIONS["pool"]`` it behaves like Django's own backend.
+"""
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.creation import DatabaseCreation as BaseDatabaseCreation
+from psycopg2 import extensions
+
+from karpithal.db.pool import ConnectionPool, PoolTimeout, close_pools, get_pool
+
+
+def reset_connection(connection):
+    """
+    Leave a returned connection idle and in autocommit mode (Django switches
+    autocommit off inside atomic blocks).
+    """
+    if connection.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+    if not connection.autocommit:
+        connection.autocommit = True
+
+
+class DatabaseCreation(BaseDatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would block DROP DATABASE.
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    @property
+    def pool_options(self):
+        if self.alias == NO_DB_ALIAS:
+            return None
+        return self.settings_dict["OPTIONS"].get("pool")
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        # OPTIONS are passed on to psycopg2.connect(); the pool settings are ours.
+        conn_params.pop("pool", None)
+        return conn_params
+
+    def get_pool(self, conn_params):
+        key = (self.alias, repr(sorted(conn_params.items())))
+        return get_pool(
+            key,
+            lambda: ConnectionPool(
+                lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+                reset=reset_connection,
+                **self.pool_options,
+            ),
+        )
+
+    def get_new_connection(self, conn_params):
+        if self.pool_options is None:
+            return super().get_new_connection(conn_params)
+        self.pool = self.get_pool(conn_params)
+        # Django sets the isolation level while connecting; mirror it for reused connections.
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        self.isolation_level = (
+            base.IsolationLevel(isolation_level) if isolation_level is not None else base.IsolationLevel.READ_COMMITTED
+        )
+        try:
+            return self.pool.getconn()
+        except PoolTimeout as e:
+            raise self.Database.OperationalError(str(e)) from e
+
+    def _close(self):
+        pool = getattr(self, "pool", None)
+        if pool is None or self.connection is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            pool.putconn(self.connection)
@@ -0,0 +1,277 @@
+"""
+Thread-safe DB-API connection pool.
+
+Used by the ``karpithal.db.backends.postgresql`` engine: Django checks a
+connection out when it first needs one and hands it back when it would
+otherwise close it (at the end of every request, since pooled databases run
+with ``CONN_MAX_AGE = 0``), so requests skip the connect and TLS handshake.
+
+- At most ``max_size`` connections are open; callers wait up to ``timeout``
+  seconds for one to be returned, then get ``PoolTimeout``.
+- Idle connections above ``min_size`` are closed after ``max_idle`` seconds.
+- On checkout a connection is discarded if it is closed, or if it sat idle
+  longer than ``check_idle`` seconds and fails a ``SELECT 1`` (``0`` pings
+  on every checkout).
+- A connection is closed instead of returned after ``max_uses`` checkouts
+  (``0`` never recycles), or when it cannot be reset (rolled back).
+- Connections checked out by a thread that has since died (e.g. a per-request
+  ASGI thread that never closed its connection) are reclaimed when the pool
+  runs out.
+
+Counters, including time spent waiting for a connection, are exposed by
+``pool_stats`` and served on ``/metrics/``.
+"""
+import threading
+import time
+from collections import deque
+
+STAT_FIELDS = (
+    "checkouts",
+    "waits",
+    "wait_seconds",
+    "max_wait_seconds",
+    "timeouts",
+    "opened",
+    "closed",
+    "failed_checks",
+    "recycled",
+    "reclaimed",
+)
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        connect,
+        reset=None,
+        check=None,
+        min_size=0,
+        max_size=10,
+        timeout=10.0,
+        max_uses=0,
+        max_idle=300.0,
+        check_idle=30.0,
+    ):
+        """
+        ``connect()`` opens a connection. ``reset(connection)`` runs when one
+        is returned and must leave it idle (e.g. roll back), returning False
+        if it cannot. ``check(connection)`` is the checkout health check and
+        defaults to running ``SELECT 1``.
+        """
+        self.connect = connect
+        self.reset = reset
+        self.check = check or _ping
+        self.min_size = min_size
+        self.max_size = max(max_size, 1)
+        self.timeout = timeout
+        self.max_uses = max_uses
+        self.max_idle = max_idle
+        self.check_idle = check_idle
+        self.size = 0  # open connections, idle or checked out
+        self.stats = dict.fromkeys(STAT_FIELDS, 0)
+        self._idle = deque()  # (connection, uses, returned_at); most recently returned last
+        self._in_use = {}  # id(connection) -> (connection, uses, owning thread)
+        self._cond = threading.Condition()
+
+    # ---------------------------
+    # Checkout / return
+    # ---------------------------
+    def getconn(self):
+        deadline = time.monotonic() + self.timeout
+        wait = 0.0
+        while True:
+            started = time.monotonic()
+            entry, blocked = self._reserve(deadline)
+            if blocked:
+                wait += time.monotonic() - started
+            if entry is None:
+                try:
+                    connection, uses = self.connect(), 0
+                except BaseException:
+                    with self._cond:
+                        self.size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self.stats["opened"] += 1
+            else:
+                connection, uses, returned_at = entry
+                if not self._healthy(connection, time.monotonic() - returned_at):
+                    self._discard(connection, "failed_checks")
+                    continue
+            break
+
+        with self._cond:
+            self._in_use[id(connection)] = (connection, uses + 1, threading.current_thread())
+            self.stats["checkouts"] += 1
+            if wait:
+                self.stats["waits"] += 1
+                self.stats["wait_seconds"] += wait
+                self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], wait)
+        return connection
+
+    def putconn(self, connection):
+        with self._cond:
+            entry = self._in_use.pop(id(connection), None)
+        if entry is None:
+            # Reclaimed from a dead thread (or never ours): already counted out.
+            _close_quietly(connection)
+            return
+        uses = entry[1]
+        if self.max_uses and uses >= self.max_uses:
+            self._discard(connection, "recycled")
+            return
+        if _is_closed(connection) or (self.reset is not None and not _call_quietly(self.reset, connection)):
+            self._discard(connection, None)
+            return
+        with self._cond:
+            self._idle.append((connection, uses, time.monotonic()))
+            expired = self._expire_idle()
+            self._cond.notify()
+        for stale in expired:
+            _close_quietly(stale)
+
+    def close(self):
+        """
+        Close every idle connection and forget checked-out ones.
+        """
+        with self._cond:
+            idle = [entry[0] for entry in self._idle]
+            self._idle.clear()
+            self._in_use.clear()
+            self.size = 0
+            self.stats["closed"] += len(idle)
+            self._cond.notify_all()
+        for connection in idle:
+            _close_quietly(connection)
+
+    def snapshot(self):
+        with self._cond:
+            return {**self.stats, "size": self.size, "idle": len(self._idle), "in_use": len(self._in_use)}
+
+    # ---------------------------
+    # Internals
+    # ---------------------------
+    def _reserve(self, deadline):
+        """
+        Pop an idle connection, or reserve a slot for a new one (None), waiting
+        until one is available or the deadline passes. Returns (entry, blocked).
+        """
+        blocked = False
+        with self._cond:
+            while True:
+                if self._idle:
+                    return self._idle.pop(), blocked
+                if self.size < self.max_size:
+                    self.size += 1
+                    return None, blocked
+                if self._reclaim_dead():
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats["timeouts"] += 1
+                    raise PoolTimeout(f"No database connection available within {self.timeout}s")
+                blocked = True
+                self._cond.wait(remaining)
+
+    def _reclaim_dead(self):
+        dead = [key for key, (_, _, thread) in self._in_use.items() if not thread.is_alive()]
+        for key in dead:
+            connection = self._in_use.pop(key)[0]
+            _close_quietly(connection)
+            self.size -= 1
+            self.stats["reclaimed"] += 1
+        return bool(dead)
+
+    def _expire_idle(self):
+        expired = []
+        cutoff = time.monotonic() - self.max_idle
+        while len(self._idle) > self.min_size and self._idle[0][2] < cutoff:
+            expired.append(self._idle.popleft()[0])
+            self.size -= 1
+            self.stats["closed"] += 1
+        return expired
+
+    def _healthy(self, connection, idle_for):
+        if _is_closed(connection):
+            return False
+        if idle_for < self.check_idle:
+            return True
+        return _call_quietly(self.check, connection)
+
+    def _discard(self, connection, reason):
+        _close_quietly(connection)
+        with self._cond:
+            self.size -= 1
+            self.stats["closed"] += 1
+            if reason:
+                self.stats[reason] += 1
+            self._cond.notify()
+
+
+def _ping(connection):
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT 1")
+    finally:
+        cursor.close()
+
+
+def _is_closed(connection):
+    return bool(getattr(connection, "closed", False))
+
+
+def _call_quietly(func, connection):
+    try:
+        return func(connection) is not False
+    except Exception:
+        return False
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+# ---------------------------
+# Process-wide registry
+# ---------------------------
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, factory):
+    """
+    The pool registered under ``key`` (``(alias, connection params)``),
+    created with ``factory()`` on first use.
+    """
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = factory()
+    return pool
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def pool_stats():
+    """
+    {alias: counters} for every pool in this process.
+    """
+    with _pools_lock:
+        pools = list(_pools.items())
+    return {key[0]: pool.snapshot() for key, pool in pools}
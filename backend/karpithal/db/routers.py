@@ -0,0 +1,144 @@
+"""
+Primary/replica routing with read-your-writes stickiness.
+
+``ReplicaRoutingMiddleware`` marks each request as pinned to the primary
+or not; ``PrimaryReplicaRouter`` sends reads of unpinned requests to one
+of ``DATABASE_REPLICAS``. Writes always go to the primary.
+
+A request reads from the primary when:
+
+- its method is not safe (POST, PATCH, ...), or it is inside a transaction;
+- its user made a successful unsafe request less than
+  ``REPLICA_PIN_SECONDS`` ago, so the user sees their own profile update
+  or password change even while the replicas lag. Pins live in the Django
+  cache, which should be shared between workers.
+
+Outside a request (commands, background threads) everything uses the primary.
+The user is known only once DRF has authenticated the request, so any queries
+made while authenticating may go to a replica.
+"""
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_CACHE_KEY = "db:primary-pin:{}"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_request_state = ContextVar("replica_routing_state", default=None)
+
+
+class RoutingState:
+    def __init__(self, request, pinned):
+        self.request = request
+        self.pinned = pinned
+        self.user_checked = False
+
+    def use_primary(self):
+        if self.pinned:
+            return True
+        if not self.user_checked:
+            user = getattr(self.request, "user", None)
+            if user is None:
+                return False  # not authenticated yet; look again on the next query
+            # Set first: resolving a lazy session user runs queries of its own.
+            self.user_checked = True
+            self.pinned = bool(user.is_authenticated and is_pinned(user.pk))
+        return self.pinned
+
+
+def pin_to_primary(user_id, seconds=None):
+    """
+    Send the user's reads to the primary for the next ``seconds``.
+    """
+    seconds = settings.REPLICA_PIN_SECONDS if seconds is None else seconds
+    cache.set(PIN_CACHE_KEY.format(user_id), True, seconds)
+
+
+async def apin_to_primary(user_id, seconds=None):
+    seconds = settings.REPLICA_PIN_SECONDS if seconds is None else seconds
+    await cache.aset(PIN_CACHE_KEY.format(user_id), True, seconds)
+
+
+def is_pinned(user_id):
+    return bool(cache.get(PIN_CACHE_KEY.format(user_id)))
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        replicas = settings.DATABASE_REPLICAS
+        state = _request_state.get()
+        if (
+            not replicas
+            or state is None
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+            or state.use_primary()
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Sets the routing state of each request and pins users after they write.
+    Unused when no replicas are configured.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        writes = request.method not in SAFE_METHODS
+        token = _request_state.set(RoutingState(request, pinned=writes))
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+
+        if self._should_pin(request, response, writes):
+            pin_to_primary(request.user.pk)
+        return response
+
+    async def __acall__(self, request):
+        # The state is copied into the context of sync_to_async threads, so the
+        # router sees it for queries the async view runs there.
+        writes = request.method not in SAFE_METHODS
+        token = _request_state.set(RoutingState(request, pinned=writes))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+
+        if self._should_pin(request, response, writes):
+            await apin_to_primary(request.user.pk)
+        return response
+
+    @staticmethod
+    def _should_pin(request, response, writes):
+        user = getattr(request, "user", None)
+        return writes and response.status_code < 400 and user is not None and user.is_authenticated
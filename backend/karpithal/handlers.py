@@ -0,0 +1,65 @@
+"""
+Route-scoped middleware.
+
+The JWT API needs none of the session, CSRF, messages, auth or allauth
+middleware, so requests whose path starts with one of ``API_PATH_PREFIXES``
+run the short ``API_MIDDLEWARE`` chain; everything else (admin, allauth,
+metrics) runs the full ``MIDDLEWARE`` chain. Both chains are built once,
+when the handler loads its middleware.
+
+Use ``application`` from ``karpithal.wsgi`` / ``karpithal.asgi``; the test
+client keeps running the full chain.
+"""
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.base import BaseHandler
+from django.core.handlers.wsgi import WSGIHandler
+
+
+class APIMiddlewareHandler(BaseHandler):
+    """
+    Handler whose middleware chain is ``API_MIDDLEWARE``.
+    """
+
+    def load_middleware(self, is_async=False):
+        # BaseHandler builds the chain from settings.MIDDLEWARE; point it at
+        # the API chain while loading (once per process, at startup).
+        full_chain = settings.MIDDLEWARE
+        settings.MIDDLEWARE = settings.API_MIDDLEWARE
+        try:
+            super().load_middleware(is_async)
+        finally:
+            settings.MIDDLEWARE = full_chain
+
+
+class RouteScopedMiddlewareMixin:
+    """
+    Handler mixin sending API requests through ``APIMiddlewareHandler``.
+    """
+
+    def load_middleware(self, is_async=False):
+        super().load_middleware(is_async)
+        self.api_handler = APIMiddlewareHandler()
+        self.api_handler.load_middleware(is_async)
+        self.api_path_prefixes = tuple(settings.API_PATH_PREFIXES)
+
+    def is_api_request(self, request):
+        return request.path_info.startswith(self.api_path_prefixes)
+
+    def get_response(self, request):
+        if self.is_api_request(request):
+            return self.api_handler.get_response(request)
+        return super().get_response(request)
+
+    async def get_response_async(self, request):
+        if self.is_api_request(request):
+            return await self.api_handler.get_response_async(request)
+        return await super().get_response_async(request)
+
+
+class RouteScopedWSGIHandler(RouteScopedMiddlewareMixin, WSGIHandler):
+    pass
+
+
+class RouteScopedASGIHandler(RouteScopedMiddlewareMixin, ASGIHandler):
+    pass
@@ -0,0 +1,191 @@
+"""
+Non-blocking structured logging.
+
+``QueueLogHandler`` only puts records on a bounded in-memory queue; a
+writer thread (``QueueListener``) formats them as JSON and writes them to
+the stream, so a slow log collector never blocks request threads. Messages
+are formatted (``msg % args``) on the writer thread, so log calls should
+pass arguments rather than pre-formatted f-strings.
+
+When the queue is full the record is dropped and counted per level; the
+count is reported as a warning once the queue drains, and exported on
+``/metrics/``. ``SamplingFilter`` keeps only a fraction of the sub-WARNING
+records of hot loggers (``LOG_SAMPLE_RATES``).
+"""
+import atexit
+import datetime
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else came in through ``extra``.
+RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", (), None)).keys() | {"message", "asctime", "taskName"}
+)
+
+
+class LogStats:
+    """
+    Process-wide counters of dropped and sampled-out records.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.dropped = Counter()  # level name -> records
+        self.sampled_out = Counter()  # logger name -> records
+
+    def drop(self, record):
+        with self._lock:
+            self.dropped[record.levelname] += 1
+
+    def sample_out(self, record):
+        with self._lock:
+            self.sampled_out[record.name] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {"dropped": dict(self.dropped), "sampled_out": dict(self.sampled_out)}
+
+
+log_stats = LogStats()
+
+
+# ---------------------------
+# Formatting
+# ---------------------------
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger, message, location,
+    ``extra`` fields and the formatted exception, if any.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created, tz=datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+# ---------------------------
+# Sampling
+# ---------------------------
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a ``rate`` fraction of the DEBUG/INFO records of the configured
+    loggers (and their children). WARNING and above always pass.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = dict(rates or {})
+
+    def rate_for(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1 or random.random() < rate:
+            return True
+        log_stats.sample_out(record)
+        return False
+
+
+# ---------------------------
+# Queue handler and writer thread
+# ---------------------------
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room: stop() must not fail because the queue is full.
+        self.queue.put(self._sentinel)
+
+
+class QueueLogHandler(QueueHandler):
+    """
+    Enqueues records without blocking and writes them to ``stream``
+    (stderr by default) from a background thread. ``setFormatter`` (the
+    ``formatter`` key in ``LOGGING``) applies to the written output.
+    """
+
+    def __init__(self, maxsize=10000, stream=None):
+        super().__init__(queue.Queue(maxsize))
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self._unreported_drops = 0
+        self._stopped = False
+        self._start_listener()
+        atexit.register(self.close)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork_in_child)
+
+    def _start_listener(self):
+        if self._stopped:
+            return
+        self.listener = _Listener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+
+    def _after_fork_in_child(self):
+        # The writer thread does not survive fork(). The inherited queue may
+        # have its lock held by that thread, and its pending records are the
+        # parent's to write, so the child starts over with an empty queue.
+        self.queue = queue.Queue(self.queue.maxsize)
+        self._unreported_drops = 0
+        self._start_listener()
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Unlike QueueHandler.prepare, do not format here: the writer thread does.
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._unreported_drops += 1
+            log_stats.drop(record)
+            return
+        if self._unreported_drops:
+            dropped, self._unreported_drops = self._unreported_drops, 0
+            notice = logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                "Log queue was full; dropped %d records", (dropped,), None,
+            )
+            try:
+                self.queue.put_nowait(notice)
+            except queue.Full:
+                self._unreported_drops += dropped
+
+    def close(self):
+        self._stopped = True
+        if self.listener._thread is not None:
+            self.listener.stop()  # drains the queue
+        self.target.close()
+        super().close()
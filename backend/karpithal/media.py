@@ -0,0 +1,148 @@
+"""
+Serving access-controlled files from MEDIA_ROOT.
+
+Views check permissions and then hand the file to ``serve_protected_file``,
+which never loads it into Python memory:
+
+- ``PROTECTED_MEDIA_SERVER = "django"``: a ``FileResponse`` over the open
+  file, honouring single ``Range: bytes=`` requests (206/416) and
+  ``If-Range``. Under gunicorn the file descriptor goes to ``os.sendfile``
+  via ``wsgi.file_wrapper``, starting at the requested offset and bounded
+  by ``Content-Length``; other servers stream it in blocks.
+- ``"nginx"``: an empty response with ``X-Accel-Redirect`` pointing at
+  ``PROTECTED_MEDIA_INTERNAL_URL`` (an ``internal`` location aliased to
+  MEDIA_ROOT); nginx handles ranges itself.
+- ``"apache"``: an empty response with ``X-Sendfile`` (mod_xsendfile).
+
+Files on non-local storages are redirected to their storage URL.
+"""
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeFile:
+    """
+    File wrapper that stops reading after ``length`` bytes.
+    ``fileno`` is exposed so sendfile-capable servers can skip reading.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) inclusive for a single satisfiable byte range, None
+    when the header should be ignored (absent, malformed, multi-range), or
+    False when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0 or size == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        return False
+    return start, end
+
+
+def _validators(stat):
+    return quote_etag(f"{int(stat.st_mtime):x}-{stat.st_size:x}"), int(stat.st_mtime)
+
+
+def _if_range_matches(request, etag, last_modified):
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if not if_range:
+        return True
+    if if_range.startswith(('"', "W/")):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def serve_protected_file(request, fieldfile, as_attachment=False):
+    try:
+        path = fieldfile.path
+    except NotImplementedError:
+        return HttpResponseRedirect(fieldfile.url)
+
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return HttpResponse(status=404)
+    filename = os.path.basename(fieldfile.name)
+
+    mode = settings.PROTECTED_MEDIA_SERVER
+    if mode in ("nginx", "apache"):
+        response = HttpResponse()
+        if mode == "nginx":
+            relative = os.path.relpath(path, settings.MEDIA_ROOT)
+            response["X-Accel-Redirect"] = settings.PROTECTED_MEDIA_INTERNAL_URL + quote(relative)
+        else:
+            response["X-Sendfile"] = path
+        # Let the front-end server pick the Content-Type.
+        del response["Content-Type"]
+        return response
+
+    etag, last_modified = _validators(stat)
+    if "HTTP_RANGE" not in request.META:
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+    size = stat.st_size
+    byte_range = None
+    if _if_range_matches(request, etag, last_modified):
+        byte_range = parse_range(request.META.get("HTTP_RANGE"), size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+    elif byte_range is None:
+        response = FileResponse(open(path, "rb"), as_attachment=as_attachment, filename=filename)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = FileResponse(
+            RangeFile(open(path, "rb"), start, length), as_attachment=as_attachment, filename=filename, status=206
+        )
+        response["Content-Length"] = length
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Cache-Control"] = "private, max-age=0, must-revalidate"
+    return response
@@ -0,0 +1,257 @@
+"""
+Per-view SQL query accounting.
+
+``QueryBudgetMiddleware`` counts the queries, database time and duplicated
+SQL of every request, keyed by the resolved URL name (``accounts:user-me``).
+Views may declare ``query_budget`` as an int or a ``{method: int}`` dict;
+exceeding it is logged, counted, and raised when ``QUERY_BUDGET_RAISE`` is on
+(as it is under ``karpithal.testing.QueryBudgetTestMixin``).
+Aggregated counters are served in Prometheus text format by ``metrics_view``.
+"""
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from karpithal.db.pool import pool_stats
+from karpithal.logs import log_stats
+
+logger = logging.getLogger(__name__)
+
+UNRESOLVED_VIEW = "<unresolved>"
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when a view issues more queries than its declared budget.
+    """
+
+
+# ---------------------------
+# Query recording
+# ---------------------------
+class QueryRecorder:
+    """
+    Database execute wrapper that records SQL text and time per query.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duplicates(self):
+        """
+        Number of queries repeating an already-seen SQL statement (N+1 shape).
+        """
+        return sum(n - 1 for n in self.statements.values() if n > 1)
+
+    def duplicated_statements(self):
+        return {sql: n for sql, n in self.statements.items() if n > 1}
+
+
+class ViewQueryStats:
+    """
+    Process-wide aggregate of per-view query counters.
+    """
+
+    FIELDS = ("requests", "queries", "db_seconds", "duplicate_queries", "budget_exceeded")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+
+    def record(self, view_name, recorder, exceeded):
+        with self._lock:
+            stats = self._views[view_name]
+            stats["requests"] += 1
+            stats["queries"] += recorder.count
+            stats["db_seconds"] += recorder.duration
+            stats["duplicate_queries"] += recorder.duplicates
+            stats["budget_exceeded"] += int(exceeded)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._views.items()}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+view_query_stats = ViewQueryStats()
+
+
+def get_query_budget(request):
+    """
+    Return the query budget declared by the resolved view for this method.
+    """
+    match = getattr(request, "resolver_match", None)
+    view_class = getattr(match.func, "view_class", None) if match else None
+    budget = getattr(view_class, "query_budget", None)
+    if isinstance(budget, dict):
+        return budget.get(request.method)
+    return budget
+
+
+# ---------------------------
+# Middleware
+# ---------------------------
+class QueryBudgetMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        with self._recording(recorder):
+            response = self.get_response(request)
+        self._check_budget(request, recorder)
+        return response
+
+    async def __acall__(self, request):
+        # Connections are context-local, so queries run through sync_to_async
+        # by the view still go through these wrappers.
+        recorder = QueryRecorder()
+        with self._recording(recorder):
+            response = await self.get_response(request)
+        self._check_budget(request, recorder)
+        return response
+
+    def _recording(self, recorder):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    def _check_budget(self, request, recorder):
+        match = getattr(request, "resolver_match", None)
+        view_name = match.view_name if match else UNRESOLVED_VIEW
+        budget = get_query_budget(request)
+        exceeded = budget is not None and recorder.count > budget
+        view_query_stats.record(view_name, recorder, exceeded)
+
+        if exceeded:
+            message = (
+                f"{request.method} {view_name} ran {recorder.count} queries "
+                f"(budget {budget}); duplicated: {recorder.duplicated_statements()}"
+            )
+            if getattr(settings, "QUERY_BUDGET_RAISE", False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+
+# ---------------------------
+# Prometheus text endpoint
+# ---------------------------
+METRIC_HELP = {
+    "requests": ("django_view_requests_total", "Requests handled per view."),
+    "queries": ("django_view_db_queries_total", "SQL queries issued per view."),
+    "db_seconds": ("django_view_db_seconds_total", "Time spent executing SQL per view."),
+    "duplicate_queries": ("django_view_db_duplicate_queries_total", "Queries repeating an earlier statement in the same request."),
+    "budget_exceeded": ("django_view_query_budget_exceeded_total", "Requests that exceeded the view's query budget."),
+}
+
+
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(snapshot):
+    lines = []
+    for field, (metric, help_text) in METRIC_HELP.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for view_name, stats in sorted(snapshot.items()):
+            lines.append(f'{metric}{{view="{_escape_label(view_name)}"}} {stats[field]}')
+    return "\n".join(lines) + "\n"
+
+
+POOL_METRIC_HELP = {
+    "size": ("django_db_pool_connections", "gauge", "Open pooled connections (idle or in use)."),
+    "in_use": ("django_db_pool_connections_in_use", "gauge", "Pooled connections checked out."),
+    "checkouts": ("django_db_pool_checkouts_total", "counter", "Connections handed out by the pool."),
+    "waits": ("django_db_pool_waits_total", "counter", "Checkouts that had to wait for a free connection."),
+    "wait_seconds": ("django_db_pool_wait_seconds_total", "counter", "Time spent waiting for a free connection."),
+    "max_wait_seconds": ("django_db_pool_max_wait_seconds", "gauge", "Longest wait for a free connection."),
+    "timeouts": ("django_db_pool_timeouts_total", "counter", "Checkouts that gave up waiting."),
+    "opened": ("django_db_pool_opened_total", "counter", "Connections opened."),
+    "failed_checks": ("django_db_pool_failed_checks_total", "counter", "Connections dropped by the checkout health check."),
+    "recycled": ("django_db_pool_recycled_total", "counter", "Connections closed after reaching max_uses."),
+    "reclaimed": ("django_db_pool_reclaimed_total", "counter", "Connections reclaimed from dead threads."),
+}
+
+
+def render_pool_prometheus(stats):
+    lines = []
+    for field, (metric, kind, help_text) in POOL_METRIC_HELP.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for alias, counters in sorted(stats.items()):
+            lines.append(f'{metric}{{database="{_escape_label(alias)}"}} {counters[field]}')
+    return "\n".join(lines) + "\n"
+
+
+LOG_METRIC_HELP = {
+    "dropped": ("log_records_dropped_total", "level", "Log records dropped because the log queue was full."),
+    "sampled_out": ("log_records_sampled_out_total", "logger", "Log records discarded by LOG_SAMPLE_RATES."),
+}
+
+
+def render_log_prometheus(stats):
+    lines = []
+    for field, (metric, label, help_text) in LOG_METRIC_HELP.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for name, count in sorted(stats[field].items()):
+            lines.append(f'{metric}{{{label}="{_escape_label(name)}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    """
+    Serve the aggregated per-view counters, connection pool stats and log
+    drop counters for Prometheus scraping.
+    The scraper must send METRICS_TOKEN as a bearer token; while no token is
+    configured only logged-in staff can read them.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        allowed = constant_time_compare(request.META.get("HTTP_AUTHORIZATION", ""), f"Bearer {token}")
+    else:
+        user = getattr(request, "user", None)
+        allowed = user is not None and user.is_active and user.is_staff
+    if not allowed:
+        return HttpResponseForbidden()
+    body = render_prometheus(view_query_stats.snapshot())
+    pools = pool_stats()
+    if pools:
+        body += render_pool_prometheus(pools)
+    body += render_log_prometheus(log_stats.snapshot())
+    return HttpResponse(
+        body,
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
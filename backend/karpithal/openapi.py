@@ -0,0 +1,109 @@
+"""
+Prebuilt OpenAPI schema.
+
+Generating the schema introspects every view and serializer, which costs
+hundreds of milliseconds per call. ``manage.py build_openapi_schema`` (run
+at deploy) writes it once to ``OPENAPI_SCHEMA_DIR`` as YAML and JSON, and
+``PrebuiltSchemaView`` streams those files with a content-hash ETag, so
+repeat fetches by docs UIs and codegen get a 304. With DEBUG on the
+schema is still generated per request to reflect code changes.
+"""
+import hashlib
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+# Format -> (file name, renderer used to write it).
+SCHEMA_FILES = {
+    "yaml": ("schema.yaml", OpenApiYamlRenderer),
+    "json": ("schema.json", OpenApiJsonRenderer),
+}
+
+_etags = {}
+_etags_lock = threading.Lock()
+
+
+def schema_path(fmt):
+    return os.path.join(settings.OPENAPI_SCHEMA_DIR, SCHEMA_FILES[fmt][0])
+
+
+def build_schema(directory=None):
+    """
+    Generate the schema once and write every format into ``directory``
+    (default ``OPENAPI_SCHEMA_DIR``). Files are replaced atomically.
+    Returns the written paths.
+    """
+    directory = directory or settings.OPENAPI_SCHEMA_DIR
+    os.makedirs(directory, exist_ok=True)
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(api_version=api_settings.DEFAULT_VERSION)
+    schema = generator.get_schema(request=None, public=True)
+
+    paths = []
+    for name, renderer_class in SCHEMA_FILES.values():
+        path = os.path.join(directory, name)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(renderer_class().render(schema, renderer_context={}))
+        os.replace(f"{path}.tmp", path)
+        paths.append(path)
+    return paths
+
+
+def schema_etag(path, stat):
+    """
+    Content hash of a schema file, recomputed only when the file changes.
+    Identical builds on different hosts get the same ETag.
+    """
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _etags.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            digest.update(chunk)
+    etag = quote_etag(digest.hexdigest()[:32])
+    with _etags_lock:
+        _etags[path] = (key, etag)
+    return etag
+
+
+class PrebuiltSchemaView(SpectacularAPIView):
+    """
+    OpenAPI schema, YAML or JSON by content negotiation (or ``?format=``).
+    Served from the files written by ``build_openapi_schema``.
+    """
+
+    def get(self, request, *args, **kwargs):
+        if settings.DEBUG:
+            return super().get(request, *args, **kwargs)
+
+        renderer = request.accepted_renderer
+        fmt = "json" if "json" in renderer.format else "yaml"
+        path = schema_path(fmt)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            logger.error("OpenAPI schema not found at %s; run manage.py build_openapi_schema", path)
+            return HttpResponse("OpenAPI schema has not been built.", status=503, content_type="text/plain")
+
+        etag = schema_etag(path, stat)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        response = FileResponse(open(path, "rb"), content_type=renderer.media_type)
+        response["ETag"] = etag
+        response["Cache-Control"] = "public, max-age=0, must-revalidate"
+        response["Content-Disposition"] = f'inline; filename="{os.path.basename(path)}"'
+        return response
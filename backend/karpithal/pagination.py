@@ -0,0 +1,250 @@
+"""
+Keyset (seek) pagination.
+
+Pages are fetched with ``WHERE (key) > (last seen key) ORDER BY key LIMIT n``
+instead of ``OFFSET``, so page 500 costs the same as page 1 and no
+``COUNT(*)`` is issued. Views opt in with ``pagination_class`` and set the
+key as ``ordering``; its fields must be non-null and end with a unique
+column (``check_keyset_ordering``, run as a system check for every routed
+view), and an index matching it keeps every page an index range scan.
+
+Cursors are opaque base64 tokens. Clients that need a total can pass
+``?count=approx`` to get a planner estimate on PostgreSQL (an exact count
+elsewhere).
+"""
+import base64
+import binascii
+import datetime
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured, ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder truncates to milliseconds; seeking needs exact values.
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def approximate_count(queryset):
+    """
+    Row estimate for ``queryset``: ``pg_class.reltuples`` for a whole table,
+    the planner's row estimate for a filtered query, ``COUNT(*)`` on other
+    databases or when PostgreSQL has no statistics yet.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            estimate = cursor.fetchone()[0]
+        else:
+            sql, params = queryset.order_by().values("pk").query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = plan[0]["Plan"]["Plan Rows"]
+    # reltuples is -1 for tables that were never vacuumed/analyzed.
+    return int(estimate) if estimate >= 0 else queryset.count()
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Django paginator (e.g. for admin changelists) that counts unfiltered
+    querysets with ``approximate_count`` instead of ``COUNT(*)``.
+    Filtered result sets are still counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet) and not self.object_list.query.where:
+            return approximate_count(self.object_list)
+        return super().count
+
+
+def check_keyset_ordering(model, ordering):
+    """
+    Return the problems that keep ``ordering`` from being a keyset over
+    ``model``: no fields, unknown or nullable fields, a non-unique last field.
+    """
+    if not ordering:
+        return ["has no ordering."]
+    problems = []
+    fields = []
+    for name in ordering:
+        try:
+            field = model._meta.get_field(name.lstrip("-"))
+        except FieldDoesNotExist:
+            problems.append(f"orders by '{name}', which {model.__name__} does not have.")
+            continue
+        if field.null:
+            problems.append(f"orders by '{name}', which is nullable.")
+        fields.append(field)
+    if not problems and not (fields[-1].primary_key or fields[-1].unique):
+        problems.append(f"ends its ordering with '{ordering[-1]}', which is not unique.")
+    return problems
+
+
+class KeysetPagination(BasePagination):
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_ordering(self, view):
+        ordering = getattr(view, "ordering", None)
+        if not ordering:
+            raise ImproperlyConfigured(f"{type(view).__name__} uses KeysetPagination without an `ordering`.")
+        return tuple(ordering)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    # ---------------------------
+    # Cursor encoding
+    # ---------------------------
+    def encode_cursor(self, values, reverse):
+        payload = json.dumps({"k": values, "r": reverse}, cls=CursorEncoder, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+            values, reverse = payload["k"], bool(payload["r"])
+            if len(values) != len(self.fields):
+                raise ValueError
+            values = [field.to_python(value) for field, value in zip(self.fields, values)]
+        except (binascii.Error, TypeError, KeyError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def _key(self, obj):
+        return [getattr(obj, field.attname) for field in self.fields]
+
+    def _cursor_url(self, obj, reverse):
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self._key(obj), reverse))
+
+    # ---------------------------
+    # Pagination
+    # ---------------------------
+    def _seek(self, values, reverse):
+        """
+        Lexicographic "comes after ``values``" filter, e.g. for
+        (-created_at, -id): created_at < v0 OR (created_at = v0 AND id < v1).
+        """
+        condition = Q()
+        for i in reversed(range(len(self.ordering))):
+            name = self.ordering[i].lstrip("-")
+            descending = self.ordering[i].startswith("-") != reverse
+            after = Q(**{f"{name}__{'lt' if descending else 'gt'}": values[i]})
+            condition = after | (Q(**{name: values[i]}) & condition) if condition else after
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(view)
+        opts = queryset.model._meta
+        self.fields = [opts.get_field(name.lstrip("-")) for name in self.ordering]
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) == "approx":
+            self.count = approximate_count(queryset)
+
+        values, reverse = self.decode_cursor(request)
+        order_by = [
+            name[1:] if name.startswith("-") else f"-{name}" for name in self.ordering
+        ] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*order_by)
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, reverse))
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        page = rows[: self.page_size]
+        if reverse:
+            page.reverse()
+
+        self.next = self.previous = None
+        if page:
+            if has_more or reverse:
+                self.next = self._cursor_url(page[-1], reverse=False)
+            if (has_more and reverse) or (values is not None and not reverse):
+                self.previous = self._cursor_url(page[0], reverse=True)
+        elif values is not None:
+            # Ran past either end: offer the way back.
+            self.previous = remove_query_param(self.base_url, self.cursor_query_param)
+        return page
+
+    def get_paginated_response(self, data):
+        body = OrderedDict([("next", self.next), ("previous", self.previous), ("results", data)])
+        if self.count is not None:
+            body["count"] = self.count
+            body.move_to_end("count", last=False)
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "count": {"type": "integer", "description": "Only with ?count=approx; may be an estimate."},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque pagination cursor.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results per page.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Pass 'approx' to include an (estimated) total count.",
+                "schema": {"type": "string", "enum": ["approx"]},
+            },
+        ]
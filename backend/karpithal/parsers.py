@@ -0,0 +1,27 @@
+"""
+orjson-backed JSON parsing.
+
+``ORJSONParser`` replaces DRF's ``JSONParser`` for UTF-8 request bodies
+(what every JSON client sends); other charsets, and everything when orjson
+is not installed, go through ``JSONParser``. Like DRF's strict mode it
+rejects ``NaN`` and ``Infinity``.
+"""
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from karpithal.renderers import orjson
+
+
+class ORJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
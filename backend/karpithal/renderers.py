@@ -0,0 +1,39 @@
+"""
+orjson-backed JSON rendering.
+
+``ORJSONRenderer`` is a drop-in for DRF's ``JSONRenderer``: compact UTF-8
+output, with ``datetime``, ``Decimal``, lazy translations and the other
+types orjson does not handle the same way left to DRF's own encoder, so
+responses match what DRF would send (except NaN, which orjson writes as
+``null``). Indented output (the browsable API, ``; indent=`` in ``Accept``)
+and anything orjson cannot encode, such as integers beyond 64 bits, fall
+back to ``JSONRenderer``, as does everything when orjson is not installed.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional: the fast-json extra
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONRenderer(JSONRenderer):
+    encoder = JSONRenderer.encoder_class()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same as JSONRenderer: keep the output safe to embed in <script>.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
@@ -0,0 +1,13 @@
+"""
+Two local SQLite databases standing in for the primary and a replica, to
+exercise the replica router (the replica is a separate, unreplicated copy):
+
+    DJANGO_SETTINGS_MODULE=karpithal.replica_test_settings python manage.py test
+"""
+from karpithal.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": BASE_DIR / "primary.sqlite3"},  # noqa: F405
+    "replica_1": {"ENGINE": "django.db.backends.sqlite3", "NAME": BASE_DIR / "replica.sqlite3"},  # noqa: F405
+}
+DATABASE_REPLICAS = ["replica_1"]
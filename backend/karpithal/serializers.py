@@ -0,0 +1,168 @@
+"""
+Read serializers compiled from ModelSerializers.
+
+A ``ValuesSerializer`` subclass names a ModelSerializer; on first use its
+fields are compiled into a list of ``(key, lookup, kind, arg)`` steps. Rows
+come from ``queryset.values(*cls.lookups())`` (or ``row_from_instance``
+for an object already in hand) and become the same dicts the
+ModelSerializer would produce, without model instances, field objects or
+``to_representation`` dispatch per value.
+
+Supported fields: plain model fields, primary keys of foreign keys,
+file fields (rendered as URLs like DRF's ``FileField``), nested
+non-``many`` serializers (``None`` when the related row is missing) and ``SerializerMethodField``, which
+needs a ``get_<name>(row, prefix)`` method and its lookups in
+``method_lookups``. A ``get_<name>`` method defined for any other field
+replaces its compiled step the same way. Anything else raises ``ImproperlyConfigured`` when the
+class is compiled.
+"""
+import threading
+
+from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.settings import api_settings
+
+# Fields whose to_representation() returns database values unchanged.
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.JSONField,
+    PrimaryKeyRelatedField,
+)
+
+VALUE, CONVERT, FILE, NESTED, METHOD = range(5)
+
+_compile_lock = threading.Lock()
+
+
+class ValuesSerializer:
+    serializer_class = None
+    method_lookups = {}  # method field name -> lookups its get_<name> reads
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.steps = self.compiled()[0]
+
+    # ---------------------------
+    # Compilation
+    # ---------------------------
+    @classmethod
+    def compiled(cls):
+        """
+        ``(steps, lookups)``, built once per class.
+        """
+        compiled = cls.__dict__.get("_compiled")
+        if compiled is None:
+            with _compile_lock:
+                compiled = cls.__dict__.get("_compiled")
+                if compiled is None:
+                    steps = cls._compile(cls.serializer_class(), "")
+                    compiled = cls._compiled = (steps, tuple(dict.fromkeys(cls._lookups(steps))))
+        return compiled
+
+    @classmethod
+    def _compile(cls, serializer, prefix):
+        steps = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField) or hasattr(cls, f"get_{name}"):
+                steps.append((name, None, METHOD, prefix))
+                continue
+            if field.source == "*" or "." in field.source:
+                raise ImproperlyConfigured(f"{cls.__name__}: field '{name}' has an unsupported source.")
+            lookup = prefix + field.source
+            if isinstance(field, serializers.FileField):
+                if getattr(field, "use_url", api_settings.UPLOADED_FILES_USE_URL):
+                    storage = serializer.Meta.model._meta.get_field(field.source).storage
+                    steps.append((name, lookup, FILE, storage))
+                else:
+                    steps.append((name, lookup, VALUE, None))
+            elif isinstance(field, serializers.BaseSerializer):
+                if isinstance(field, serializers.ListSerializer):
+                    raise ImproperlyConfigured(f"{cls.__name__}: many=True field '{name}' is not supported.")
+                nested = cls._compile(field, lookup + "__")
+                steps.append((name, lookup + "__pk", NESTED, nested))
+            elif isinstance(field, PASSTHROUGH_FIELDS):
+                steps.append((name, lookup, VALUE, None))
+            elif isinstance(field, (serializers.RelatedField, serializers.ManyRelatedField)):
+                raise ImproperlyConfigured(f"{cls.__name__}: field '{name}' ({type(field).__name__}) is not supported.")
+            else:
+                steps.append((name, lookup, CONVERT, field.to_representation))
+        return steps
+
+    @classmethod
+    def lookups(cls):
+        """
+        The ``.values()`` arguments a row needs.
+        """
+        return cls.compiled()[1]
+
+    @classmethod
+    def _lookups(cls, steps):
+        for name, lookup, kind, arg in steps:
+            if kind == NESTED:
+                yield lookup
+                yield from cls._lookups(arg)
+            elif kind == METHOD:
+                yield from (arg + extra for extra in cls.method_lookups.get(name, ()))
+            else:
+                yield lookup
+
+    @classmethod
+    def row_from_instance(cls, instance):
+        """
+        Build a row from a model instance (and its cached relations).
+        """
+        row = {}
+        for lookup in cls.lookups():
+            obj = instance
+            try:
+                for attr in lookup.split("__"):
+                    obj = getattr(obj, attr)
+                    if obj is None:
+                        break
+            except ObjectDoesNotExist:
+                obj = None
+            if hasattr(obj, "name") and hasattr(obj, "storage"):
+                obj = obj.name  # FieldFile -> the stored name, as .values() returns
+            row[lookup] = obj
+        return row
+
+    # ---------------------------
+    # Serialization
+    # ---------------------------
+    def to_representation(self, row):
+        return self._render(self.steps, row)
+
+    def from_instance(self, instance):
+        return self._render(self.steps, self.row_from_instance(instance))
+
+    def many(self, rows):
+        return [self._render(self.steps, row) for row in rows]
+
+    def _render(self, steps, row):
+        data = {}
+        for name, lookup, kind, arg in steps:
+            if kind == VALUE:
+                data[name] = row[lookup]
+            elif kind == NESTED:
+                data[name] = None if row[lookup] is None else self._render(arg, row)
+            elif kind == FILE:
+                data[name] = self.file_url(row[lookup], arg)
+            elif kind == METHOD:
+                data[name] = getattr(self, f"get_{name}")(row, arg)
+            else:
+                value = row[lookup]
+                data[name] = None if value is None else arg(value)
+        return data
+
+    def file_url(self, name, storage):
+        if not name:
+            return None
+        url = storage.url(name)
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request is not None else url
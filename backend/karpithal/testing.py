@@ -0,0 +1,73 @@
+"""
+Test runner and helpers for enforcing SQL query budgets.
+"""
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.dispatch import receiver
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+from django.test.signals import setting_changed
+from django.test.utils import CaptureQueriesContext
+
+from karpithal.throttling import reset_throttle_store
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Keeps test runs off shared state: the cache and throttle counters live
+    in memory instead of the on-disk stores used by dev servers, and
+    background work runs inline so it sees the test database.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._cache_override = override_settings(
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        )
+        self._cache_override.enable()
+        settings.PROFILE_PICTURE_ASYNC = False
+        settings.PROGRESS_FLUSH_INTERVAL = 0  # tests flush the progress buffer explicitly
+        settings.REVOCATION_SYNC_INTERVAL = 0  # tests sync the revocation set explicitly
+        settings.THROTTLE_STORE = {"BACKEND": "karpithal.throttling.LocalMemoryThrottleStore"}
+        reset_throttle_store()
+
+    def teardown_test_environment(self, **kwargs):
+        self._cache_override.disable()
+        super().teardown_test_environment(**kwargs)
+
+
+@receiver(setting_changed)
+def reset_throttle_store_on_change(setting, **kwargs):
+    if setting == "THROTTLE_STORE":
+        reset_throttle_store()
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase mixin that turns a view's exceeded ``query_budget`` into a
+    test failure and adds ``assertMaxQueries``.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.enterContext(override_settings(QUERY_BUDGET_RAISE=True))
+
+    @contextmanager
+    def assertMaxQueries(self, limit, using="default"):
+        """
+        Fail if the block runs more than ``limit`` queries, listing any
+        duplicated SQL in the failure message.
+        """
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+
+        if len(context) > limit:
+            statements = Counter(query["sql"] for query in context.captured_queries)
+            duplicated = "\n".join(f"{n}x {sql}" for sql, n in statements.items() if n > 1)
+            self.fail(
+                f"{len(context)} queries executed, {limit} allowed."
+                + (f"\nDuplicated SQL:\n{duplicated}" if duplicated else "")
+            )
@@ -0,0 +1,212 @@
+"""
+Sliding-window rate limiting for DRF backed by a shared counter store.
+
+Each throttle key keeps two integers: the request count of the current fixed
+window and of the previous one. The sliding estimate is::
+
+    previous * (1 - elapsed_fraction) + current
+
+so a decision is one atomic increment plus one read, whatever the rate.
+The store is configured with ``THROTTLE_STORE``:
+
+- ``LocalMemoryThrottleStore``: per-process, for tests.
+- ``SQLiteThrottleStore``: a WAL-mode SQLite file shared by all workers on
+  one host (local runs, single-box deployments).
+- ``CacheThrottleStore``: any Django cache alias, e.g. a Redis cache in
+  production.
+"""
+import logging
+import sqlite3
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.throttling import AnonRateThrottle, ScopedRateThrottle, UserRateThrottle
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Counter stores
+# ---------------------------
+class BaseThrottleStore:
+    def hit(self, key, window, index):
+        """
+        Count one request for ``key`` in window number ``index`` (windows are
+        ``window`` seconds long) and return (previous_count, current_count).
+        """
+        raise NotImplementedError
+
+
+class LocalMemoryThrottleStore(BaseThrottleStore):
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key, window, index):
+        with self._lock:
+            entry = self._counters.get(key)
+            if entry is None or entry[0] < index - 1:
+                entry = [index, 0, 0]
+            elif entry[0] == index - 1:
+                entry = [index, 0, entry[1]]
+            entry[1] += 1
+            self._counters[key] = entry
+            if len(self._counters) > self.max_keys:
+                self._counters = {k: v for k, v in self._counters.items() if v[0] >= index - 1}
+            return entry[2], entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+
+
+class SQLiteThrottleStore(BaseThrottleStore):
+    """
+    When the file stays locked past the busy timeout the request is let
+    through (``fail_open``, the default) or counted as over every limit,
+    rather than failing with a 500.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path, timeout=5, fail_open=True):
+        self.path = str(path)
+        self.timeout = timeout
+        self.fail_open = fail_open
+        self._local = threading.local()
+        self._hits = 0
+
+    @property
+    def connection(self):
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS throttle ("
+                " key TEXT NOT NULL, idx INTEGER NOT NULL, count INTEGER NOT NULL,"
+                " expires REAL NOT NULL, PRIMARY KEY (key, idx)) WITHOUT ROWID"
+            )
+            self._local.connection = conn
+        return conn
+
+    def hit(self, key, window, index):
+        try:
+            return self._hit(self.connection, key, window, index)
+        except sqlite3.OperationalError:
+            # "database is locked" after the busy timeout, or an unreadable file.
+            logger.warning(
+                "Throttle store %s unavailable; %s request",
+                self.path,
+                "allowing" if self.fail_open else "rejecting",
+                exc_info=True,
+            )
+            return (0, 0) if self.fail_open else (0, sys.maxsize)
+
+    def _hit(self, conn, key, window, index):
+        current = conn.execute(
+            "INSERT INTO throttle (key, idx, count, expires) VALUES (?, ?, 1, ?) "
+            "ON CONFLICT (key, idx) DO UPDATE SET count = count + 1 RETURNING count",
+            (key, index, (index + 2) * window),
+        ).fetchone()[0]
+        row = conn.execute("SELECT count FROM throttle WHERE key = ? AND idx = ?", (key, index - 1)).fetchone()
+
+        self._hits += 1
+        if self._hits % self.PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM throttle WHERE expires < ?", (time.time(),))
+        return (row[0] if row else 0), current
+
+
+class CacheThrottleStore(BaseThrottleStore):
+    def __init__(self, alias="default"):
+        self.alias = alias
+
+    def hit(self, key, window, index):
+        cache = caches[self.alias]
+        current_key = f"{key}:{index}"
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            if cache.add(current_key, 1, timeout=2 * window):
+                current = 1
+            else:
+                current = cache.incr(current_key)
+        return cache.get(f"{key}:{index - 1}", 0), current
+
+
+_store = None
+
+
+def get_throttle_store():
+    global _store
+    if _store is None:
+        config = settings.THROTTLE_STORE
+        _store = import_string(config["BACKEND"])(**config.get("OPTIONS", {}))
+    return _store
+
+
+def reset_throttle_store():
+    global _store
+    _store = None
+
+
+# ---------------------------
+# DRF throttles
+# ---------------------------
+class SlidingWindowMixin:
+    """
+    Replaces SimpleRateThrottle's timestamp history with a sliding-window counter.
+    Rates, scopes and cache keys are unchanged.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        index, offset = divmod(now, self.duration)
+        self.previous, self.current = get_throttle_store().hit(
+            f"{self.key}:{self.duration}", self.duration, int(index)
+        )
+        self.elapsed = offset / self.duration
+        return self.previous * (1 - self.elapsed) + self.current <= self.num_requests
+
+    def wait(self):
+        remaining = (1 - self.elapsed) * self.duration
+        if self.current > self.num_requests or not self.previous:
+            return remaining
+        # Time until the previous window's weight decays enough.
+        needed = 1 - (self.num_requests - self.current) / self.previous
+        return max(0.0, (needed - self.elapsed) * self.duration)
+
+
+class SlidingAnonRateThrottle(SlidingWindowMixin, AnonRateThrottle):
+    pass
+
+
+class SlidingUserRateThrottle(SlidingWindowMixin, UserRateThrottle):
+    pass
+
+
+class SlidingScopedRateThrottle(SlidingWindowMixin, ScopedRateThrottle):
+    """
+    Applies the rate of the view's ``throttle_scope`` (e.g. ``register``).
+    """
+
+    def allow_request(self, request, view):
+        # Same scope resolution as ScopedRateThrottle, then the sliding window.
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
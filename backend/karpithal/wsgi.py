@@ -9,8 +9,12 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/wsgi/
 
 import os
 
-from django.core.wsgi import get_wsgi_application
+import django
+
+from karpithal.handlers import RouteScopedWSGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'karpithal.settings')
 
-application = get_wsgi_application()
+# Same as get_wsgi_application(), with the lean middleware chain for API routes.
+django.setup(set_prefix=False)
+application = RouteScopedWSGIHandler()